@@ -0,0 +1,182 @@
+"""
+Scan tracking logs once and feed each decoded event to several event log tasks.
+
+Many workflows run their own map reduce job over the very same tracking logs, and every one of those jobs reads and
+decodes every line.  An EventLogFanOutTask reads and decodes the logs a single time and then dispatches each event to
+a set of "consumer" tasks.  A consumer is an ordinary task built on EventLogSelectionMixin and MapReduceJobTask: its
+mapper and reducer are run unchanged, but inside the shared job, and its reducer output is written to the consumer's
+own output location.
+"""
+from __future__ import absolute_import
+
+import logging
+import os
+
+import luigi
+
+from edx.analytics.tasks.common.mapreduce import MapReduceJobTask, MultiOutputMapReduceJobTask
+from edx.analytics.tasks.common.pathutil import EventLogSelectionMixin
+from edx.analytics.tasks.util.url import get_target_from_url, url_path_join
+
+log = logging.getLogger(__name__)
+
+
+class EventLogFanOutTask(EventLogSelectionMixin, MapReduceJobTask):
+    """
+    Run the mappers and reducers of several event log tasks in a single pass over the tracking logs.
+
+    Subclasses implement `consumer_tasks()`.  Every consumer must read exactly the same event log files as the fan-out
+    task itself, so it must be constructed with the same `source`, `interval`, `expand_interval`, `pattern`,
+    `date_pattern` and `event_store`.  When reading from the event store, the fan-out task reads the partitions of all
+    of the event types that its consumers make use of.
+
+    Each consumer is handed a shallow copy of the decoded event (and of its "event" payload, when that is a dict), so
+    adding keys to either is safe, but deeper changes are visible to the consumers that run after it.
+
+    Output of plain consumers is written to a part file inside the directory named by the consumer's `output()`, and a
+    `_SUCCESS` flag is added there once the job completes.  Consumers derived from MultiOutputMapReduceJobTask write
+    their own files from their reducers, and their marker is touched once the job completes.
+    """
+
+    marker = luigi.Parameter(
+        config_path={'section': 'map-reduce', 'name': 'marker'},
+        significant=False,
+        description='A URL location to a directory where a marker file will be written on task completion.',
+    )
+
+    def __init__(self, *args, **kwargs):
+        super(EventLogFanOutTask, self).__init__(*args, **kwargs)
+        self._consumers = None
+        self.consumer_output_files = {}
+
+    def consumer_tasks(self):
+        """Returns a dict that maps a short name, used to partition the job's output, to each consumer task."""
+        raise NotImplementedError
+
+    @property
+    def consumers(self):
+        """The consumer tasks, keyed by name."""
+        if self._consumers is None:
+            self._consumers = self.consumer_tasks()
+        return self._consumers
+
+    @property
+    def event_types(self):
+        """All of the event types that the consumers make use of, or None if any of them needs all events."""
+        event_types = set()
+        for consumer in self.consumers.itervalues():
+            if consumer.event_types is None:
+                return None
+            event_types.update(consumer.event_types)
+        return tuple(sorted(event_types))
+
+    @staticmethod
+    def get_event_selection(task):
+        """Returns the parameters of a task that select the event log files it reads, apart from the event types."""
+        # Intervals of different types can't be compared, so compare the dates they span instead.
+        return (
+            task.source,
+            (task.interval.date_a, task.interval.date_b),
+            task.expand_interval,
+            task.pattern,
+            task.date_pattern,
+            task.event_store,
+        )
+
+    def requires_local(self):
+        return [consumer.requires_local() for consumer in self.consumers.itervalues()]
+
+    def init_local(self):
+        super(EventLogFanOutTask, self).init_local()
+        expected_selection = self.get_event_selection(self)
+        for name, consumer in self.consumers.iteritems():
+            if self.get_event_selection(consumer) != expected_selection:
+                raise ValueError(
+                    'Consumer "{name}" ({task}) does not read the same event logs as {fan_out}.'.format(
+                        name=name,
+                        task=consumer,
+                        fan_out=self,
+                    )
+                )
+            consumer.init_local()
+
+    def init_mapper(self):
+        super(EventLogFanOutTask, self).init_mapper()
+        for consumer in self.consumers.itervalues():
+            consumer.init_mapper()
+
+    def init_reducer(self):
+        super(EventLogFanOutTask, self).init_reducer()
+        self.consumer_output_files = {}
+        for consumer in self.consumers.itervalues():
+            consumer.init_reducer()
+
+    def mapper(self, line):
+        event = self.decode_event_line(line)
+        for name in sorted(self.consumers):
+            consumer = self.consumers[name]
+            consumer.preparsed_event = (line, self.copy_event(event))
+            try:
+                for key, value in consumer.mapper(line):
+                    yield (name, key), value
+            finally:
+                consumer.preparsed_event = None
+
+    @staticmethod
+    def copy_event(event):
+        """Returns a copy of the event that one consumer can add keys to without affecting the others."""
+        if event is None:
+            return None
+        event = dict(event)
+        if isinstance(event.get('event'), dict):
+            event['event'] = dict(event['event'])
+        return event
+
+    def reducer(self, key, values):
+        name, consumer_key = key
+        for output in self.consumers[name].reducer(consumer_key, values):
+            self.writer((output,), self.get_consumer_output_file(name))
+
+        return iter(tuple())
+
+    def final_reducer(self):
+        """Close the part files that were opened for the consumers."""
+        for output_file in self.consumer_output_files.itervalues():
+            output_file.close()
+        self.consumer_output_files = {}
+
+        return iter(tuple())
+
+    def get_consumer_output_file(self, name):
+        """Returns the part file that this reduce task writes the output of the named consumer to."""
+        output_file = self.consumer_output_files.get(name)
+        if output_file is None:
+            # Hadoop streaming exposes the job configuration to the reducer as environment variables.
+            partition = int(os.environ.get('mapreduce_task_partition', os.environ.get('mapred_task_partition', 0)))
+            url = url_path_join(self.consumers[name].output().path, 'part-{0:05d}'.format(partition))
+            log.info('Writing output of consumer "%s" to: %s', name, url)
+            output_file = get_target_from_url(url).open('w')
+            self.consumer_output_files[name] = output_file
+        return output_file
+
+    def output(self):
+        marker_url = url_path_join(self.marker, str(hash(self)))
+        return get_target_from_url(marker_url)
+
+    def run(self):
+        super(EventLogFanOutTask, self).run()
+        for consumer in self.consumers.itervalues():
+            self.mark_consumer_complete(consumer)
+
+    def mark_consumer_complete(self, consumer):
+        """
+        Flag the output of a consumer as complete once the shared job has finished.
+
+        Override this for consumers that need more than a marker, such as placeholder files for dates without events.
+        """
+        if isinstance(consumer, MultiOutputMapReduceJobTask):
+            target = consumer.output()
+        else:
+            target = get_target_from_url(url_path_join(consumer.output().path, '_SUCCESS'))
+        if not target.exists():
+            target.open('w').close()
@@ -0,0 +1,86 @@
+"""
+Store tracking log events partitioned by date and event type.
+
+The raw tracking logs are grouped by the host that emitted them, so every job has to read and decode every line of
+every file to find the few event types it cares about.  EventStoreTask converts the logs once into a set of files
+partitioned by the date of the event and its event_type, with the most commonly used fields split out into columns and
+the whole event kept in the last column.  Tasks built on EventLogSelectionMixin read from that store when the
+`event_store` parameter is set, and then only read the partitions for the dates in their interval and the event types
+listed in their `event_types` attribute.
+"""
+import luigi
+
+from edx.analytics.tasks.common.mapreduce import MultiOutputMapReduceJobTask
+from edx.analytics.tasks.common.pathutil import EventLogSelectionMixin, get_event_type_partition
+from edx.analytics.tasks.util import eventlog
+from edx.analytics.tasks.util.record import Record, StringField
+from edx.analytics.tasks.util.url import url_path_join
+
+
+class EventStoreRecord(Record):
+    """A single event in the event store."""
+
+    event_type = StringField(nullable=True, normalize_whitespace=True, description='The type of the event.')
+    course_id = StringField(nullable=True, normalize_whitespace=True, description='The course the event relates to.')
+    username = StringField(nullable=True, normalize_whitespace=True, description='The user that emitted the event.')
+    time = StringField(nullable=False, description='The time of the event, in ISO8601 format.')
+    event_source = StringField(nullable=True, normalize_whitespace=True, description='Where the event was emitted.')
+    event = StringField(nullable=False, description='The complete event, encoded as JSON.')
+
+
+class EventStoreTask(EventLogSelectionMixin, MultiOutputMapReduceJobTask):
+    """
+    Convert the tracking logs for an interval into the event store.
+
+    Each date and event_type partition is written to a single file:
+
+        <output_root>/dt=<date>/event_type=<event_type>/events
+
+    Note that events are partitioned by the date found in the event, not the date in the name of the log file.
+    """
+
+    output_root = luigi.Parameter(
+        config_path={'section': 'event-logs', 'name': 'event_store'},
+        description='A URL to the root of the event store.',
+    )
+
+    # This task builds the store from the raw tracking logs, so it must never try to read from the store itself.
+    event_store = None
+
+    counter_category_name = 'Event Store'
+
+    def mapper(self, line):
+        value = self.get_event_and_date_string(line)
+        if value is None:
+            return
+        event, date_string = value
+
+        event_type = event.get('event_type')
+        try:
+            record = EventStoreRecord(
+                event_type=event_type if isinstance(event_type, basestring) else None,
+                course_id=eventlog.get_course_id(event),
+                username=eventlog.get_event_username(event),
+                time=self.get_event_time(event),
+                event_source=event.get('event_source'),
+                event=eventlog.encode_json(event),
+            )
+        except (ValueError, TypeError, AttributeError):
+            self.incr_counter(self.counter_category_name, 'Discard Malformed Event', 1)
+            return
+
+        yield (date_string, get_event_type_partition(event_type)), record.to_separated_values()
+
+    def multi_output_reducer(self, _key, values, output_file):
+        for value in values:
+            output_file.write(value)
+            output_file.write('\n')
+
+    def output_path_for_key(self, key):
+        date_string, partition = key
+        return url_path_join(
+            self.output_root,
+            'dt={0}'.format(date_string),
+            'event_type={0}'.format(partition),
+            'events',
+        )
@@ -4,10 +4,18 @@ Support executing map reduce tasks.
 from __future__ import absolute_import
 
 import gzip
+import heapq
 import logging
 import logging.config
+import multiprocessing
 import os
+import shutil
 import StringIO
+import tempfile
+import time
+import zlib
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
 from hashlib import md5
 
 import luigi
@@ -15,6 +23,7 @@ import luigi.contrib.hadoop
 import luigi.task
 from luigi import configuration
 
+from edx.analytics.tasks.util import json_codec, lru_cache
 from edx.analytics.tasks.util.manifest import convert_to_manifest_input_if_necessary, remove_manifest_target_if_exists
 from edx.analytics.tasks.util.url import get_target_from_url, url_path_join
 
@@ -59,6 +68,76 @@ class MapReduceJobTask(MapReduceJobTaskMixin, luigi.contrib.hadoop.JobTask):
     job in process as well.
     """
 
+    json_codec = luigi.Parameter(
+        config_path={'section': 'map-reduce', 'name': 'json_codec'},
+        default=json_codec.DEFAULT_CODEC,
+        significant=False,
+        description='Name of the library used to encode and decode JSON in mappers and reducers.  One of: {0}.'.format(
+            ', '.join(json_codec.CODEC_LOADERS)
+        ),
+    )
+
+    counter_flush_size = luigi.IntParameter(
+        config_path={'section': 'map-reduce', 'name': 'counter_flush_size'},
+        default=1000,
+        significant=False,
+        description='The number of counter increments to sum in memory before they are reported to Hadoop.',
+    )
+    counter_flush_seconds = luigi.FloatParameter(
+        config_path={'section': 'map-reduce', 'name': 'counter_flush_seconds'},
+        default=10.0,
+        significant=False,
+        description='The maximum number of seconds to sum counter increments in memory before they are reported to '
+        'Hadoop.',
+    )
+
+    def __init__(self, *args, **kwargs):
+        super(MapReduceJobTask, self).__init__(*args, **kwargs)
+        # luigi declares this dictionary on the class, so it would otherwise be shared by every task in the process.
+        self._counter_dict = {}
+        self._buffered_counter_increments = 0
+        self._last_counter_flush_time = time.time()
+
+    def incr_counter(self, *args, **kwargs):
+        """
+        Increments a Hadoop counter given the group (and name) followed by the amount.
+
+        Each counter update is a line written to stderr, so the increments are summed in memory and reported every
+        `counter_flush_size` increments or `counter_flush_seconds` seconds, whichever comes first, and when the mapper,
+        combiner or reducer finishes.  The `threshold` keyword argument supported by luigi is ignored.
+        """
+        key = args[:-1]
+        self._counter_dict[key] = self._counter_dict.get(key, 0) + args[-1]
+        self._buffered_counter_increments += 1
+        if (
+                self._buffered_counter_increments >= self.counter_flush_size or
+                time.time() - self._last_counter_flush_time >= self.counter_flush_seconds
+        ):
+            self._flush_batch_incr_counter()
+
+    def _flush_batch_incr_counter(self):
+        for key, count in self._counter_dict.iteritems():
+            if count != 0:
+                self._incr_counter(*(key + (count,)))
+        self._counter_dict = {}
+        self._buffered_counter_increments = 0
+        self._last_counter_flush_time = time.time()
+
+    def _map_input(self, input_stream):
+        for output in super(MapReduceJobTask, self)._map_input(input_stream):
+            yield output
+        self._report_cache_counters()
+
+    def _reduce_input(self, inputs, reducer, final=NotImplemented):
+        for output in super(MapReduceJobTask, self)._reduce_input(inputs, reducer, final=final):
+            yield output
+        self._report_cache_counters()
+
+    def _report_cache_counters(self):
+        """Report the hits and misses of the caches in lru_cache since they were last reported."""
+        for key, count in lru_cache.pop_counter_increments().iteritems():
+            self._incr_counter(*(key + (count,)))
+
     def init_hadoop(self):
         log_format = '%(asctime)s %(levelname)s %(process)d [%(name)s] %(filename)s:%(lineno)d - %(message)s'
         logging.config.dictConfig(
@@ -82,6 +161,7 @@ class MapReduceJobTask(MapReduceJobTaskMixin, luigi.contrib.hadoop.JobTask):
                 },
             }
         )
+        json_codec.set_codec(self.json_codec)
         return super(MapReduceJobTask, self).init_hadoop()
 
     def job_runner(self):
@@ -137,6 +217,49 @@ class MapReduceJobTask(MapReduceJobTaskMixin, luigi.contrib.hadoop.JobTask):
         return remove_manifest_target_if_exists(self.manifest_id)
 
 
+class SumValuesMixin(object):
+    """
+    Reduce the volume of map output for jobs whose reducers sum the values output for each key.
+
+    The values output by the mapper for each key are summed in memory before they are written, and the sums are summed
+    again by a combiner before they are sent to the reducers.  The in-memory sums are kept in a dictionary that holds up
+    to `mapper_aggregation_size` keys: when it is full, the sum for the least recently used key is written out, so the
+    mapper may output several partial sums for the same key.  The reducer must therefore sum the values it receives
+    rather than count them.
+
+    This mixin must appear before MapReduceJobTask in the list of base classes.
+    """
+
+    mapper_aggregation_size = luigi.IntParameter(
+        config_path={'section': 'map-reduce', 'name': 'mapper_aggregation_size'},
+        default=10000,
+        significant=False,
+        description='The number of keys to sum map output for in memory.  Set to 0 to disable in-mapper aggregation.',
+    )
+
+    def _map_input(self, input_stream):
+        outputs = super(SumValuesMixin, self)._map_input(input_stream)
+        if self.mapper_aggregation_size <= 0:
+            return outputs
+        return self._sum_map_output(outputs)
+
+    def _sum_map_output(self, outputs):
+        """Sum the values of the (key, value) pairs output by the mapper, holding a limited number of keys at once."""
+        partial_sums = OrderedDict()
+        for key, value in outputs:
+            total = partial_sums.pop(key, None)
+            if total is None and len(partial_sums) >= self.mapper_aggregation_size:
+                yield partial_sums.popitem(last=False)
+            partial_sums[key] = value if total is None else total + value
+
+        for key, total in partial_sums.iteritems():
+            yield key, total
+
+    def combiner(self, key, values):
+        """Sum the values output by the mappers for the key."""
+        yield key, sum(values)
+
+
 class MapReduceJobRunner(luigi.contrib.hadoop.HadoopJobRunner):
     """
     Support more customization of the streaming command.
@@ -177,27 +300,90 @@ class EmulatedMapReduceJobRunner(luigi.contrib.hadoop.JobRunner):
       that should be processed by the task. It makes use of this information to "do the right thing". This mirrors the
       behavior of a manifest input format in hadoop.
     * It sets the "map_input_file" environment variable when running the mapper just like the hadoop streaming library.
+    * It does not hold the map output in memory.  Map output is buffered until the buffer reaches the size set by
+      `[map-reduce] local_sort_buffer_mb`, and then it is sorted and spilled to a temporary file (after applying the
+      combiner, if the job has one).  The reducer reads a k-way merge of the spill files, so it processes the map output
+      as a stream, and the size of the data a job can handle is limited by disk space rather than memory.
 
     Other than that it should behave identically to LocalJobRunner.
 
     """
 
+    # A rough estimate of the memory used by each buffered record in addition to the text of the record itself.
+    RECORD_OVERHEAD_BYTES = 200
+    # The maximum number of spill files that are merged at once, which bounds the number of open files.
+    MERGE_FACTOR = 100
+
+    def __init__(self, sort_buffer_mb=None, temp_dir=None):
+        config = configuration.get_config()
+        if sort_buffer_mb is None:
+            sort_buffer_mb = config.getint('map-reduce', 'local_sort_buffer_mb', 256)
+        self.sort_buffer_bytes = sort_buffer_mb * 1024 * 1024
+        self.temp_dir = temp_dir or config.get('map-reduce', 'local_temp_dir', None)
+
     def group(self, input):
-        output = StringIO.StringIO()
-        lines = []
-        for i, line in enumerate(input):
-            parts = line.rstrip('\n').split('\t')
-            blob = md5(str(i)).hexdigest()  # pseudo-random blob to make sure the input isn't sorted
-            lines.append((parts[:-1], blob, line))
-        for _, _, line in sorted(lines):
-            output.write(line)
-        output.seek(0)
-        return output
+        """Returns the lines of the input sorted by key, in the order that they would be presented to the reducer."""
+        return (line for _key, _blob, line in sorted(self._get_sort_records(enumerate(input))))
+
+    @staticmethod
+    def _get_sort_records(numbered_lines):
+        """
+        Generates a (key, blob, line) tuple for each (number, line) pair.
+
+        The blob is pseudo-random, so records with the same key are not sorted in the order they were output by the
+        mapper.  This ensures that reducers cannot depend on the order of their values.
+        """
+        for i, line in numbered_lines:
+            key = line.rstrip('\n').rsplit('\t', 1)[0]
+            blob = md5(str(i)).hexdigest()
+            yield key, blob, line
 
     def run_job(self, job):
         job.init_hadoop()
         job.init_mapper()
-        map_output = StringIO.StringIO()
+
+        if job.reducer == NotImplemented:
+            # A map only job writes the output of the mappers directly.
+            with job.output().open('w') as map_output:
+                for input_target, input_file in self._iterate_input_files(job):
+                    job.writer(self._map_input_file(job, input_target, input_file), map_output)
+            return
+
+        if job.combiner != NotImplemented:
+            job.init_combiner()
+
+        spill_files = []
+        try:
+            buffered_records = []
+            buffered_bytes = 0
+            record_count = 0
+            for input_target, input_file in self._iterate_input_files(job):
+                outputs = self._map_input_file(job, input_target, input_file)
+                for line in self._internal_lines(job, outputs):
+                    buffered_records.append((record_count, line))
+                    record_count += 1
+                    buffered_bytes += len(line) + self.RECORD_OVERHEAD_BYTES
+                    if buffered_bytes >= self.sort_buffer_bytes:
+                        spill_files.append(self._spill(job, buffered_records))
+                        buffered_records = []
+                        buffered_bytes = 0
+
+            if spill_files:
+                if buffered_records:
+                    spill_files.append(self._spill(job, buffered_records))
+                    buffered_records = []
+                reduce_input = self._merge_spill_files(spill_files)
+            else:
+                reduce_input = (
+                    line for _key, _blob, line in sorted(self._get_sort_records(self._combine(job, buffered_records)))
+                )
+            self._run_reducer(job, reduce_input)
+        finally:
+            for spill_file in spill_files:
+                spill_file.close()
+
+    def _get_input_targets(self, job):
+        """Generates a target for every file of input to the job, expanding directories and manifests."""
         input_targets = luigi.task.flatten(job.input_hadoop())
         for input_target in input_targets:
             # if file is a directory, then assume that it's Hadoop output,
@@ -209,39 +395,345 @@ class EmulatedMapReduceJobRunner(luigi.contrib.hadoop.JobRunner):
                     input_targets.append(get_target_from_url(url.strip()))
                 continue
 
-            with input_target.open('r') as input_file:
-
-                # S3 files not yet supported since they don't support tell() and seek()
-                if input_target.path.endswith('.gz'):
-                    input_file = gzip.GzipFile(fileobj=input_file)
-                elif input_target.path.endswith('.manifest'):
+            if input_target.path.endswith('.manifest'):
+                with input_target.open('r') as input_file:
                     for url in input_file:
                         input_targets.append(get_target_from_url(url.strip()))
-                    continue
-
-                os.environ['map_input_file'] = input_target.path
-                try:
-                    outputs = job._map_input((line[:-1] for line in input_file))
-                    job.internal_writer(outputs, map_output)
-                finally:
-                    del os.environ['map_input_file']
-
-        map_output.seek(0)
+                continue
 
-        reduce_input = self.group(map_output)
+            yield input_target
+
+    @staticmethod
+    @contextmanager
+    def _open_input_target(input_target):
+        """Opens a file of input to the job for reading, decompressing it if necessary."""
+        with input_target.open('r') as input_file:
+            # S3 files not yet supported since they don't support tell() and seek()
+            if input_target.path.endswith('.gz'):
+                input_file = gzip.GzipFile(fileobj=input_file)
+            yield input_file
+
+    def _iterate_input_files(self, job):
+        """Generates (target, file) pairs for every file of input to the job."""
+        for input_target in self._get_input_targets(job):
+            with self._open_input_target(input_target) as input_file:
+                yield input_target, input_file
+
+    @staticmethod
+    def _map_input_file(job, input_target, input_file):
+        """Generates the mapper output for a single file of input."""
+        os.environ['map_input_file'] = input_target.path
+        try:
+            for output in job._map_input((line[:-1] for line in input_file)):
+                yield output
+        finally:
+            del os.environ['map_input_file']
+
+    @staticmethod
+    def _internal_lines(job, outputs):
+        """Serializes each output record the way `job.internal_writer()` does."""
+        for output in outputs:
+            yield '\t'.join(job.internal_serialize(value) for value in output) + '\n'
+
+    def _combine(self, job, numbered_lines):
+        """Returns the (number, line) pairs unchanged, or the result of applying the job's combiner to them."""
+        if job.combiner == NotImplemented:
+            return numbered_lines
+        sorted_lines = self.group(line for _number, line in numbered_lines)
+        combined = job._reduce_input(
+            job.internal_reader((line[:-1] for line in sorted_lines)), job.combiner, job.final_combiner
+        )
+        return list(enumerate(self._internal_lines(job, combined)))
+
+    def _write_sorted_run(self, job, numbered_lines, output_file):
+        """Sorts the records and writes them to a file in the format read by `_read_spill_file()`."""
+        for _key, blob, line in sorted(self._get_sort_records(self._combine(job, numbered_lines))):
+            output_file.write(blob)
+            output_file.write('\t')
+            output_file.write(line)
+
+    def _spill(self, job, numbered_lines):
+        """Sorts the records and writes them to a temporary file, which is returned."""
+        spill_file = tempfile.TemporaryFile(prefix='map-output-', dir=self.temp_dir)
+        self._write_sorted_run(job, numbered_lines, spill_file)
+        spill_file.seek(0)
+        log.debug('Spilled %d records of map output to disk', len(numbered_lines))
+        return spill_file
+
+    def _merge_spill_files(self, spill_files):
+        """Generates the lines in the spill files in sorted order."""
+        spill_files = self._reduce_spill_files(spill_files)
+        log.debug('Merging %d sorted runs of map output', len(spill_files))
+        try:
+            for _key, _blob, line in heapq.merge(*[self._read_spill_file(spill_file) for spill_file in spill_files]):
+                yield line
+        finally:
+            for spill_file in spill_files:
+                spill_file.close()
+
+    def _reduce_spill_files(self, spill_files):
+        """Merges spill files together until there are no more than MERGE_FACTOR of them, returning the remainder."""
+        while len(spill_files) > self.MERGE_FACTOR:
+            merged_files = []
+            for i in range(0, len(spill_files), self.MERGE_FACTOR):
+                group = spill_files[i:i + self.MERGE_FACTOR]
+                merged_file = tempfile.TemporaryFile(prefix='map-output-', dir=self.temp_dir)
+                for _key, blob, line in heapq.merge(*[self._read_spill_file(spill_file) for spill_file in group]):
+                    merged_file.write(blob)
+                    merged_file.write('\t')
+                    merged_file.write(line)
+                merged_file.seek(0)
+                for spill_file in group:
+                    spill_file.close()
+                merged_files.append(merged_file)
+            spill_files = merged_files
+        return spill_files
+
+    @staticmethod
+    def _read_spill_file(spill_file):
+        """Generates the sorted (key, blob, line) tuples that were written to a spill file."""
+        for record in spill_file:
+            blob, line = record.split('\t', 1)
+            yield line.rstrip('\n').rsplit('\t', 1)[0], blob, line
+
+    def _run_reducer(self, job, reduce_input):
+        """Runs the reducer over the sorted map output, writing to the output of the job."""
         try:
             reduce_output = job.output().open('w')
         except Exception:
             reduce_output = StringIO.StringIO()
 
         try:
-            job._run_reducer(reduce_input, reduce_output)
+            self._reduce(job, reduce_input, reduce_output)
         finally:
             try:
                 reduce_output.close()
             except Exception:
                 pass
 
+    @staticmethod
+    def _reduce(job, reduce_input, reduce_output):
+        """Runs the reducer over sorted lines of map output, writing its output to a file."""
+        job.init_reducer()
+        outputs = job._reduce_input(
+            job.internal_reader((line[:-1] for line in reduce_input)), job.reducer, job.final_reducer
+        )
+        job.writer(outputs, reduce_output)
+
+
+# The state shared with the worker processes of a MultiprocessMapReduceJobRunner, which inherit it when they are forked.
+_worker_state = None  # pylint: disable=invalid-name
+
+
+def _init_worker(state):
+    """Store the state of the job in a worker process."""
+    global _worker_state  # pylint: disable=global-statement,invalid-name
+    _worker_state = state
+
+
+def _run_map_task(map_task_id):
+    """Run a map task in a worker process."""
+    try:
+        return _worker_state.runner.run_map_task(_worker_state, map_task_id)
+    except Exception:
+        log.exception('Map task %d failed', map_task_id)
+        raise
+
+
+def _run_reduce_task(task_args):
+    """Run a reduce task in a worker process."""
+    partition, run_paths = task_args
+    try:
+        return _worker_state.runner.run_reduce_task(_worker_state, partition, run_paths)
+    except Exception:
+        log.exception('Reduce task %d failed', partition)
+        raise
+
+
+class MultiprocessJobState(object):
+    """The state of a job that is shared by the tasks of a MultiprocessMapReduceJobRunner."""
+
+    def __init__(self, runner, job, input_targets, work_dir, num_partitions):
+        self.runner = runner
+        self.job = job
+        self.input_targets = input_targets
+        self.work_dir = work_dir
+        self.num_partitions = num_partitions
+
+
+class MultiprocessMapReduceJobRunner(EmulatedMapReduceJobRunner):
+    """
+    Execute map reduce tasks on the machine that is running luigi, using a pool of worker processes.
+
+    Each file of input is processed by a separate map task.  The map output is partitioned by a hash of its key into
+    `n_reduce_tasks` partitions, and each partition is processed by a separate reduce task, so all of the values for a
+    key are passed to the same reducer, just like in Hadoop.  Reduce tasks set the "mapreduce_task_partition" environment
+    variable, and the output of all of the reducers is concatenated in partition order.  Counters are totalled across
+    all tasks and logged once the job completes.
+
+    The number of worker processes is set by `[map-reduce] local_processes`, and defaults to the number of CPUs.  Each
+    worker buffers up to `[map-reduce] local_sort_buffer_mb` of map output before spilling it to disk.
+
+    Other than that it behaves like EmulatedMapReduceJobRunner.
+    """
+
+    def __init__(self, sort_buffer_mb=None, temp_dir=None, processes=None):
+        super(MultiprocessMapReduceJobRunner, self).__init__(sort_buffer_mb=sort_buffer_mb, temp_dir=temp_dir)
+        if processes is None:
+            config = configuration.get_config()
+            processes = config.getint('map-reduce', 'local_processes', multiprocessing.cpu_count())
+        self.processes = processes
+        self.counters = Counter()
+
+    def run_job(self, job):
+        input_targets = list(self._get_input_targets(job))
+        num_partitions = 0 if job.reducer == NotImplemented else int(job.n_reduce_tasks)
+        work_dir = tempfile.mkdtemp(prefix='mapreduce-', dir=self.temp_dir)
+        state = MultiprocessJobState(self, job, input_targets, work_dir, num_partitions)
+        self.counters = Counter()
+
+        pool = multiprocessing.Pool(self.processes, initializer=_init_worker, initargs=(state,))
+        try:
+            log.info('Running %d map tasks in %d processes', len(input_targets), self.processes)
+            map_results = pool.map(_run_map_task, range(len(input_targets)), chunksize=1)
+
+            if num_partitions == 0:
+                output_paths = []
+                for output_path, counters in map_results:
+                    output_paths.append(output_path)
+                    self.counters.update(counters)
+            else:
+                run_paths = [[] for _partition in range(num_partitions)]
+                for task_runs, counters in map_results:
+                    for partition, path in task_runs:
+                        run_paths[partition].append(path)
+                    self.counters.update(counters)
+
+                log.info('Running %d reduce tasks in %d processes', num_partitions, self.processes)
+                reduce_results = pool.map(_run_reduce_task, list(enumerate(run_paths)), chunksize=1)
+                output_paths = []
+                for output_path, counters in reduce_results:
+                    output_paths.append(output_path)
+                    self.counters.update(counters)
+
+            pool.close()
+            self._write_job_output(job, output_paths)
+        except Exception:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        for key, count in sorted(self.counters.iteritems()):
+            log.info('Counter %s: %d', ', '.join(key), count)
+
+    def run_map_task(self, state, map_task_id):
+        """
+        Run the mapper over a single file of input.
+
+        Returns a pair of the sorted runs of map output that were written, as a list of (partition, path) pairs, and the
+        counters incremented by the task.  For map only jobs, the path to the output of the mapper is returned instead of
+        the sorted runs.
+        """
+        job = state.job
+        counters = self._capture_counters(job)
+        job.init_hadoop()
+        job.init_mapper()
+        input_target = state.input_targets[map_task_id]
+
+        if state.num_partitions == 0:
+            output_path = os.path.join(state.work_dir, 'map-{0:05d}'.format(map_task_id))
+            with open(output_path, 'w') as map_output:
+                with self._open_input_target(input_target) as input_file:
+                    job.writer(self._map_input_file(job, input_target, input_file), map_output)
+            return output_path, dict(counters)
+
+        if job.combiner != NotImplemented:
+            job.init_combiner()
+
+        runs = []
+        partitions = [[] for _partition in range(state.num_partitions)]
+        buffered_bytes = 0
+        record_count = 0
+        with self._open_input_target(input_target) as input_file:
+            for line in self._internal_lines(job, self._map_input_file(job, input_target, input_file)):
+                key = line.rstrip('\n').rsplit('\t', 1)[0]
+                partitions[self.get_partition(key, state.num_partitions)].append((record_count, line))
+                record_count += 1
+                buffered_bytes += len(line) + self.RECORD_OVERHEAD_BYTES
+                if buffered_bytes >= self.sort_buffer_bytes:
+                    runs.extend(self._spill_partitions(state, job, map_task_id, len(runs), partitions))
+                    partitions = [[] for _partition in range(state.num_partitions)]
+                    buffered_bytes = 0
+
+        runs.extend(self._spill_partitions(state, job, map_task_id, len(runs), partitions))
+        return runs, dict(counters)
+
+    @staticmethod
+    def get_partition(key, num_partitions):
+        """Returns the partition that the serialized key belongs to."""
+        return (zlib.crc32(key) & 0xffffffff) % num_partitions
+
+    def _spill_partitions(self, state, job, map_task_id, run_id, partitions):
+        """Writes a sorted run for each non-empty partition, returning a list of (partition, path) pairs."""
+        runs = []
+        for partition, numbered_lines in enumerate(partitions):
+            if not numbered_lines:
+                continue
+            path = os.path.join(
+                state.work_dir, 'map-{0:05d}-{1:05d}-part-{2:05d}'.format(map_task_id, run_id + len(runs), partition)
+            )
+            with open(path, 'w') as run_file:
+                self._write_sorted_run(job, numbered_lines, run_file)
+            runs.append((partition, path))
+        return runs
+
+    def run_reduce_task(self, state, partition, run_paths):
+        """Run the reducer over the sorted runs of one partition, returning the path to its output and its counters."""
+        job = state.job
+        counters = self._capture_counters(job)
+        os.environ['mapreduce_task_partition'] = str(partition)
+        try:
+            job.init_hadoop()
+            output_path = os.path.join(state.work_dir, 'part-{0:05d}'.format(partition))
+            with open(output_path, 'w') as reduce_output:
+                reduce_input = self._merge_spill_files([open(path, 'r') for path in run_paths])
+                self._reduce(job, reduce_input, reduce_output)
+        finally:
+            del os.environ['mapreduce_task_partition']
+        return output_path, dict(counters)
+
+    @staticmethod
+    def _capture_counters(job):
+        """Returns a Counter that accumulates the counters incremented by the job, instead of writing them to stderr."""
+        counters = Counter()
+
+        def incr_counter(*args):
+            """Increment a counter given the group (and name) followed by the amount."""
+            counters[tuple(args[:-1])] += args[-1]
+
+        job._incr_counter = incr_counter  # pylint: disable=protected-access
+        return counters
+
+    @staticmethod
+    def _write_job_output(job, output_paths):
+        """Concatenate the output of the tasks into the output of the job."""
+        try:
+            job_output = job.output().open('w')
+        except Exception:
+            job_output = StringIO.StringIO()
+
+        try:
+            for output_path in output_paths:
+                with open(output_path, 'r') as task_output:
+                    shutil.copyfileobj(task_output, job_output)
+        finally:
+            try:
+                job_output.close()
+            except Exception:
+                pass
+
 
 class MultiOutputMapReduceJobTask(MapReduceJobTask):
     """
@@ -1,14 +1,18 @@
 """
 Support for loading data into a Mysql database.
 """
+import hashlib
 import json
 import logging
+import tempfile
 import traceback
 from itertools import chain
+from multiprocessing.pool import ThreadPool
 
 import luigi.configuration
 from luigi.contrib.mysqldb import MySqlTarget
 
+from edx.analytics.tasks.common.pathutil import get_part_file_targets
 from edx.analytics.tasks.util.overwrite import OverwriteOutputMixin
 from edx.analytics.tasks.util.url import ExternalURL
 
@@ -18,6 +22,7 @@ try:
     import mysql.connector
     from mysql.connector.errors import ProgrammingError
     from mysql.connector import errorcode
+    from mysql.connector.constants import ClientFlag
     mysql_client_available = True
 except ImportError:
     log.warn('Unable to import mysql client libraries')
@@ -26,6 +31,13 @@ except ImportError:
     mysql_client_available = False
 
 
+# Values that are loaded as NULL.  Hive indicates a null value with the string "\N", and we represent an infinite value
+# with the string "inf", which MySQL has no representation for.
+NULL_VALUES = ('None', '\\N', 'inf', '-inf')
+# The number of warnings included in the error raised when LOAD DATA produces warnings.
+MAX_REPORTED_LOAD_DATA_WARNINGS = 10
+
+
 class MysqlInsertTaskMixin(OverwriteOutputMixin):
     """
     Parameters for inserting a data set into RDBMS.
@@ -44,6 +56,20 @@ class MysqlInsertTaskMixin(OverwriteOutputMixin):
         significant=False,
         description='The number of rows to insert at a time.',
     )
+    use_load_data = luigi.BoolParameter(
+        config_path={'section': 'database-export', 'name': 'use_load_data'},
+        default=False,
+        significant=False,
+        description='If True, load the rows from a local file with LOAD DATA LOCAL INFILE instead of using INSERT '
+        'statements.',
+    )
+    load_connections = luigi.IntParameter(
+        default=1,
+        significant=False,
+        description='If greater than 1, the part files of the source are loaded concurrently over this many '
+        'connections into a staging table, which is then copied into the table in the final transaction.  Only used '
+        'when rows() is not overridden.',
+    )
 
 
 class MysqlInsertTask(MysqlInsertTaskMixin, luigi.Task):
@@ -176,21 +202,9 @@ class MysqlInsertTask(MysqlInsertTaskMixin, luigi.Task):
 
     def rows(self):
         """Return/yield tuples or lists corresponding to each row to be inserted """
-        try:
-            if self.insert_source_task is not None:
-                input_target = self.insert_source_task.output()
-                with input_target.open('r') as fobj:
-                    for line in fobj:
-                        yield line.strip('\n').split('\t')
-        except RuntimeError:
-            # While calling finish on an input target, Luigi throws a RuntimeError exception if the subprocess command
-            # to read the input returns a non-zero return code. As all of the data's been read already, we choose to ignore
-            # this exception.
-            traceback_str = traceback.format_exc()
-            if "self._finish()" in traceback_str:
-                log.debug("Luigi raised RuntimeError while calling _finish on input target.")
-            else:
-                raise
+        if self.insert_source_task is not None:
+            for line in self._source_lines(self.insert_source_task.output()):
+                yield line.strip('\n').split('\t')
 
     def update_id(self):
         """This update id will be a unique identifier for this insert on this table."""
@@ -210,11 +224,16 @@ class MysqlInsertTask(MysqlInsertTaskMixin, luigi.Task):
         Normally you don't override this.
         """
         if self.output_target is None:
+            cnx_kwargs = {}
+            if self.use_load_data:
+                # The client must declare that it can send local files to the server.
+                cnx_kwargs['client_flags'] = [ClientFlag.LOCAL_FILES]
             self.output_target = CredentialFileMysqlTarget(
                 credentials_target=self.input()['credentials'],
                 database_name=self.database,
                 table=self.table,
-                update_id=self.update_id()
+                update_id=self.update_id(),
+                **cnx_kwargs
             )
 
         return self.output_target
@@ -253,7 +272,7 @@ class MysqlInsertTask(MysqlInsertTaskMixin, luigi.Task):
             log.debug(query)
             connection.cursor().execute(query)
 
-    def _execute_insert_query(self, cursor, value_list, column_names):
+    def _execute_insert_query(self, cursor, value_list, column_names, table=None):
         """
         Constructs and executes the insert query.
 
@@ -263,6 +282,7 @@ class MysqlInsertTask(MysqlInsertTaskMixin, luigi.Task):
                 corresponds to the number of rows, and each tuple should have
                 an element for each column.
             column_names - a single string holding names of columns, joined by commas.
+            table - the table to insert into, which defaults to self.table.
 
         Example:
 
@@ -291,37 +311,240 @@ class MysqlInsertTask(MysqlInsertTaskMixin, luigi.Task):
         # traditional python "%" operator.
         parameters = "(" + ",".join(["%s"] * num_cols) + ")"
         all_parameters = ",".join([parameters] * num_rows)
+        table = table or self.table
         query = "INSERT INTO {table} ({column_names}) VALUES {values}".format(
-            table=self.table, column_names=column_names, values=all_parameters
+            table=table, column_names=column_names, values=all_parameters
         )
         cursor.execute(query, list(chain.from_iterable(value_list)))
-        log.debug("Wrote %d rows to table %s", num_rows, self.table)
+        log.debug("Wrote %d rows to table %s", num_rows, table)
 
-    def insert_rows(self, cursor):
-        """Inserts row values from source into database table."""
+    @property
+    def column_names(self):
+        """List of the names of the columns."""
         if isinstance(self.columns[0], basestring):
-            column_names = ','.join([name for name in self.columns])
+            return list(self.columns)
         elif len(self.columns[0]) == 2:
-            column_names = ','.join([name for name, _type in self.columns])
+            return [name for name, _type in self.columns]
         else:
             raise Exception('columns must consist of column strings or '
                             '(column string, type string) tuples (was %r ...)'
                             % (self.columns[0],))
 
+    def insert_rows(self, cursor):
+        """Inserts row values from source into database table."""
+        if self.use_load_data:
+            self.load_rows(cursor)
+            return
+
+        row_count = self._insert_row_values(cursor, self.rows(), self.table)
+        self._check_row_count(row_count)
+
+    def _insert_row_values(self, cursor, rows, table):
+        """Inserts the rows into a table with INSERT statements, returning the number of rows."""
+        column_names = ','.join(self.column_names)
+
         value_list = []
         row_count = 0
-        for row_count, row in enumerate(self.rows(), start=1):
+        for row_count, row in enumerate(rows, start=1):
             entry = tuple([coerce_for_mysql_connect(elem) for elem in row])
             value_list.append(entry)
             if row_count % self.insert_chunk_size == 0:
-                self._execute_insert_query(cursor, value_list, column_names)
+                self._execute_insert_query(cursor, value_list, column_names, table)
                 value_list = []
 
+        if len(value_list) > 0:
+            self._execute_insert_query(cursor, value_list, column_names, table)
+
+        return row_count
+
+    def _check_row_count(self, row_count):
+        """Refuses to overwrite a table with nothing, unless that is allowed."""
         if self.overwrite and not self.allow_empty_insert and row_count == 0:
             raise Exception('Cannot overwrite a table with an empty result set.')
 
-        if len(value_list) > 0:
-            self._execute_insert_query(cursor, value_list, column_names)
+    @property
+    def _rows_read_from_source(self):
+        """True if the rows are the lines of the output of insert_source_task, because rows() is not overridden."""
+        return type(self).rows.__func__ is MysqlInsertTask.rows.__func__ and self.insert_source_task is not None
+
+    def load_rows(self, cursor):
+        """
+        Loads row values from source into database table with a single LOAD DATA LOCAL INFILE statement.
+
+        The rows are written to a local tab-separated file that the server reads through the connection, so the load is
+        part of the same transaction as the rest of the task.  When rows() is not overridden, the lines of the source
+        are copied to the file as they are.  Values are loaded literally, without any backslash escaping, and the
+        conversion of NULL_VALUES to NULL is done by the server.
+
+        Note that LOAD DATA LOCAL turns the errors of rows that duplicate a unique key or can't be converted to the
+        types of the columns into warnings, so the load fails if there are any warnings, as the insert would have.
+        """
+        with tempfile.NamedTemporaryFile(prefix='mysql_load_{0}_'.format(self.table), suffix='.tsv') as data_file:
+            if self._rows_read_from_source:
+                row_count = self._write_source_lines(data_file, self._source_lines(self.insert_source_task.output()))
+            else:
+                row_count = self._write_rows(data_file)
+
+            self._check_row_count(row_count)
+            if row_count > 0:
+                self._load_data_file(cursor, data_file, self.table)
+
+    def _load_data_file(self, cursor, data_file, table):
+        """Loads a tab-separated file into a table with LOAD DATA LOCAL INFILE."""
+        data_file.flush()
+        column_names = self.column_names
+        variables = ['@col{0}'.format(index) for index in range(len(column_names))]
+        assignments = [
+            "{name} = IF(BINARY {variable} IN ({null_values}), NULL, {variable})".format(
+                name=name,
+                variable=variable,
+                null_values=','.join("'{0}'".format(value.replace('\\', '\\\\')) for value in NULL_VALUES),
+            )
+            for name, variable in zip(column_names, variables)
+        ]
+        query = (
+            "LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table} CHARACTER SET utf8 "
+            "FIELDS TERMINATED BY '\\t' ESCAPED BY '' LINES TERMINATED BY '\\n' "
+            "({variables}) SET {assignments}"
+        ).format(
+            path=data_file.name.replace('\\', '\\\\').replace("'", "\\'"),
+            table=table,
+            variables=','.join(variables),
+            assignments=','.join(assignments),
+        )
+        log.debug(query)
+        cursor.execute(query)
+
+        cursor.execute('SHOW WARNINGS LIMIT {0}'.format(MAX_REPORTED_LOAD_DATA_WARNINGS))
+        warnings = cursor.fetchall()
+        if warnings:
+            raise Exception("Loading the rows of {path} into table {table} produced warnings: {warnings}".format(
+                path=data_file.name,
+                table=table,
+                warnings='; '.join(' '.join(unicode(field) for field in warning) for warning in warnings),
+            ))
+        log.debug("Loaded the rows of %s into table %s", data_file.name, table)
+
+    def _write_source_lines(self, data_file, lines):
+        """Copies lines of the source to the data file, returning the number of lines."""
+        num_cols = len(self.column_names)
+        row_count = 0
+        for line in lines:
+            line = line.rstrip('\n')
+            if line.count('\t') != num_cols - 1:
+                raise Exception("Misaligned data in mysql_load: "
+                                "row '{row}' does not match columns '{columns}'".format(
+                                    row=line, columns=','.join(self.column_names)
+                                ))
+            data_file.write(line)
+            data_file.write('\n')
+            row_count += 1
+        return row_count
+
+    def _write_rows(self, data_file):
+        """Writes the rows returned by rows() to the data file, returning the number of rows."""
+        num_cols = len(self.column_names)
+        row_count = 0
+        for row in self.rows():
+            if len(row) != num_cols:
+                raise Exception("Misaligned data in mysql_load: "
+                                "row '{row}' does not match columns '{columns}'".format(
+                                    row=row, columns=','.join(self.column_names)
+                                ))
+            data_file.write('\t'.join(format_for_load_data(value) for value in row))
+            data_file.write('\n')
+            row_count += 1
+        return row_count
+
+    def _source_lines(self, input_target):
+        """Yields the lines of a target holding source data."""
+        try:
+            with input_target.open('r') as fobj:
+                for line in fobj:
+                    yield line
+        except RuntimeError:
+            # While calling finish on an input target, Luigi throws a RuntimeError exception if the subprocess command
+            # to read the input returns a non-zero return code. As all of the data's been read already, we choose to ignore
+            # this exception.
+            traceback_str = traceback.format_exc()
+            if "self._finish()" in traceback_str:
+                log.debug("Luigi raised RuntimeError while calling _finish on input target.")
+            else:
+                raise
+
+    @property
+    def staging_table(self):
+        """The name of the table that the part files of the source are loaded into when they are loaded concurrently."""
+        return '{table}_staging_{hash}'.format(table=self.table, hash=hashlib.md5(self.update_id()).hexdigest()[:8])
+
+    def get_source_part_targets(self):
+        """Returns the part files of the source if they are to be loaded concurrently, or else an empty list."""
+        if self.load_connections <= 1 or not self._rows_read_from_source:
+            return []
+        return get_part_file_targets(self.insert_source_task.output().path)
+
+    def _execute_autocommit(self, queries):
+        """Executes queries, like DDL statements that commit implicitly, outside of the main transaction."""
+        connection = self.output().connect(autocommit=True)
+        try:
+            cursor = connection.cursor()
+            for query in queries:
+                log.debug(query)
+                cursor.execute(query)
+        finally:
+            connection.close()
+
+    def load_staging_table(self, part_targets):
+        """
+        Loads the part files into a new staging table over concurrent connections, returning the number of rows.
+
+        Each part file is loaded and committed in its own transaction, so that only the copy of the staging table into
+        the table is part of the task's transaction.
+        """
+        self._execute_autocommit([
+            "DROP TABLE IF EXISTS {staging_table}".format(staging_table=self.staging_table),
+            "CREATE TABLE {staging_table} LIKE {table}".format(staging_table=self.staging_table, table=self.table),
+        ])
+        pool = ThreadPool(min(self.load_connections, len(part_targets)))
+        try:
+            row_counts = pool.map(self._load_part_file, part_targets)
+        finally:
+            pool.close()
+            pool.join()
+        log.debug("Loaded %d rows from %d part files into table %s", sum(row_counts), len(part_targets),
+                  self.staging_table)
+        return sum(row_counts)
+
+    def _load_part_file(self, input_target):
+        """Loads one part file into the staging table over a new connection, returning the number of rows."""
+        connection = self.output().connect()
+        try:
+            cursor = connection.cursor()
+            lines = self._source_lines(input_target)
+            if self.use_load_data:
+                with tempfile.NamedTemporaryFile(prefix='mysql_load_{0}_'.format(self.table), suffix='.tsv') as data_file:
+                    row_count = self._write_source_lines(data_file, lines)
+                    if row_count > 0:
+                        self._load_data_file(cursor, data_file, self.staging_table)
+            else:
+                rows = (line.strip('\n').split('\t') for line in lines)
+                row_count = self._insert_row_values(cursor, rows, self.staging_table)
+            connection.commit()
+        finally:
+            connection.close()
+        return row_count
+
+    def insert_rows_from_staging_table(self, cursor, row_count):
+        """Copies the rows loaded into the staging table into the table."""
+        self._check_row_count(row_count)
+        column_names = ','.join(self.column_names)
+        query = "INSERT INTO {table} ({column_names}) SELECT {column_names} FROM {staging_table}".format(
+            table=self.table,
+            column_names=column_names,
+            staging_table=self.staging_table,
+        )
+        log.debug(query)
+        cursor.execute(query)
 
     def run(self):
         """
@@ -345,18 +568,26 @@ class MysqlInsertTask(MysqlInsertTaskMixin, luigi.Task):
         # create databases using a separate connection which is not database specific
         self.create_database()
 
+        part_targets = self.get_source_part_targets()
+
         connection = self.output().connect()
         try:
             # create table only if necessary:
             self.create_table(connection)
 
+            if part_targets:
+                staged_row_count = self.load_staging_table(part_targets)
+
             # This prevents gap locks when updating the marker table, enabling us to insert and update records in that
             # table with impunity from other sessions.
             connection.cursor().execute("SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED")
 
             self.init_copy(connection)
             cursor = connection.cursor()
-            self.insert_rows(cursor)
+            if part_targets:
+                self.insert_rows_from_staging_table(cursor, staged_row_count)
+            else:
+                self.insert_rows(cursor)
 
             # mark as complete in same transaction
             self.output().touch(connection)
@@ -368,6 +599,8 @@ class MysqlInsertTask(MysqlInsertTaskMixin, luigi.Task):
             raise
         finally:
             connection.close()
+            if part_targets:
+                self._execute_autocommit(["DROP TABLE IF EXISTS {0}".format(self.staging_table)])
 
     def check_mysql_availability(self):
         if not mysql_client_available:
@@ -384,15 +617,35 @@ def coerce_for_mysql_connect(input):
     """
     if not isinstance(input, basestring):
         return input
-    # Hive indicates a null value with the string "\N"
-    # We represent an infinite value with the string "inf", MySQL has no such representation so we use NULL
-    if input in ('None', '\\N', 'inf', '-inf'):
+    if input in NULL_VALUES:
         return None
     if isinstance(input, str):
         return input.decode('utf-8')
     return input
 
 
+def format_for_load_data(value):
+    """
+    Given a value which could be any python type, format it as a field of a file loaded by LOAD DATA INFILE.
+
+    None is written as "\\N", which is loaded as NULL along with the other NULL_VALUES.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, unicode):
+        value = value.encode('utf-8')
+    elif isinstance(value, float):
+        # str() of a float only keeps 12 significant digits.
+        value = repr(value)
+    elif not isinstance(value, str):
+        value = str(value)
+    if '\t' in value or '\n' in value:
+        raise ValueError('Cannot load a value containing a tab or a newline with LOAD DATA INFILE: {0!r}'.format(value))
+    return value
+
+
 def get_mysql_query_results(credentials, database, query):
     """
     Executes a mysql query on the provided database and returns the results.
@@ -430,10 +683,11 @@ class CredentialFileMysqlTarget(MySqlTarget):
         table (str): The name of the table in the database that is being modified.
         update_id (str): A unique identifier for this update to the table. Subsequent updates with identical update_id
             values will not be executed.
+        cnx_kwargs: Additional arguments for the mysql connector's connect().
 
     """
 
-    def __init__(self, credentials_target, database_name, table, update_id):
+    def __init__(self, credentials_target, database_name, table, update_id, **cnx_kwargs):
         with credentials_target.open('r') as credentials_file:
             cred = json.load(credentials_file)
             return super(CredentialFileMysqlTarget, self).__init__(
@@ -443,7 +697,8 @@ class CredentialFileMysqlTarget(MySqlTarget):
                 user=cred.get('username'),
                 password=cred.get('password'),
                 table=table,
-                update_id=update_id
+                update_id=update_id,
+                **cnx_kwargs
             )
 
     def exists(self, connection=None):
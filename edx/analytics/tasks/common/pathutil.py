@@ -8,9 +8,14 @@ Supports outputs to HDFS, S3, and local FS.
 
 import datetime
 import fnmatch
+import hashlib
+import json
 import logging
 import os
 import re
+import sre_constants
+import sre_parse
+from multiprocessing.pool import ThreadPool
 
 import luigi
 import luigi.contrib.hdfs
@@ -19,11 +24,75 @@ import luigi.task
 from luigi.date_interval import Custom
 
 from edx.analytics.tasks.util import eventlog
-from edx.analytics.tasks.util.s3_util import ScalableS3Client, generate_s3_sources, get_s3_bucket_key_names
+from edx.analytics.tasks.util.s3_util import generate_s3_sources, get_s3_bucket, get_s3_bucket_key_names
 from edx.analytics.tasks.util.url import ExternalURL, UncheckedExternalURL, get_target_from_url, url_path_join
 
 log = logging.getLogger(__name__)
 
+# Matches the date in each "time" field of a raw tracking log line.  The event payload can have a "time" field of its
+# own, so a single line may contain several matches.
+EVENT_TIME_DATE_PATTERN = re.compile(r'"time"\s*:\s*"(\d{4}-\d{2}-\d{2})')
+
+# Files for a date are assumed to all have been written once this many days have passed since the date, so the listing
+# of those files can be stored in the listing index.  More recent dates are listed again on every run.
+LISTING_INDEX_SETTLED_DAYS = 2
+
+# Implicit events use the URL that was requested as their event_type, so there is an unbounded number of them.  They
+# are all stored together in a single partition of the event store.
+IMPLICIT_EVENT_PARTITION = '_implicit'
+
+
+def get_event_type_partition(event_type):
+    """Returns the name of the event store partition that events of the given type are stored in."""
+    if not isinstance(event_type, basestring) or not event_type or '/' in event_type:
+        return IMPLICIT_EVENT_PARTITION
+    return re.sub(r'[^\w.-]', '_', event_type)
+
+
+def get_event_store_pattern(event_types=None, root=None):
+    """
+    Returns a pattern that matches the files in the event store holding events of the given types.
+
+    The pattern has a named "date" group that captures the date of the partition in "%Y-%m-%d" format.  If the URL of
+    the store is given as the `root`, the pattern only matches files in that store, which allows the files of each date
+    to be listed directly.
+    """
+    if event_types is None:
+        event_type_pattern = r'[^/]+'
+    else:
+        partitions = sorted(set(get_event_type_partition(event_type) for event_type in event_types))
+        event_type_pattern = '(?:{0})'.format('|'.join(re.escape(partition) for partition in partitions))
+    root_pattern = re.escape(root.rstrip('/')) if root is not None else '.*'
+    return root_pattern + r'/dt=(?P<date>\d{{4}}-\d{{2}}-\d{{2}})/event_type={0}/[^/]+$'.format(event_type_pattern)
+
+
+def get_date_prefix(pattern):
+    """
+    Returns the literal text that the pattern requires URLs to start with before its "date" group.
+
+    Returns None if the pattern has no "date" group, or if anything other than literal text precedes that group, in
+    which case the URLs that match the pattern can't be listed by date.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except sre_constants.error:
+        return None
+    date_group = parsed.pattern.groupdict.get('date')
+    if date_group is None or parsed.pattern.flags & sre_constants.SRE_FLAG_IGNORECASE:
+        return None
+
+    prefix = []
+    for opcode, argument in parsed:
+        if opcode == sre_constants.LITERAL:
+            prefix.append(unichr(argument))
+        elif opcode == sre_constants.AT and argument == sre_constants.AT_BEGINNING:
+            continue
+        elif opcode == sre_constants.SUBPATTERN and argument[0] == date_group:
+            return u''.join(prefix)
+        else:
+            return None
+    return None
+
 
 class PathSetTask(luigi.Task):
     """
@@ -47,18 +116,11 @@ class PathSetTask(luigi.Task):
         description='If True, include files/directories with size zero.',
     )
 
-    def __init__(self, *args, **kwargs):
-        super(PathSetTask, self).__init__(*args, **kwargs)
-        self.s3_conn = None
-
     def generate_file_list(self):
         """Yield each individual path given a source folder and a set of file-matching expressions."""
         for src in self.src:
             if src.startswith('s3'):
-                # connect lazily as needed:
-                if self.s3_conn is None:
-                    self.s3_conn = ScalableS3Client().s3
-                for _bucket, _root, path in generate_s3_sources(self.s3_conn, src, self.include, self.include_zero_length):
+                for _bucket, _root, path in generate_s3_sources(None, src, self.include, self.include_zero_length):
                     source = url_path_join(src, path)
                     yield ExternalURL(source)
             elif src.startswith('hdfs'):
@@ -104,6 +166,25 @@ class PathSetTask(luigi.Task):
         return [task.output() for task in self.requires()]
 
 
+def get_part_file_targets(url):
+    """
+    Returns targets for the data files in a directory, such as the output of a Hive query or a Hadoop job, sorted by URL.
+
+    Files whose path below the directory has a component starting with "_" or ".", like "_SUCCESS", are skipped, as are
+    empty files on S3 and HDFS.  The list is empty if the URL is not a directory or contains no data files.
+    """
+    part_targets = []
+    for task in PathSetTask([url], ['*']).generate_file_list():
+        if task.url.startswith(url):
+            relative_path = task.url[len(url):].strip('/')
+        else:
+            relative_path = task.url.rsplit('/', 1)[-1]
+        if any(component.startswith(('_', '.')) for component in relative_path.split('/')):
+            continue
+        part_targets.append(task.output())
+    return sorted(part_targets, key=lambda target: target.path)
+
+
 class EventLogSelectionDownstreamMixin(object):
     """Defines parameters for passing upstream to tasks that use EventLogSelectionMixin."""
 
@@ -132,6 +213,13 @@ class EventLogSelectionDownstreamMixin(object):
         'named capture group for date in the pattern parameter. This is intended to select relevant event log files '
         'by making sure the date is within the interval.',
     )
+    event_store = luigi.Parameter(
+        config_path={'section': 'event-logs', 'name': 'event_store'},
+        default=None,
+        significant=False,
+        description='A URL to an event store written by EventStoreTask.  If specified, events are read from the store '
+        'instead of from the raw tracking logs in `source`.',
+    )
 
 
 class PathSelectionByDateIntervalTask(EventLogSelectionDownstreamMixin, luigi.WrapperTask):
@@ -142,7 +230,25 @@ class PathSelectionByDateIntervalTask(EventLogSelectionDownstreamMixin, luigi.Wr
     that a pattern can be used to find them. Filenames are expected to contain a date which represents an approximation
     of the date found in the events themselves.
 
+    When every pattern that applies to a source consists of literal text followed by the "date" group, only the files
+    starting with that text followed by each date of the interval, formatted with `date_pattern`, are listed.  These
+    listings can be stored in a listing index, so that the files of a date are only listed once.  Otherwise the whole
+    source is listed, with the top-level folders of S3 sources listed concurrently.
+
     """
+    listing_concurrency = luigi.IntParameter(
+        config_path={'section': 'event-logs', 'name': 'listing_concurrency'},
+        default=10,
+        significant=False,
+        description='The maximum number of prefixes to list at the same time.',
+    )
+    listing_index_root = luigi.Parameter(
+        config_path={'section': 'event-logs', 'name': 'listing_index_root'},
+        default=None,
+        significant=False,
+        description='A URL to a directory where the files found for each date of each source are stored, so that they '
+        'are not listed again by later runs.  Only used for sources whose files can be listed by date.',
+    )
 
     def __init__(self, *args, **kwargs):
         super(PathSelectionByDateIntervalTask, self).__init__(*args, **kwargs)
@@ -170,7 +276,10 @@ class PathSelectionByDateIntervalTask(EventLogSelectionDownstreamMixin, luigi.Wr
         """
         url_gens = []
         for source in self.source:
-            if source.startswith('s3'):
+            url_prefixes_by_date = self._get_url_prefixes_by_date(source)
+            if url_prefixes_by_date is not None:
+                url_gens.append(self._get_urls_by_date(source, url_prefixes_by_date))
+            elif source.startswith('s3'):
                 url_gens.append(self._get_s3_urls(source))
             elif source.startswith('hdfs'):
                 url_gens.append(self._get_hdfs_urls(source))
@@ -184,15 +293,156 @@ class PathSelectionByDateIntervalTask(EventLogSelectionDownstreamMixin, luigi.Wr
 
         return [UncheckedExternalURL(url) for url_gen in url_gens for url in url_gen if self.should_include_url(url)]
 
+    def _get_url_prefixes_by_date(self, source):
+        """
+        Returns a dict mapping each date of the interval to the URL prefixes of the source's files for that date.
+
+        Returns None if the files that match the patterns can't be listed by date.
+        """
+        prefixes = []
+        for pattern in self.pattern:
+            prefix = get_date_prefix(pattern)
+            if prefix is None:
+                return None
+            elif prefix.startswith(source):
+                prefixes.append(prefix)
+            elif source.startswith(prefix):
+                return None
+            # Otherwise, the pattern can't match any of the files of this source.
+
+        return {
+            date: [prefix + date.strftime(self.date_pattern) for prefix in prefixes]
+            for date in self.interval.dates()
+        }
+
+    def _get_urls_by_date(self, source, url_prefixes_by_date):
+        """Yields the URLs of the files of the source that start with the prefixes for each date."""
+        index = self._load_listing_index(source) if self.listing_index_root else {}
+        settled_before = datetime.datetime.utcnow().date() - datetime.timedelta(days=LISTING_INDEX_SETTLED_DAYS)
+        dates_to_list = [
+            date for date in sorted(url_prefixes_by_date) if date not in index or date >= settled_before
+        ]
+        log.debug('Listing %d of %d dates of source %s', len(dates_to_list), len(url_prefixes_by_date), source)
+
+        prefixes_to_list = [
+            (date, url_prefix) for date in dates_to_list for url_prefix in url_prefixes_by_date[date]
+        ]
+        listings = self._map_concurrently(
+            lambda date_and_prefix: self._list_url_prefix(source, date_and_prefix[1]), prefixes_to_list
+        )
+        listed_files = {date: [] for date in dates_to_list}
+        for (date, _url_prefix), files in zip(prefixes_to_list, listings):
+            listed_files[date].extend(files)
+
+        if self.listing_index_root:
+            settled_dates = [date for date in dates_to_list if date < settled_before]
+            if settled_dates:
+                for date in settled_dates:
+                    index[date] = listed_files[date]
+                self._save_listing_index(source, index)
+
+        seen_urls = set()
+        for date in sorted(url_prefixes_by_date):
+            files = listed_files[date] if date in listed_files else index[date]
+            for url, _size in files:
+                if url not in seen_urls:
+                    seen_urls.add(url)
+                    yield url
+
+    def _map_concurrently(self, func, items):
+        """Returns the results of calling the function for each item, using up to `listing_concurrency` threads."""
+        if self.listing_concurrency <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        pool = ThreadPool(min(self.listing_concurrency, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _list_url_prefix(self, source, url_prefix):
+        """Returns a list of (url, size) pairs for the files of the source whose URLs start with the prefix."""
+        if source.startswith('s3'):
+            bucket_name, root = get_s3_bucket_key_names(source)
+            _bucket_name, key_prefix = get_s3_bucket_key_names(url_prefix)
+            return self._list_s3_keys(source, bucket_name, root, key_prefix)
+        elif source.startswith('hdfs'):
+            try:
+                listing = luigi.contrib.hdfs.listdir(url_prefix + '*', recursive=True, include_size=True)
+                return [(url, size) for url, size in listing if url.startswith(url_prefix)]
+            except luigi.contrib.hdfs.HDFSCliError:
+                # Raised when there are no matching files.
+                return []
+        else:
+            directory, name_prefix = os.path.split(url_prefix)
+            if not os.path.isdir(directory):
+                return []
+            files = []
+            for name in sorted(os.listdir(directory)):
+                if not name.startswith(name_prefix):
+                    continue
+                path = os.path.join(directory, name)
+                paths = self._get_local_urls(path) if os.path.isdir(path) else [path]
+                files.extend((file_path, os.path.getsize(file_path)) for file_path in paths)
+            return files
+
+    @staticmethod
+    def _list_s3_keys(source, bucket_name, root, key_prefix):
+        """Returns a list of (url, size) pairs for the non-empty keys of the source that start with the key prefix."""
+        bucket = get_s3_bucket(bucket_name)
+        return [
+            (url_path_join(source, key_metadata.key[len(root):].lstrip('/')), key_metadata.size)
+            for key_metadata in bucket.list(key_prefix)
+            if key_metadata.size > 0
+        ]
+
+    def _get_listing_index_url(self, source):
+        """Returns the URL of the listing index of the source, which depends on how its files are selected."""
+        index_id = hashlib.md5(json.dumps([source, list(self.pattern), self.date_pattern])).hexdigest()
+        return url_path_join(self.listing_index_root, 'listing_{0}.json'.format(index_id))
+
+    def _load_listing_index(self, source):
+        """Returns a dict mapping dates to the lists of (url, size) pairs stored in the listing index of the source."""
+        index_target = get_target_from_url(self._get_listing_index_url(source))
+        index = {}
+        if index_target.exists():
+            with index_target.open('r') as index_file:
+                for line in index_file:
+                    entry = json.loads(line)
+                    date = datetime.datetime.strptime(entry['date'], '%Y-%m-%d').date()
+                    index[date] = [(url, size) for url, size in entry['files']]
+        return index
+
+    def _save_listing_index(self, source, index):
+        """Writes the listing index of the source, with one line for each date."""
+        with get_target_from_url(self._get_listing_index_url(source)).open('w') as index_file:
+            for date in sorted(index):
+                index_file.write(json.dumps({'date': date.isoformat(), 'files': index[date]}))
+                index_file.write('\n')
+
     def _get_s3_urls(self, source):
-        """Recursively list all files inside the source URL directory."""
-        s3_conn = ScalableS3Client().s3
+        """
+        Recursively list all files inside the source URL directory.
+
+        The top-level folders of the directory are listed concurrently.
+        """
         bucket_name, root = get_s3_bucket_key_names(source)
-        bucket = s3_conn.get_bucket(bucket_name)
-        for key_metadata in bucket.list(root):
-            if key_metadata.size > 0:
-                key_path = key_metadata.key[len(root):].lstrip('/')
-                yield url_path_join(source, key_path)
+        root_with_slash = root + '/' if root else root
+        bucket = get_s3_bucket(bucket_name)
+        folder_prefixes = []
+        for key_metadata in bucket.list(root_with_slash, delimiter='/'):
+            # Prefixes of common key names, returned when listing with a delimiter, have no size.
+            if not hasattr(key_metadata, 'size'):
+                folder_prefixes.append(key_metadata.name)
+            elif key_metadata.size > 0:
+                yield url_path_join(source, key_metadata.key[len(root):].lstrip('/'))
+
+        listings = self._map_concurrently(
+            lambda folder_prefix: self._list_s3_keys(source, bucket_name, root, folder_prefix), folder_prefixes
+        )
+        for listing in listings:
+            for url, _size in listing:
+                yield url
 
     def _get_hdfs_urls(self, source):
         """Recursively list all files inside the source directory on the hdfs filesystem."""
@@ -249,8 +499,31 @@ class EventLogSelectionMixin(EventLogSelectionDownstreamMixin):
 
     """
 
+    # Set by EventLogFanOutTask to a (line, event) tuple when it has already decoded the line being mapped.
+    preparsed_event = None
+
+    # The event types that the mapper makes use of.  When reading from the event store, only the partitions for these
+    # event types are read.  None means that all events are needed.
+    event_types = None
+
+    # Lines that contain none of these substrings are discarded before they are decoded.  Defaults to `event_types`.
+    event_line_substrings = None
+
+    # A regular expression that lines must match, starting at the beginning of the line, to be decoded.
+    event_line_pattern = None
+
     def requires(self):
         """Use PathSelectionByDateIntervalTask to define inputs."""
+        if self.event_store:
+            # The store is partitioned by the date of the events themselves, so there is no need to expand the interval.
+            return PathSelectionByDateIntervalTask(
+                source=[self.event_store],
+                interval=self.interval,
+                pattern=[get_event_store_pattern(self.event_types, root=self.event_store)],
+                date_pattern='%Y-%m-%d',
+                expand_interval=datetime.timedelta(0),
+            )
+
         return PathSelectionByDateIntervalTask(
             source=self.source,
             interval=self.interval,
@@ -264,9 +537,50 @@ class EventLogSelectionMixin(EventLogSelectionDownstreamMixin):
         self.lower_bound_date_string = self.interval.date_a.strftime('%Y-%m-%d')  # pylint: disable=no-member
         self.upper_bound_date_string = self.interval.date_b.strftime('%Y-%m-%d')  # pylint: disable=no-member
 
+        substrings = self.event_line_substrings
+        if substrings is None:
+            substrings = self.event_types
+        self.required_line_substrings = tuple(substrings) if substrings is not None else None
+        self.required_line_regex = re.compile(self.event_line_pattern) if self.event_line_pattern else None
+        # Tasks that read the time from elsewhere in the event cannot have the date checked before decoding the line.
+        self.prefilter_event_date = (
+            getattr(self.get_event_time, '__func__', None) is EventLogSelectionMixin.get_event_time.__func__
+        )
+
+    def is_candidate_event_line(self, line):
+        """
+        Returns False if the raw line can be discarded without decoding it.
+
+        This is a cheap, conservative check: lines that pass it may still be discarded once they are decoded.
+        """
+        if self.required_line_substrings is not None:
+            for substring in self.required_line_substrings:
+                if substring in line:
+                    break
+            else:
+                return False
+
+        if self.required_line_regex is not None and not self.required_line_regex.match(line):
+            return False
+
+        if self.prefilter_event_date:
+            # Only discard the line if every "time" field in it is outside of the interval, since the one at the top
+            # level of the event is not necessarily the first one in the line.
+            date_strings = EVENT_TIME_DATE_PATTERN.findall(line)
+            if date_strings and not any(
+                    self.lower_bound_date_string <= date_string < self.upper_bound_date_string
+                    for date_string in date_strings
+            ):
+                return False
+
+        return True
+
     def get_event_and_date_string(self, line):
         """Default mapper implementation, that always outputs the log line, but with a configurable key."""
-        event = eventlog.parse_json_event(line)
+        if not self.is_candidate_event_line(line):
+            return None
+
+        event = self.decode_event_line(line)
         if event is None:
             self.incr_counter('Event', 'Discard Unparseable Event', 1)
             return None
@@ -283,11 +597,25 @@ class EventLogSelectionMixin(EventLogSelectionDownstreamMixin):
         date_string = event_time.split("T")[0]
 
         if date_string < self.lower_bound_date_string or date_string >= self.upper_bound_date_string:
-            # Slow: self.incr_counter('Event', 'Discard Outside Date Interval', 1)
+            self.incr_counter('Event', 'Discard Outside Date Interval', 1)
             return None
 
         return event, date_string
 
+    def decode_event_line(self, line):
+        """
+        Returns the event parsed from a raw tracking log line, or None if the line cannot be parsed.
+
+        Reuses the event handed over by an EventLogFanOutTask when the line has already been decoded.
+        """
+        preparsed_event = self.preparsed_event
+        if preparsed_event is not None and preparsed_event[0] is line:
+            return preparsed_event[1]
+        if self.event_store:
+            # The complete event is stored in the last column of each row in the store.
+            line = line.rsplit('\t', 1)[-1]
+        return eventlog.parse_json_event(line)
+
     def get_event_time(self, event):
         """Returns time information from event if present, else returns None."""
         try:
@@ -1,9 +1,11 @@
 import ast
+import hashlib
 import importlib
 import json
 import logging
 import os
 import shutil
+import sys
 import tempfile
 import zipfile
 from collections import defaultdict
@@ -12,8 +14,15 @@ import luigi
 import luigi.configuration
 from luigi.contrib.spark import PySparkTask
 
+from edx.analytics.tasks.util.url import get_target_from_url, url_path_join
+
 _file_path_to_package_meta_path = {}
 
+# Package archives are cached here if no 'package_archive_cache_dir' is configured in the 'spark' section.
+DEFAULT_PACKAGE_ARCHIVE_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'spark-package-archives')
+# Names of the distribution metadata directories that are installed next to packages.
+PACKAGE_METADATA_SUFFIXES = ('.dist-info', '.egg-info', '.egg-link')
+
 log = logging.getLogger(__name__)
 
 
@@ -47,36 +56,24 @@ def dereference(f):
         return f
 
 
-def create_packages_archive(packages, archive_dir_path):
-    """
-    Create a zip archive for all the packages listed in packages and returns the list of zip file location.
-    """
-    archives_list = []
-    package_metadata_paths = get_package_metadata_paths()
-    metadata_to_add = dict()
+def _get_files_for_package(sub_package_path, root_package_path, root_package_name):
+    """Yields (source path, archive path) pairs for the files found under a package directory."""
+    for root, dirs, files in os.walk(sub_package_path):
+        if '.svn' in dirs:
+            dirs.remove('.svn')
+        for f in sorted(files):
+            if not f.endswith(".pyc") and not f.startswith("."):
+                yield dereference(root + "/" + f), root.replace(root_package_path, root_package_name) + "/" + f
 
-    package_zip_path = os.path.join(archive_dir_path, 'packages.zip')
-    package_zip = zipfile.ZipFile(package_zip_path, "w", compression=zipfile.ZIP_DEFLATED)
-    archives_list.append(package_zip_path)
 
-    def add(src, dst, package_name):
-        # Ensure any entry points and other egg-info metadata is also transmitted along with
-        # this file. If it is associated with any egg-info directories, ship them too.
-        metadata_path = package_metadata_paths.get(os.path.realpath(src))
-        if metadata_path:
-            metadata_to_add[package_name] = metadata_path
-
-        package_zip.write(src, dst)
-
-    def add_files_for_package(sub_package_path, root_package_path, root_package_name, package_name):
-        for root, dirs, files in os.walk(sub_package_path):
-            if '.svn' in dirs:
-                dirs.remove('.svn')
-            for f in files:
-                if not f.endswith(".pyc") and not f.startswith("."):
-                    add(dereference(root + "/" + f),
-                        root.replace(root_package_path, root_package_name) + "/" + f,
-                        package_name)
+def get_package_files(packages):
+    """
+    List the files to archive for all the packages listed in packages.
+
+    Returns a list of (source path, archive path, package name) tuples.  Package metadata is not included, since finding
+    it requires a scan of every installed distribution; see create_packages_archive().
+    """
+    package_files = []
 
     for package in packages:
         # Archive each package
@@ -106,27 +103,130 @@ def create_packages_archive(packages, archive_dir_path):
                     module_name = '.'.join(root)
                     directory = '/'.join(root)
 
-                    add(dereference(__import__(module_name, None, None, 'non_empty').__path__[0] + "/__init__.py"),
+                    package_files.append((
+                        dereference(__import__(module_name, None, None, 'non_empty').__path__[0] + "/__init__.py"),
                         directory + "/__init__.py",
-                        package.__name__)
+                        package.__name__
+                    ))
 
-                add_files_for_package(p, p, n, package.__name__)
+                for src, dst in _get_files_for_package(p, p, n):
+                    package_files.append((src, dst, package.__name__))
 
         else:
             f = package.__file__
             if f.endswith("pyc"):
                 f = f[:-3] + "py"
             if n.find(".") == -1:
-                add(dereference(f), os.path.basename(f), package.__name__)
+                package_files.append((dereference(f), os.path.basename(f), package.__name__))
             else:
-                add(dereference(f), n + ".py", package.__name__)
+                package_files.append((dereference(f), n + ".py", package.__name__))
+
+    return package_files
+
+
+def get_packages_content_hash(packages, package_files=None):
+    """
+    Returns a hex digest of the content of the files to archive for the packages listed in packages.
+
+    Instead of looking up the metadata of the packages, the names and modification times of the metadata directories
+    installed next to the top-level packages are included, so that installing or upgrading a distribution changes the
+    hash.
+    """
+    if package_files is None:
+        package_files = get_package_files(packages)
+
+    digest = hashlib.sha1()
+    for src, dst, _package_name in package_files:
+        with open(src, 'rb') as package_file:
+            digest.update('{}\0{}\0'.format(dst, hashlib.sha1(package_file.read()).hexdigest()))
+
+    installation_dirs = set()
+    for package in packages:
+        top_level_package = sys.modules[package.__name__.split('.')[0]]
+        top_level_path = (getattr(top_level_package, '__path__', None) or [top_level_package.__file__])[0]
+        installation_dirs.add(os.path.dirname(os.path.realpath(top_level_path)))
+    for installation_dir in sorted(installation_dirs):
+        for name in sorted(os.listdir(installation_dir)):
+            if name.endswith(PACKAGE_METADATA_SUFFIXES):
+                mtime = os.path.getmtime(os.path.join(installation_dir, name))
+                digest.update('{}\0{}\0{!r}\0'.format(installation_dir, name, mtime))
+
+    return digest.hexdigest()
+
+
+def create_packages_archive(packages, archive_dir_path, archive_name='packages.zip', package_files=None):
+    """
+    Create a zip archive for all the packages listed in packages and returns the list of zip file location.
+    """
+    if package_files is None:
+        package_files = get_package_files(packages)
+    package_metadata_paths = get_package_metadata_paths()
+
+    package_zip_path = os.path.join(archive_dir_path, archive_name)
+    with zipfile.ZipFile(package_zip_path, "w", compression=zipfile.ZIP_DEFLATED) as package_zip:
+        # Ensure any entry points and other egg-info metadata is also transmitted along with
+        # the files of a package. If they are associated with any egg-info directories, ship them too.
+        metadata_to_add = []
+        for src, dst, _package_name in package_files:
+            package_zip.write(src, dst)
+            metadata_path = package_metadata_paths.get(os.path.realpath(src))
+            if metadata_path and metadata_path not in metadata_to_add:
+                metadata_to_add.append(metadata_path)
 
         # include metadata in the same zip file
-        metadata_path = metadata_to_add.get(package.__name__)
-        if metadata_path is not None:
-            add_files_for_package(metadata_path, metadata_path, os.path.basename(metadata_path), package.__name__)
+        for metadata_path in metadata_to_add:
+            for src, dst in _get_files_for_package(metadata_path, metadata_path, os.path.basename(metadata_path)):
+                package_zip.write(src, dst)
 
-    return archives_list
+    return [package_zip_path]
+
+
+def get_cached_packages_archive(packages, cache_dir, remote_cache_url=None):
+    """
+    Returns the location of a zip archive for all the packages listed in packages, reusing a previously built one.
+
+    Archives are stored in cache_dir, named by the hash of the content of the packages, so an archive is only built
+    when the packages change.  If a remote_cache_url is given, archives are also looked up there when they are not in
+    cache_dir, and are uploaded there when they are built.
+    """
+    package_files = get_package_files(packages)
+    archive_name = 'packages-{}.zip'.format(get_packages_content_hash(packages, package_files))
+    archive_path = os.path.join(cache_dir, archive_name)
+    if os.path.exists(archive_path):
+        log.info('Using cached package archive %s', archive_path)
+        return archive_path
+
+    try:
+        os.makedirs(cache_dir)
+    except OSError:
+        if not os.path.isdir(cache_dir):
+            raise
+
+    # Archives are written to a temporary directory first and then renamed, so concurrent runs never see a partial
+    # archive.
+    build_dir = tempfile.mkdtemp(dir=cache_dir)
+    try:
+        build_path = os.path.join(build_dir, archive_name)
+        remote_target = None
+        if remote_cache_url:
+            remote_target = get_target_from_url(url_path_join(remote_cache_url, archive_name))
+
+        if remote_target is not None and remote_target.exists():
+            log.info('Downloading cached package archive %s', remote_target.path)
+            with remote_target.open('r') as input_file, open(build_path, 'wb') as output_file:
+                shutil.copyfileobj(input_file, output_file)
+        else:
+            log.info('Building package archive %s', archive_path)
+            create_packages_archive(packages, build_dir, archive_name=archive_name, package_files=package_files)
+            if remote_target is not None:
+                with open(build_path, 'rb') as input_file, remote_target.open('w') as output_file:
+                    shutil.copyfileobj(input_file, output_file)
+
+        os.rename(build_path, archive_path)
+    finally:
+        shutil.rmtree(build_dir)
+
+    return archive_path
 
 
 class SparkMixin():
@@ -283,6 +383,8 @@ class SparkJobTask(SparkMixin, PySparkTask):
         # Add information about prebuilt modules here, to make sure that we grab that information even
         # if the client didn't explicitly request it for their task.
         self.request_configuration_from_luigi('spark', 'prebuilt_python_modules')
+        self.request_configuration_from_luigi('spark', 'package_archive_cache_dir')
+        self.request_configuration_from_luigi('spark', 'package_archive_cache_url')
 
         luigi_config = luigi.configuration.get_config()
         for requested_section in self._requested_config:
@@ -312,6 +414,9 @@ class SparkJobTask(SparkMixin, PySparkTask):
         Any packages that it doesn't find already prebuilt, it will add to a single zipfile, and this will also be loaded
         onto the Spark worker nodes.
 
+        The zipfile is named by the hash of the content of the packages and is cached in the 'package_archive_cache_dir'
+        directory, and optionally in 'package_archive_cache_url', so it is only rebuilt when the packages change.
+
         Loading of packages via a single zipfile is adequate for most packages.  However, it is not adequate for
         packages like opaque_keys or ccx_keys, which must provide extension point metadata information in order to
         work properly as Stevedore-based plugins.
@@ -334,7 +439,13 @@ class SparkJobTask(SparkMixin, PySparkTask):
                 packages_to_archive.append(mod)
 
         if packages_to_archive:
-            dependencies_list += create_packages_archive(packages_to_archive, self._tmp_dir)
+            dependencies_list.append(get_cached_packages_archive(
+                packages_to_archive,
+                self.spark_get_config_from_args(
+                    'spark', 'package_archive_cache_dir', default_value=DEFAULT_PACKAGE_ARCHIVE_CACHE_DIR
+                ),
+                remote_cache_url=self.spark_get_config_from_args('spark', 'package_archive_cache_url'),
+            ))
 
         self.log.warn("List of dependencies to load into Spark context: {}".format(dependencies_list))
         if len(dependencies_list) > 0:
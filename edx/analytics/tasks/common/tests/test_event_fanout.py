@@ -0,0 +1,227 @@
+"""Tests for the shared event log scan in event_fanout.py."""
+
+from __future__ import absolute_import
+
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import luigi
+import luigi.task
+from mock import patch
+
+from edx.analytics.tasks.common.event_fanout import EventLogFanOutTask
+from edx.analytics.tasks.common.mapreduce import MapReduceJobTask
+from edx.analytics.tasks.common.pathutil import EventLogSelectionMixin
+from edx.analytics.tasks.util import eventlog
+from edx.analytics.tasks.util.url import get_target_from_url
+
+
+class EventTypeCountTask(EventLogSelectionMixin, MapReduceJobTask):
+    """Counts events of each type per day."""
+
+    output_root = luigi.Parameter()
+
+    def mapper(self, line):
+        value = self.get_event_and_date_string(line)
+        if value is None:
+            return
+        event, date_string = value
+        # Check that consumers are free to add keys to the event they receive.
+        event['seen_by'] = 'type_count'
+        yield (date_string, event['event_type']), 1
+
+    def reducer(self, key, values):
+        yield key + (sum(values),)
+
+    def output(self):
+        return get_target_from_url(self.output_root)
+
+
+class UsernameTask(EventLogSelectionMixin, MapReduceJobTask):
+    """Lists the users that were active on each day."""
+
+    output_root = luigi.Parameter()
+
+    def mapper(self, line):
+        value = self.get_event_and_date_string(line)
+        if value is None:
+            return
+        event, date_string = value
+        if 'seen_by' in event:
+            raise AssertionError('Event modified by another consumer.')
+        yield date_string, event['username']
+
+    def reducer(self, key, values):
+        for username in sorted(set(values)):
+            yield key, username
+
+    def output(self):
+        return get_target_from_url(self.output_root)
+
+
+class FanOutTask(EventLogFanOutTask):
+    """Feeds the same events to an EventTypeCountTask and a UsernameTask."""
+
+    output_root = luigi.Parameter()
+
+    def consumer_tasks(self):
+        shared_args = {
+            'source': self.source,
+            'interval': self.interval,
+            'pattern': self.pattern,
+            'expand_interval': self.expand_interval,
+            'event_store': self.event_store,
+            'mapreduce_engine': self.mapreduce_engine,
+        }
+        return {
+            'type_count': EventTypeCountTask(output_root=os.path.join(self.output_root, 'type_count'), **shared_args),
+            'usernames': UsernameTask(output_root=os.path.join(self.output_root, 'usernames'), **shared_args),
+        }
+
+
+class EventLogFanOutTaskTest(unittest.TestCase):
+    """Tests for EventLogFanOutTask."""
+
+    def setUp(self):
+        luigi.task.Register.clear_instance_cache()
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.source = os.path.join(self.temp_dir, 'input')
+        os.makedirs(self.source)
+        self.output_root = os.path.join(self.temp_dir, 'output')
+
+    def create_task(self, **kwargs):
+        """Create a fan-out task that reads local tracking logs."""
+        task_args = {
+            'source': [self.source],
+            'interval': luigi.DateIntervalParameter().parse('2014-03-01-2014-03-03'),
+            'pattern': [r'.*tracking.log-(?P<date>\d{8}).*'],
+            'expand_interval': datetime.timedelta(0),
+            'mapreduce_engine': 'local',
+            'output_root': self.output_root,
+            'marker': os.path.join(self.temp_dir, 'marker'),
+        }
+        task_args.update(kwargs)
+        return FanOutTask(**task_args)
+
+    def create_event_line(self, event_type='play_video', username='test_user', time='2014-03-01T12:00:00.000000'):
+        """Create a tracking log line."""
+        return json.dumps({
+            'event_type': event_type,
+            'username': username,
+            'time': time,
+            'event': {},
+        })
+
+    def test_mapper_decodes_each_line_once(self):
+        task = self.create_task()
+        task.init_local()
+        line = self.create_event_line()
+
+        with patch('edx.analytics.tasks.util.eventlog.parse_json_event', wraps=eventlog.parse_json_event) as mock_parse:
+            output = list(task.mapper(line))
+
+        self.assertEqual(mock_parse.call_count, 1)
+        self.assertEqual(output, [
+            (('type_count', ('2014-03-01', 'play_video')), 1),
+            (('usernames', '2014-03-01'), 'test_user'),
+        ])
+
+    def test_mapper_with_event_store_rows(self):
+        task = self.create_task(event_store=os.path.join(self.temp_dir, 'store'))
+        task.init_local()
+        line = '2014-03-01\tplay_video\t' + self.create_event_line()
+
+        with patch('edx.analytics.tasks.util.eventlog.parse_json_event', wraps=eventlog.parse_json_event) as mock_parse:
+            output = list(task.mapper(line))
+
+        mock_parse.assert_called_once_with(self.create_event_line())
+        self.assertEqual(len(output), 2)
+
+    def test_event_types(self):
+        task = self.create_task()
+        self.assertIsNone(task.event_types)
+
+        with patch.object(EventTypeCountTask, 'event_types', ('play_video',)):
+            self.assertIsNone(task.event_types)
+            with patch.object(UsernameTask, 'event_types', ('seek_video', 'play_video')):
+                self.assertEqual(task.event_types, ('play_video', 'seek_video'))
+
+    def test_mapper_with_unparseable_line(self):
+        task = self.create_task()
+        task.init_local()
+
+        self.assertEqual(list(task.mapper('this is not json')), [])
+
+    def test_mapper_releases_preparsed_event(self):
+        task = self.create_task()
+        task.init_local()
+        list(task.mapper(self.create_event_line()))
+
+        for consumer in task.consumers.itervalues():
+            self.assertIsNone(consumer.preparsed_event)
+
+    def test_consumer_reading_other_logs(self):
+        class MismatchedFanOutTask(FanOutTask):
+            """Adds a consumer that reads a different date interval."""
+
+            def consumer_tasks(self):
+                consumers = super(MismatchedFanOutTask, self).consumer_tasks()
+                consumers['other'] = UsernameTask(
+                    source=self.source,
+                    interval=luigi.DateIntervalParameter().parse('2014-03-02'),
+                    pattern=self.pattern,
+                    expand_interval=self.expand_interval,
+                    mapreduce_engine=self.mapreduce_engine,
+                    output_root=os.path.join(self.output_root, 'other'),
+                )
+                return consumers
+
+        task_args = {
+            'source': [self.source],
+            'interval': luigi.DateIntervalParameter().parse('2014-03-01-2014-03-03'),
+            'pattern': [r'.*tracking.log-(?P<date>\d{8}).*'],
+            'expand_interval': datetime.timedelta(0),
+            'mapreduce_engine': 'local',
+            'output_root': self.output_root,
+        }
+        task = MismatchedFanOutTask(**task_args)
+        with self.assertRaises(ValueError):
+            task.init_local()
+
+    def test_run(self):
+        lines = [
+            self.create_event_line(),
+            self.create_event_line(username='other_user'),
+            self.create_event_line(event_type='pause_video', time='2014-03-02T01:00:00.000000'),
+            self.create_event_line(time='2014-03-05T01:00:00.000000'),
+            'garbage',
+        ]
+        with open(os.path.join(self.source, 'tracking.log-20140301'), 'w') as log_file:
+            log_file.write('\n'.join(lines) + '\n')
+
+        task = self.create_task()
+        task.run()
+
+        self.assertTrue(task.complete())
+        for consumer in task.consumers.itervalues():
+            self.assertTrue(os.path.exists(os.path.join(consumer.output_root, '_SUCCESS')))
+
+        self.assertEqual(self.read_output('type_count'), [
+            '2014-03-01\tplay_video\t2',
+            '2014-03-02\tpause_video\t1',
+        ])
+        self.assertEqual(self.read_output('usernames'), [
+            '2014-03-01\tother_user',
+            '2014-03-01\ttest_user',
+            '2014-03-02\ttest_user',
+        ])
+
+    def read_output(self, name):
+        """Read the part file written for the named consumer."""
+        with open(os.path.join(self.output_root, name, 'part-00000'), 'r') as output_file:
+            return [line.rstrip('\n') for line in output_file]
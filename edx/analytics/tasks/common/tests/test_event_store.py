@@ -0,0 +1,169 @@
+"""Tests for the date and event type partitioned event store."""
+
+import json
+import unittest
+
+import luigi
+import luigi.task
+from ddt import data, ddt, unpack
+
+from edx.analytics.tasks.common.event_store import EventStoreRecord, EventStoreTask
+from edx.analytics.tasks.common.mapreduce import MapReduceJobTask
+from edx.analytics.tasks.common.pathutil import (
+    EventLogSelectionMixin, PathSelectionByDateIntervalTask, get_event_store_pattern, get_event_type_partition
+)
+from edx.analytics.tasks.common.tests.map_reduce_mixins import MapperTestMixin
+
+
+class EventStoreTaskMapTest(MapperTestMixin, unittest.TestCase):
+    """Test the conversion of tracking log events into event store records."""
+
+    task_class = EventStoreTask
+
+    def setUp(self):
+        super(EventStoreTaskMapTest, self).setUp()
+        self.event_templates = {
+            'event': {
+                'username': 'test_user',
+                'event_source': 'server',
+                'event_type': 'edx.course.enrollment.activated',
+                'context': {
+                    'course_id': 'course-v1:FooX+1.23x+2013_Spring',
+                },
+                'time': '2013-12-17T15:38:32.805444+00:00',
+                'event': {
+                    'user_id': 10,
+                },
+            }
+        }
+        self.default_event_template = 'event'
+
+    def test_explicit_event(self):
+        line = self.create_event_log_line()
+        output = tuple(self.task.mapper(line))
+
+        self.assertEqual(len(output), 1)
+        key, value = output[0]
+        self.assertEqual(key, ('2013-12-17', 'edx.course.enrollment.activated'))
+
+        record = EventStoreRecord.from_tsv(value)
+        self.assertEqual(record.event_type, 'edx.course.enrollment.activated')
+        self.assertEqual(record.course_id, 'course-v1:FooX+1.23x+2013_Spring')
+        self.assertEqual(record.username, 'test_user')
+        self.assertEqual(record.time, '2013-12-17T15:38:32.805444+00:00')
+        self.assertEqual(record.event_source, 'server')
+        self.assertEqual(json.loads(record.event), self.create_event_dict())
+
+    def test_implicit_event(self):
+        line = self.create_event_log_line(event_type='/courses/FooX/1.23x/2013_Spring/info', context={})
+        output = tuple(self.task.mapper(line))
+
+        self.assertEqual(len(output), 1)
+        key, value = output[0]
+        self.assertEqual(key, ('2013-12-17', '_implicit'))
+        self.assertIsNone(EventStoreRecord.from_tsv(value).course_id)
+
+    def test_event_outside_interval(self):
+        line = self.create_event_log_line(time='2013-12-18T15:38:32.805444+00:00')
+        self.assert_no_map_output_for(line)
+
+    def test_malformed_username(self):
+        line = self.create_event_log_line(username=['test_user'])
+        self.assert_no_map_output_for(line)
+
+    def test_output_path_for_key(self):
+        self.assertEqual(
+            self.task.output_path_for_key(('2013-12-17', 'play_video')),
+            '/fake/output/dt=2013-12-17/event_type=play_video/events'
+        )
+
+
+class EventStoreReaderTask(EventLogSelectionMixin, MapReduceJobTask):
+    """A task that only needs video events."""
+
+    event_types = ('play_video', 'pause_video')
+
+    def mapper(self, line):
+        value = self.get_event_and_date_string(line)
+        if value is not None:
+            event, date_string = value
+            yield date_string, event['event_type']
+
+
+@ddt
+class EventStoreSelectionTest(unittest.TestCase):
+    """Test reading events from the event store."""
+
+    def setUp(self):
+        luigi.task.Register.clear_instance_cache()
+
+    @data(
+        ('play_video', 'play_video'),
+        ('edx.course.enrollment.activated', 'edx.course.enrollment.activated'),
+        ('/courses/FooX/1.23x/2013_Spring/info', '_implicit'),
+        ('', '_implicit'),
+        (None, '_implicit'),
+        ('problem check:fake', 'problem_check_fake'),
+    )
+    @unpack
+    def test_event_type_partition(self, event_type, expected_partition):
+        self.assertEqual(get_event_type_partition(event_type), expected_partition)
+
+    def test_selected_partitions(self):
+        task = EventStoreReaderTask(
+            interval=luigi.DateIntervalParameter().parse('2013-12-17'),
+            event_store='s3://fake/event_store/',
+            mapreduce_engine='local',
+        )
+        selection_task = task.requires()
+        self.assertIsInstance(selection_task, PathSelectionByDateIntervalTask)
+        self.assertEqual(selection_task.source, ('s3://fake/event_store/',))
+
+        selected_urls = [
+            url for url in [
+                's3://fake/event_store/dt=2013-12-16/event_type=play_video/events',
+                's3://fake/event_store/dt=2013-12-17/event_type=play_video/events',
+                's3://fake/event_store/dt=2013-12-17/event_type=pause_video/events',
+                's3://fake/event_store/dt=2013-12-17/event_type=seek_video/events',
+                's3://fake/event_store/dt=2013-12-17/event_type=_implicit/events',
+                's3://fake/event_store/dt=2013-12-18/event_type=play_video/events',
+            ] if selection_task.should_include_url(url)
+        ]
+        self.assertEqual(selected_urls, [
+            's3://fake/event_store/dt=2013-12-17/event_type=play_video/events',
+            's3://fake/event_store/dt=2013-12-17/event_type=pause_video/events',
+        ])
+
+    def test_pattern_for_all_event_types(self):
+        pattern = get_event_store_pattern()
+        self.assertRegexpMatches('s3://fake/event_store/dt=2013-12-17/event_type=_implicit/events', pattern)
+
+    def test_raw_logs_without_store(self):
+        task = EventStoreReaderTask(
+            interval=luigi.DateIntervalParameter().parse('2013-12-17'),
+            mapreduce_engine='local',
+        )
+        self.assertEqual(task.requires().source, ('s3://fake/input/', 's3://fake/input2/'))
+
+    def test_read_event_from_store(self):
+        task = EventStoreReaderTask(
+            interval=luigi.DateIntervalParameter().parse('2013-12-17'),
+            event_store='s3://fake/event_store/',
+            mapreduce_engine='local',
+        )
+        task.init_local()
+        event = {
+            'event_type': 'play_video',
+            'time': '2013-12-17T15:38:32.805444+00:00',
+            'event': '{"id": "i4x-foo-bar-baz"}',
+        }
+        record = EventStoreRecord(
+            event_type='play_video',
+            course_id=None,
+            username=None,
+            time=event['time'],
+            event_source=None,
+            event=json.dumps(event),
+        )
+
+        self.assertEqual(tuple(task.mapper(record.to_separated_values())), (('2013-12-17', 'play_video'),))
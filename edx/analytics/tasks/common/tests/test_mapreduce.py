@@ -2,6 +2,7 @@
 
 from __future__ import absolute_import
 
+import gzip
 import os
 import shutil
 import tempfile
@@ -11,7 +12,12 @@ import luigi
 from luigi.contrib.hdfs.target import HdfsTarget
 from mock import call, patch
 
-from edx.analytics.tasks.common.mapreduce import MapReduceJobTask, MultiOutputMapReduceJobTask
+from edx.analytics.tasks.common.mapreduce import (
+    EmulatedMapReduceJobRunner, MapReduceJobTask, MultiOutputMapReduceJobTask, MultiprocessMapReduceJobRunner,
+    SumValuesMixin
+)
+from edx.analytics.tasks.util.lru_cache import LruCache
+from edx.analytics.tasks.util.url import get_target_from_url
 
 
 class MapReduceJobTaskTest(unittest.TestCase):
@@ -176,3 +182,233 @@ class TestJobTask(MultiOutputMapReduceJobTask):
     def multi_output_reducer(self, _key, values, output_file):
         for value in values:
             output_file.write(value + '\n')
+
+
+class WordCountJobTask(MapReduceJobTask):
+    """Counts the words in the input files."""
+
+    input_root = luigi.Parameter()
+    output_path = luigi.Parameter()
+
+    def input_hadoop(self):
+        return get_target_from_url(self.input_root)
+
+    def mapper(self, line):
+        for word in line.split():
+            yield word, 1
+
+    def reducer(self, key, values):
+        yield key, sum(values)
+
+    def output(self):
+        return get_target_from_url(self.output_path)
+
+
+class CombinedWordCountJobTask(WordCountJobTask):
+    """Counts the words in the input files, summing the counts in the combiner."""
+
+    def combiner(self, key, values):
+        yield key, sum(values)
+
+
+class EmulatedMapReduceJobRunnerTest(unittest.TestCase):
+    """Tests for EmulatedMapReduceJobRunner."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.input_root = os.path.join(self.temp_dir, 'input')
+        os.makedirs(self.input_root)
+        self.output_path = os.path.join(self.temp_dir, 'output')
+
+        with open(os.path.join(self.input_root, 'part-00000'), 'w') as input_file:
+            for i in range(100):
+                input_file.write('foo bar {0}\n'.format(i % 7))
+        with gzip.open(os.path.join(self.input_root, 'part-00001.gz'), 'w') as input_file:
+            input_file.write('baz foo\n' * 20)
+
+        self.expected_output = ['0\t15', '1\t15', '2\t14', '3\t14', '4\t14', '5\t14', '6\t14'] + [
+            'bar\t100', 'baz\t20', 'foo\t120'
+        ]
+
+    def run_job(self, task_class, sort_buffer_mb):
+        """Run a word count job, returning the lines it output."""
+        task = task_class(input_root=self.input_root, output_path=self.output_path, mapreduce_engine='emu')
+        runner = EmulatedMapReduceJobRunner(sort_buffer_mb=sort_buffer_mb, temp_dir=self.temp_dir)
+        with patch.object(task, 'job_runner', return_value=runner):
+            task.run()
+        with open(self.output_path, 'r') as output_file:
+            return [line.rstrip('\n') for line in output_file]
+
+    def test_in_memory(self):
+        self.assertEqual(self.run_job(WordCountJobTask, 256), self.expected_output)
+
+    def test_spill_to_disk(self):
+        # Force a spill for every record buffered.
+        with patch.object(EmulatedMapReduceJobRunner, 'RECORD_OVERHEAD_BYTES', 1024 * 1024):
+            with patch('tempfile.TemporaryFile', wraps=tempfile.TemporaryFile) as spill:
+                self.assertEqual(self.run_job(WordCountJobTask, 1), self.expected_output)
+        # One file per record, and then four files merging up to 100 of those each.
+        self.assertEqual(spill.call_count, 344)
+
+    def test_combiner_with_spills(self):
+        with patch.object(EmulatedMapReduceJobRunner, 'RECORD_OVERHEAD_BYTES', 1024 * 10):
+            self.assertEqual(self.run_job(CombinedWordCountJobTask, 1), self.expected_output)
+
+    def test_sum_values(self):
+        with patch.object(EmulatedMapReduceJobRunner, 'RECORD_OVERHEAD_BYTES', 1024 * 100):
+            self.assertEqual(self.run_job(SummedWordCountJobTask, 1), self.expected_output)
+
+    def test_group(self):
+        lines = ["'b'\t1\n", "'a'\t2\n", "'b'\t3\n", "'a'\t4\n"]
+        grouped = list(EmulatedMapReduceJobRunner().group(lines))
+        self.assertEqual([line.split('\t')[0] for line in grouped], ["'a'", "'a'", "'b'", "'b'"])
+        self.assertItemsEqual(grouped, lines)
+
+
+class InputFileJobTask(WordCountJobTask):
+    """Counts the lines in each input file, and records the partition that processed each file."""
+
+    def mapper(self, line):
+        self.incr_counter('Test', 'Lines', 1)
+        yield os.path.basename(os.environ['map_input_file']), 1
+
+    def reducer(self, key, values):
+        yield key, sum(values), os.environ['mapreduce_task_partition']
+
+
+class MapOnlyJobTask(WordCountJobTask):
+    """Outputs every word in the input files."""
+
+    reducer = NotImplemented
+
+    def mapper(self, line):
+        for word in line.split():
+            yield (word,)
+
+
+class MultiprocessMapReduceJobRunnerTest(EmulatedMapReduceJobRunnerTest):
+    """Tests for MultiprocessMapReduceJobRunner."""
+
+    def run_job(self, task_class, sort_buffer_mb, runner=None):
+        task = task_class(
+            input_root=self.input_root,
+            output_path=self.output_path,
+            mapreduce_engine='multiprocess',
+            n_reduce_tasks=3,
+        )
+        runner = runner or MultiprocessMapReduceJobRunner(
+            sort_buffer_mb=sort_buffer_mb, temp_dir=self.temp_dir, processes=2
+        )
+        with patch.object(task, 'job_runner', return_value=runner):
+            task.run()
+        with open(self.output_path, 'r') as output_file:
+            # The output of each reducer is sorted, but the output of the job is not.
+            return sorted(line.rstrip('\n') for line in output_file)
+
+    def test_spill_to_disk(self):
+        with patch.object(EmulatedMapReduceJobRunner, 'RECORD_OVERHEAD_BYTES', 1024 * 100):
+            self.assertEqual(self.run_job(WordCountJobTask, 1), self.expected_output)
+
+    def test_partitions(self):
+        self.assertEqual(
+            [line.split('\t')[0] for line in self.run_job(WordCountJobTask, 256)],
+            [line.split('\t')[0] for line in self.expected_output]
+        )
+        self.assertEqual(os.listdir(self.temp_dir), ['input', 'output'])
+
+    def test_input_files_and_counters(self):
+        runner = MultiprocessMapReduceJobRunner(temp_dir=self.temp_dir, processes=2)
+        output = self.run_job(InputFileJobTask, 256, runner=runner)
+
+        partition = lambda key: str(runner.get_partition(repr(key), 3))
+        self.assertEqual(output, [
+            'part-00000\t100\t' + partition('part-00000'),
+            'part-00001.gz\t20\t' + partition('part-00001.gz'),
+        ])
+        self.assertEqual(runner.counters, {('Test', 'Lines'): 120})
+
+    def test_map_only(self):
+        expected_words = ['foo', 'bar'] * 100 + [str(i % 7) for i in range(100)] + ['baz', 'foo'] * 20
+        self.assertEqual(self.run_job(MapOnlyJobTask, 256), sorted(expected_words))
+
+
+class SummedWordCountJobTask(SumValuesMixin, WordCountJobTask):
+    """Counts the words in the input files, summing counts in the mapper and combiner."""
+
+
+class SumValuesMixinTest(unittest.TestCase):
+    """Tests for SumValuesMixin."""
+
+    def create_task(self, mapper_aggregation_size):
+        """Create a task that sums map output for the given number of keys."""
+        task = SummedWordCountJobTask(
+            input_root='/fake/input',
+            output_path='/fake/output',
+            mapreduce_engine='local',
+            mapper_aggregation_size=mapper_aggregation_size,
+        )
+        task.init_hadoop()
+        task.init_mapper()
+        return task
+
+    def test_sum_all_keys(self):
+        task = self.create_task(10)
+        output = list(task._map_input(['a b a', 'c a b']))  # pylint: disable=protected-access
+        self.assertEqual(output, [('c', 1), ('a', 3), ('b', 2)])
+
+    def test_evict_least_recently_used(self):
+        task = self.create_task(2)
+        output = list(task._map_input(['a b a c', 'a b']))  # pylint: disable=protected-access
+        self.assertEqual(output, [('b', 1), ('c', 1), ('a', 3), ('b', 1)])
+
+    def test_disabled(self):
+        task = self.create_task(0)
+        output = list(task._map_input(['a b a']))  # pylint: disable=protected-access
+        self.assertEqual(output, [('a', 1), ('b', 1), ('a', 1)])
+
+    def test_combiner(self):
+        task = self.create_task(10)
+        self.assertEqual(list(task.combiner('a', [3, 2, 1])), [('a', 6)])
+
+
+class CounterBatchingTest(unittest.TestCase):
+    """Tests for the batching of counter increments by MapReduceJobTask."""
+
+    def create_task(self, **kwargs):
+        """Create a task that records the counter updates it would report to Hadoop."""
+        task = WordCountJobTask(input_root='/fake/input', output_path='/fake/output', mapreduce_engine='local', **kwargs)
+        self.reported = []
+        task._incr_counter = lambda *args: self.reported.append(args)  # pylint: disable=protected-access
+        return task
+
+    def test_flush_size(self):
+        task = self.create_task(counter_flush_size=3)
+        task.incr_counter('Test', 'Lines', 1)
+        task.incr_counter('Test', 'Lines', 2)
+        self.assertEqual(self.reported, [])
+
+        task.incr_counter('Test Group', 5)
+        self.assertItemsEqual(self.reported, [('Test', 'Lines', 3), ('Test Group', 5)])
+
+    def test_flush_seconds(self):
+        task = self.create_task(counter_flush_seconds=10)
+        with patch('edx.analytics.tasks.common.mapreduce.time.time', return_value=task._last_counter_flush_time + 11):
+            task.incr_counter('Test', 'Lines', 1)
+        self.assertEqual(self.reported, [('Test', 'Lines', 1)])
+
+    def test_flush_when_mapper_finishes(self):
+        task = self.create_task()
+        task.mapper = lambda line: task.incr_counter('Test', 'Lines', 1) or [(line, 1)]
+        self.assertEqual(list(task._map_input(['a', 'b'])), [('a', 1), ('b', 1)])  # pylint: disable=protected-access
+        self.assertIn(('Test', 'Lines', 2), self.reported)
+
+    def test_cache_counters(self):
+        task = self.create_task()
+        cache = LruCache('Counter Test', 10)
+        cache.put('a', 1)
+        task.mapper = lambda line: [(cache.get(line), 1)]
+        list(task._map_input(['a', 'b', 'a']))  # pylint: disable=protected-access
+
+        self.assertIn(('Cache', 'Counter Test Hits', 2), self.reported)
+        self.assertIn(('Cache', 'Counter Test Misses', 1), self.reported)
@@ -3,6 +3,7 @@ Ensure we can write to MySQL data sources.
 """
 from __future__ import absolute_import
 
+import re
 import textwrap
 import unittest
 
@@ -10,7 +11,7 @@ import luigi
 import luigi.task
 from mock import MagicMock, PropertyMock, call, patch, sentinel
 
-from edx.analytics.tasks.common.mysql_load import MysqlInsertTask, coerce_for_mysql_connect
+from edx.analytics.tasks.common.mysql_load import MysqlInsertTask, coerce_for_mysql_connect, format_for_load_data
 from edx.analytics.tasks.util.tests.config import with_luigi_config
 from edx.analytics.tasks.util.tests.target import FakeTarget
 
@@ -57,6 +58,16 @@ class InsertToPredefinedMysqlDummyTable(InsertToMysqlDummyTable):
         return ['course_id', 'interval_start', 'interval_end', 'label', 'count']
 
 
+class InsertGeneratedRowsToMysqlDummyTable(InsertToMysqlDummyTable):
+    """
+    Define table for testing with rows that are not read from the source.
+    """
+
+    def rows(self):
+        yield (u'course\u00e9', None, '2014-05-08', True, 50)
+        yield ('course2', '2014-05-01', '2014-05-08', 'inf', 51)
+
+
 class MysqlInsertTaskTestCase(unittest.TestCase):
     """
     Ensure we can connect to and write data to MySQL data sources.
@@ -67,7 +78,8 @@ class MysqlInsertTaskTestCase(unittest.TestCase):
         self.mock_mysql_connector = patcher.start()
         self.addCleanup(patcher.stop)
 
-    def create_task(self, credentials=None, source=None, insert_chunk_size=100, overwrite=False, cls=InsertToMysqlDummyTable):
+    def create_task(self, credentials=None, source=None, insert_chunk_size=100, overwrite=False, cls=InsertToMysqlDummyTable,
+                    use_load_data=False, load_connections=1):
         """
          Emulate execution of a generic MysqlTask.
         """
@@ -77,7 +89,9 @@ class MysqlInsertTaskTestCase(unittest.TestCase):
         task = cls(
             credentials=sentinel.ignored,
             insert_chunk_size=insert_chunk_size,
-            overwrite=overwrite
+            overwrite=overwrite,
+            use_load_data=use_load_data,
+            load_connections=load_connections,
         )
 
         if not credentials:
@@ -267,6 +281,126 @@ class MysqlInsertTaskTestCase(unittest.TestCase):
         with self.assertRaisesRegexp(Exception, 'Cannot overwrite a table with an empty result set.'):
             task.insert_rows(MagicMock())
 
+    def load_rows(self, task):
+        """Calls insert_rows() and returns the query executed and the contents of the file it loaded."""
+        loaded = {}
+
+        def execute(query):
+            """Read the file while it still exists."""
+            match = re.match(r"LOAD DATA LOCAL INFILE '([^']+)'", query)
+            if match:
+                with open(match.group(1), 'r') as data_file:
+                    loaded['data'] = data_file.read()
+
+        cursor = MagicMock()
+        cursor.execute.side_effect = execute
+        cursor.fetchall.return_value = []
+        task.insert_rows(cursor)
+        self.assertEquals(cursor.execute.call_count, 2)
+        self.assertEquals(cursor.execute.call_args[0][0], 'SHOW WARNINGS LIMIT 10')
+        return cursor.execute.call_args_list[0][0][0], loaded['data']
+
+    def test_load_data(self):
+        source = self._get_source_string(4).replace('ACTIVE', '\\N', 1)
+        query, data = self.load_rows(self.create_task(source=source, use_load_data=True))
+        self.assertEquals(data, source)
+        self.assertRegexpMatches(
+            query,
+            r"^LOAD DATA LOCAL INFILE '[^']+' INTO TABLE dummy_table CHARACTER SET utf8 "
+            r"FIELDS TERMINATED BY '\\t' ESCAPED BY '' LINES TERMINATED BY '\\n' "
+            r"\(@col0,@col1,@col2,@col3,@col4\) SET "
+        )
+        self.assertIn(
+            "count = IF(BINARY @col4 IN ('None','\\\\N','inf','-inf'), NULL, @col4)",
+            query
+        )
+
+    def test_load_data_from_rows(self):
+        _query, data = self.load_rows(self.create_task(cls=InsertGeneratedRowsToMysqlDummyTable, use_load_data=True))
+        self.assertEquals(
+            data,
+            'course\xc3\xa9\t\\N\t2014-05-08\t1\t50\n'
+            'course2\t2014-05-01\t2014-05-08\tinf\t51\n'
+        )
+
+    def test_load_data_with_warnings(self):
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [
+            (u'Warning', 1366, u"Incorrect integer value: 'abc' for column 'count' at row 2"),
+        ]
+        task = self.create_task(use_load_data=True)
+        with self.assertRaisesRegexp(Exception, "produced warnings: Warning 1366 Incorrect integer value: 'abc'"):
+            task.insert_rows(cursor)
+
+    def test_load_data_not_square(self):
+        source = self._get_source_string(4).replace('ACTIVE', 'AC\tTIVE', 1)
+        task = self.create_task(source=source, use_load_data=True)
+        with self.assertRaisesRegexp(Exception, 'Misaligned data'):
+            task.insert_rows(MagicMock())
+
+    def test_load_data_overwrite_with_empty_results(self):
+        task = self.create_task(overwrite=True, use_load_data=True)
+        task.insert_source_task.output = MagicMock(return_value=FakeTarget(value=''))
+        cursor = MagicMock()
+        with self.assertRaisesRegexp(Exception, 'Cannot overwrite a table with an empty result set.'):
+            task.insert_rows(cursor)
+        self.assertFalse(cursor.execute.called)
+
+    @patch('edx.analytics.tasks.common.mysql_load.get_part_file_targets')
+    def test_run_with_part_files(self, mock_get_part_file_targets):
+        mock_get_part_file_targets.return_value = [
+            FakeTarget(value=self._get_source_string(1)),
+            FakeTarget(value=self._get_source_string(2)),
+        ]
+        task = self.create_task(load_connections=4)
+        staging_table = task.staging_table
+
+        # Part files are loaded on other threads, and Mock does not create child mocks in a thread-safe way, so every
+        # connection gets its own mock.
+        connections = []
+
+        def connect(*_args, **_kwargs):
+            """Returns a new mock connection."""
+            connection = MagicMock()
+            connections.append(connection)
+            return connection
+
+        self.mock_mysql_connector.connect.side_effect = connect
+        list(task.run())
+
+        queries = [
+            execute_call[1][0]
+            for connection in connections
+            for execute_call in connection.cursor.return_value.execute.mock_calls
+        ]
+        self.assertIn('CREATE TABLE {0} LIKE dummy_table'.format(staging_table), queries)
+        staged_queries = [query for query in queries if query.startswith('INSERT INTO {0} '.format(staging_table))]
+        self.assertEquals(sorted(staged_queries), [
+            'INSERT INTO {0} (course_id,interval_start,interval_end,label,count) '
+            'VALUES (%s,%s,%s,%s,%s)'.format(staging_table),
+            'INSERT INTO {0} (course_id,interval_start,interval_end,label,count) '
+            'VALUES (%s,%s,%s,%s,%s),(%s,%s,%s,%s,%s)'.format(staging_table),
+        ])
+        self.assertIn(
+            'INSERT INTO dummy_table (course_id,interval_start,interval_end,label,count) '
+            'SELECT course_id,interval_start,interval_end,label,count FROM {0}'.format(staging_table),
+            queries
+        )
+        self.assertEquals(queries[-1], 'DROP TABLE IF EXISTS {0}'.format(staging_table))
+        self.assertFalse(any(connection.rollback.called for connection in connections))
+
+    @patch('edx.analytics.tasks.common.mysql_load.get_part_file_targets')
+    def test_run_with_empty_part_files(self, mock_get_part_file_targets):
+        mock_get_part_file_targets.return_value = [FakeTarget(value=''), FakeTarget(value='')]
+        task = self.create_task(load_connections=2, overwrite=True)
+        with self.assertRaisesRegexp(Exception, 'Cannot overwrite a table with an empty result set.'):
+            list(task.run())
+        self.assertTrue(self.mock_mysql_connector.connect().rollback.called)
+
+    def test_load_data_client_flags(self):
+        self.assertEquals(self.create_task().output().cnx_kwargs, {})
+        self.assertIn('client_flags', self.create_task(use_load_data=True).output().cnx_kwargs)
+
 
 class MySQLLoadHelperFuncTests(unittest.TestCase):
     """
@@ -285,3 +419,23 @@ class MySQLLoadHelperFuncTests(unittest.TestCase):
     def test_coerce_for_mysql_connect(self):
         for input, output in self.COERCE_TEST_CASES:
             self.assertEqual(coerce_for_mysql_connect(input), output)
+
+    FORMAT_TEST_CASES = [
+        (None, '\\N'),
+        ('None', 'None'),
+        (1, '1'),
+        (2.5, '2.5'),
+        (1.0 / 3, '0.3333333333333333'),
+        (False, '0'),
+        ('abc', 'abc'),
+        (u'\u5305\u5b50', '\xe5\x8c\x85\xe5\xad\x90'),
+    ]
+
+    def test_format_for_load_data(self):
+        for value, output in self.FORMAT_TEST_CASES:
+            self.assertEqual(format_for_load_data(value), output)
+
+    def test_format_for_load_data_with_separators(self):
+        for value in ('a\tb', u'a\nb'):
+            with self.assertRaises(ValueError):
+                format_for_load_data(value)
@@ -1,14 +1,24 @@
 """Test selection of event log files."""
 
 import datetime
+import json
+import os
+import re
 import unittest
 
+import luigi
+import luigi.task
 from luigi.date_interval import Month
 from mock import patch
 
-from edx.analytics.tasks.common.pathutil import PathSelectionByDateIntervalTask
+from edx.analytics.tasks.common.mapreduce import MapReduceJobTask
+from edx.analytics.tasks.common.pathutil import (
+    EventLogSelectionMixin, PathSelectionByDateIntervalTask, get_date_prefix, get_event_store_pattern,
+    get_part_file_targets
+)
+from edx.analytics.tasks.util.tempdir import make_temp_directory
 from edx.analytics.tasks.util.tests.config import with_luigi_config
-from edx.analytics.tasks.util.url import UncheckedExternalURL
+from edx.analytics.tasks.util.url import UncheckedExternalURL, url_path_join
 
 
 class PathSelectionByDateIntervalTaskTest(unittest.TestCase):
@@ -206,3 +216,283 @@ class PathSelectionByDateIntervalTaskTest(unittest.TestCase):
             pattern=['baz']
         )
         self.assertEquals(task.pattern, ('baz',))
+
+
+class ListingByDateTest(unittest.TestCase):
+    """Test listing only the files of the dates in the interval."""
+
+    def setUp(self):
+        luigi.task.Register.clear_instance_cache()
+
+    def test_get_date_prefix(self):
+        self.assertEqual(get_date_prefix(r's3://bucket/logs/tracking\.log-(?P<date>\d{8})\.gz'),
+                         's3://bucket/logs/tracking.log-')
+        self.assertEqual(get_date_prefix(r'^/tmp/logs/(?P<date>\d{8})/.*'), '/tmp/logs/')
+        self.assertEqual(get_date_prefix(get_event_store_pattern(['play_video'], root='s3://fake/event_store/')),
+                         's3://fake/event_store/dt=')
+        for pattern in (
+                r'.*tracking.log-(?P<date>\d{8}).*\.gz',
+                r's3://bucket/logs/tracking.log-.*-(?P<timestamp>\d{10})\.gz',
+                r's3://bucket/logs/tracking.log-\d{8}\.gz',
+                r's3://bucket/logs/a?(?P<date>\d{8})',
+                r'(?i)s3://bucket/logs/(?P<date>\d{8})',
+                r's3://bucket/logs/(?P<date>\d{8})|.*other',
+                get_event_store_pattern(['play_video']),
+        ):
+            self.assertIsNone(get_date_prefix(pattern), pattern)
+
+    def create_task(self, source, **kwargs):
+        """Create a task that selects files of the 17th of March 2014 whose date is in their name."""
+        return PathSelectionByDateIntervalTask(
+            source=[source],
+            interval=luigi.DateIntervalParameter().parse('2014-03-17'),
+            pattern=[re.escape(url_path_join(source, 'tracking.log-')) + r'(?P<date>\d{8}).*\.gz'],
+            expand_interval=datetime.timedelta(1),
+            **kwargs
+        )
+
+    def create_files(self, directory, names):
+        """Create non-empty files in the directory."""
+        for name in names:
+            path = os.path.join(directory, name)
+            if not os.path.exists(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'w') as output_file:
+                output_file.write('{}')
+
+    def test_local_files(self):
+        with make_temp_directory('test_pathutil') as temp_dir:
+            source = os.path.join(temp_dir, 'logs')
+            self.create_files(source, [
+                'tracking.log-20140315.gz',
+                'tracking.log-20140316.gz',
+                'tracking.log-20140317-1395000000.gz',
+                'tracking.log-20140317.txt',
+                'tracking.log-20140318/part-00000.gz',
+                'tracking.log-20140319.gz',
+                'other/tracking.log-20140317.gz',
+            ])
+            task = self.create_task(source)
+            self.assertEqual([url.url for url in task.requires()], [
+                os.path.join(source, 'tracking.log-20140316.gz'),
+                os.path.join(source, 'tracking.log-20140317-1395000000.gz'),
+                os.path.join(source, 'tracking.log-20140318/part-00000.gz'),
+            ])
+
+    def test_listing_index(self):
+        with make_temp_directory('test_pathutil') as temp_dir:
+            source = os.path.join(temp_dir, 'logs')
+            index_root = os.path.join(temp_dir, 'index')
+            self.create_files(source, ['tracking.log-20140317.gz'])
+            task = self.create_task(source, listing_index_root=index_root)
+            self.assertEqual([url.url for url in task.requires()], [os.path.join(source, 'tracking.log-20140317.gz')])
+            self.assertEqual(len(os.listdir(index_root)), 1)
+
+            # Files of dates that were listed before are read from the index instead.
+            self.create_files(source, ['tracking.log-20140316.gz', 'tracking.log-20140317-1395000000.gz'])
+            luigi.task.Register.clear_instance_cache()
+            task = self.create_task(source, listing_index_root=index_root)
+            self.assertEqual([url.url for url in task.requires()], [os.path.join(source, 'tracking.log-20140317.gz')])
+
+            # Changing the patterns uses a different index.
+            luigi.task.Register.clear_instance_cache()
+            task = PathSelectionByDateIntervalTask(
+                source=[source],
+                interval=luigi.DateIntervalParameter().parse('2014-03-17'),
+                pattern=[re.escape(source) + r'/tracking\.log-(?P<date>\d{8}).*'],
+                expand_interval=datetime.timedelta(1),
+                listing_index_root=index_root,
+            )
+            self.assertEqual([url.url for url in task.requires()], [
+                os.path.join(source, 'tracking.log-20140316.gz'),
+                os.path.join(source, 'tracking.log-20140317-1395000000.gz'),
+                os.path.join(source, 'tracking.log-20140317.gz'),
+            ])
+
+    @patch('luigi.contrib.s3.S3Client.s3')
+    def test_s3_prefixes(self, s3_conn_mock):
+        bucket_mock = s3_conn_mock.get_bucket.return_value
+
+        def list_keys(prefix):
+            """Return a key for each date."""
+            return [FakeKey(prefix + '.gz', 10), FakeKey(prefix + '-empty.gz', 0)]
+
+        bucket_mock.list.side_effect = list_keys
+        task = self.create_task('s3://bucket/logs/', listing_concurrency=2)
+
+        self.assertEqual([url.url for url in task.requires()], [
+            's3://bucket/logs/tracking.log-20140316.gz',
+            's3://bucket/logs/tracking.log-20140317.gz',
+            's3://bucket/logs/tracking.log-20140318.gz',
+        ])
+        self.assertItemsEqual([call[0][0] for call in bucket_mock.list.call_args_list], [
+            'logs/tracking.log-20140316',
+            'logs/tracking.log-20140317',
+            'logs/tracking.log-20140318',
+        ])
+
+    @patch('luigi.contrib.s3.S3Client.s3')
+    def test_s3_folders(self, s3_conn_mock):
+        bucket_mock = s3_conn_mock.get_bucket.return_value
+        keys = {
+            'logs/': [FakeKey('logs/tracking.log-20140317.gz', 10), FakePrefix('logs/a/'), FakePrefix('logs/b/')],
+            'logs/a/': [FakeKey('logs/a/tracking.log-20140317.gz', 10), FakeKey('logs/a/tracking.log-20140320.gz', 10)],
+            'logs/b/': [FakeKey('logs/b/c/tracking.log-20140317.gz', 10)],
+        }
+        bucket_mock.list.side_effect = lambda prefix, delimiter='': keys[prefix]
+        task = PathSelectionByDateIntervalTask(
+            source=['s3://bucket/logs/'],
+            interval=luigi.DateIntervalParameter().parse('2014-03-17'),
+            pattern=[r'.*tracking.log-(?P<date>\d{8}).*\.gz'],
+            expand_interval=datetime.timedelta(0),
+        )
+
+        self.assertEqual([url.url for url in task.requires()], [
+            's3://bucket/logs/tracking.log-20140317.gz',
+            's3://bucket/logs/a/tracking.log-20140317.gz',
+            's3://bucket/logs/b/c/tracking.log-20140317.gz',
+        ])
+
+
+class FakeKey(object):
+    """A test double of the keys returned by boto when listing keys in an S3 bucket."""
+
+    def __init__(self, key, size):
+        self.key = key
+        self.size = size
+
+
+class FakePrefix(object):
+    """A test double of the common prefixes returned by boto when listing keys with a delimiter."""
+
+    def __init__(self, name):
+        self.name = name
+
+
+class EventSelectionTask(EventLogSelectionMixin, MapReduceJobTask):
+    """A task that selects events without any further processing."""
+
+    def mapper(self, line):
+        value = self.get_event_and_date_string(line)
+        if value is not None:
+            yield value
+
+
+class OtherTimeEventSelectionTask(EventSelectionTask):
+    """A task that reads the time of the event from a different field."""
+
+    def get_event_time(self, event):
+        return event.get('timestamp')
+
+
+class EventLogSelectionMixinTest(unittest.TestCase):
+    """Test the checks made on raw lines before they are decoded."""
+
+    def setUp(self):
+        luigi.task.Register.clear_instance_cache()
+        patcher = patch('edx.analytics.tasks.common.pathutil.eventlog.parse_json_event')
+        self.mock_parse = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_parse.side_effect = json.loads
+
+    def create_task(self, task_class=EventSelectionTask, **kwargs):
+        """Create a task over a single day."""
+        task = task_class(
+            interval=luigi.DateIntervalParameter().parse('2014-03-01'),
+            mapreduce_engine='local',
+        )
+        for name, value in kwargs.iteritems():
+            setattr(task, name, value)
+        task.init_local()
+        return task
+
+    def create_event_line(self, **kwargs):
+        """Create a tracking log line."""
+        event = {
+            'event_type': 'play_video',
+            'time': '2014-03-01T12:00:00.000000+00:00',
+            'event': {},
+        }
+        event.update(kwargs)
+        return json.dumps(event)
+
+    def assert_decoded(self, task, line):
+        """Assert that the line is decoded and selected."""
+        self.assertIsNotNone(task.get_event_and_date_string(line))
+        self.assertTrue(self.mock_parse.called)
+
+    def assert_discarded_before_decoding(self, task, line):
+        """Assert that the line is discarded without being decoded."""
+        self.assertIsNone(task.get_event_and_date_string(line))
+        self.assertFalse(self.mock_parse.called)
+
+    def test_no_filters(self):
+        self.assert_decoded(self.create_task(), self.create_event_line(event_type='anything'))
+
+    def test_event_types_as_substrings(self):
+        task = self.create_task(event_types=('play_video', 'pause_video'))
+        self.assert_decoded(task, self.create_event_line())
+
+    def test_event_types_discard(self):
+        task = self.create_task(event_types=('play_video', 'pause_video'))
+        self.assert_discarded_before_decoding(task, self.create_event_line(event_type='problem_check'))
+
+    def test_substrings_override_event_types(self):
+        task = self.create_task(event_types=('play_video',), event_line_substrings=('edx.forum.',))
+        self.assert_decoded(task, self.create_event_line(event_type='edx.forum.thread.created'))
+
+    def test_pattern(self):
+        task = self.create_task(event_line_pattern=r'\{"event_type": "play_video"')
+        self.assert_decoded(task, '{"event_type": "play_video", "time": "2014-03-01T12:00:00.000000+00:00"}')
+
+    def test_pattern_discard(self):
+        task = self.create_task(event_line_pattern=r'\{"event_type": "play_video"')
+        self.assert_discarded_before_decoding(task, '{"time": "2014-03-01T12:00:00", "event_type": "play_video"}')
+
+    def test_time_outside_interval(self):
+        task = self.create_task()
+        self.assert_discarded_before_decoding(task, self.create_event_line(time='2014-03-02T00:00:00.000000+00:00'))
+
+    def test_nested_time_inside_interval(self):
+        task = self.create_task()
+        line = self.create_event_line(
+            time='2014-03-02T00:00:00.000000+00:00',
+            event={'time': '2014-03-01T12:00:00'},
+        )
+        self.assertIsNone(task.get_event_and_date_string(line))
+        self.assertTrue(self.mock_parse.called)
+
+    def test_nested_time_outside_interval(self):
+        task = self.create_task()
+        line = self.create_event_line(event={'time': '2014-03-05T12:00:00'})
+        self.assert_decoded(task, line)
+
+    def test_time_from_other_field(self):
+        task = self.create_task(task_class=OtherTimeEventSelectionTask)
+        line = self.create_event_line(timestamp='2014-03-01T12:00:00', time='2014-03-02T00:00:00')
+        self.assert_decoded(task, line)
+
+    def test_missing_time(self):
+        task = self.create_task()
+        line = json.dumps({'event_type': 'play_video'})
+        self.assertIsNone(task.get_event_and_date_string(line))
+        self.assertTrue(self.mock_parse.called)
+
+
+class GetPartFileTargetsTest(unittest.TestCase):
+    """Test listing the part files of a directory."""
+
+    def test_part_files(self):
+        with make_temp_directory() as temp_dir:
+            for path in ('part-00001', 'part-00000', '_SUCCESS', '.part-00000.crc', '_temporary/part-00002', 'x/p'):
+                full_path = os.path.join(temp_dir, path)
+                if not os.path.exists(os.path.dirname(full_path)):
+                    os.makedirs(os.path.dirname(full_path))
+                with open(full_path, 'w') as part_file:
+                    part_file.write('data\n')
+
+            self.assertEquals(
+                [target.path for target in get_part_file_targets(temp_dir)],
+                [os.path.join(temp_dir, path) for path in ('part-00000', 'part-00001', 'x/p')]
+            )
+            self.assertEquals(get_part_file_targets(os.path.join(temp_dir, 'part-00000')), [])
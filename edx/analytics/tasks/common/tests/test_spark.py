@@ -0,0 +1,80 @@
+"""Tests for packaging Python dependencies for Spark tasks."""
+
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+
+from mock import patch
+
+from edx.analytics.tasks.common import spark
+
+
+@patch('edx.analytics.tasks.common.spark.get_package_metadata_paths', return_value={})
+class CachedPackagesArchiveTestCase(unittest.TestCase):
+    """Tests for get_cached_packages_archive()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.source_dir = os.path.join(self.temp_dir, 'source')
+        self.package_dir = os.path.join(self.source_dir, 'spark_test_package')
+        os.makedirs(self.package_dir)
+        self.write_module('__init__.py', '')
+        self.write_module('udf.py', 'VALUE = 1\n')
+
+        sys.path.insert(0, self.source_dir)
+        self.addCleanup(sys.path.remove, self.source_dir)
+        self.addCleanup(sys.modules.pop, 'spark_test_package', None)
+        self.package = importlib.import_module('spark_test_package')
+
+    def write_module(self, name, content):
+        """Write a file in the test package."""
+        with open(os.path.join(self.package_dir, name), 'w') as module_file:
+            module_file.write(content)
+
+    def get_archive(self, cache_name='cache', remote_cache_url=None):
+        """Returns the path of the archive of the test package, and whether it was built."""
+        with patch(
+            'edx.analytics.tasks.common.spark.create_packages_archive', wraps=spark.create_packages_archive
+        ) as mock_create:
+            path = spark.get_cached_packages_archive(
+                [self.package], os.path.join(self.temp_dir, cache_name), remote_cache_url=remote_cache_url
+            )
+        return path, mock_create.called
+
+    def test_reuse(self, _mock_metadata):
+        path, built = self.get_archive()
+        self.assertTrue(built)
+        self.assertEqual(
+            sorted(zipfile.ZipFile(path).namelist()),
+            ['spark_test_package/__init__.py', 'spark_test_package/udf.py']
+        )
+        self.assertEqual(os.listdir(os.path.dirname(path)), [os.path.basename(path)])
+
+        self.assertEqual(self.get_archive(), (path, False))
+
+    def test_changed_content(self, _mock_metadata):
+        path, _built = self.get_archive()
+        self.write_module('udf.py', 'VALUE = 2\n')
+
+        new_path, built = self.get_archive()
+        self.assertTrue(built)
+        self.assertNotEqual(new_path, path)
+        self.assertEqual(zipfile.ZipFile(new_path).read('spark_test_package/udf.py'), 'VALUE = 2\n')
+
+    def test_remote_cache(self, _mock_metadata):
+        remote_cache_url = os.path.join(self.temp_dir, 'remote')
+        os.makedirs(remote_cache_url)
+        path, built = self.get_archive(remote_cache_url=remote_cache_url)
+        self.assertTrue(built)
+        self.assertTrue(os.path.exists(os.path.join(remote_cache_url, os.path.basename(path))))
+
+        other_path, built = self.get_archive(cache_name='other_cache', remote_cache_url=remote_cache_url)
+        self.assertFalse(built)
+        self.assertEqual(os.path.basename(other_path), os.path.basename(path))
+        with open(path, 'rb') as archive_file, open(other_path, 'rb') as other_archive_file:
+            self.assertEqual(archive_file.read(), other_archive_file.read())
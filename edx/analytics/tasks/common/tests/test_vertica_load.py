@@ -96,7 +96,8 @@ class VerticaCopyTaskTest(unittest.TestCase):
         self.mock_vertica_connector = patcher.start()
         self.addCleanup(patcher.stop)
 
-    def create_task(self, credentials=None, source=None, overwrite=False, cls=CopyToVerticaDummyTable):
+    def create_task(self, credentials=None, source=None, overwrite=False, cls=CopyToVerticaDummyTable,
+                    load_connections=1):
         """
          Emulate execution of a generic VerticaCopyTask.
         """
@@ -105,7 +106,8 @@ class VerticaCopyTaskTest(unittest.TestCase):
         luigi.task.Register.clear_instance_cache()
         task = cls(
             credentials=sentinel.ignored,
-            overwrite=overwrite
+            overwrite=overwrite,
+            load_connections=load_connections,
         )
 
         if not credentials:
@@ -149,6 +151,43 @@ class VerticaCopyTaskTest(unittest.TestCase):
         self.assertTrue(mock_conn.commit.called)
         self.assertTrue(mock_conn.close.called)
 
+    @patch('edx.analytics.tasks.common.vertica_load.get_part_file_targets')
+    def test_run_with_part_files(self, mock_get_part_file_targets):
+        mock_get_part_file_targets.return_value = [
+            FakeTarget(value=self._get_source_string(1)),
+            FakeTarget(value=self._get_source_string(2)),
+        ]
+        task = self.create_task(load_connections=4)
+        staging_table = task.staging_table
+
+        # Part files are copied on other threads, and Mock does not create child mocks in a thread-safe way, so every
+        # connection gets its own mock.
+        connections = []
+
+        def connect(*_args, **_kwargs):
+            """Returns a new mock connection."""
+            connection = MagicMock()
+            connections.append(connection)
+            return connection
+
+        self.mock_vertica_connector.connect.side_effect = connect
+        task.run()
+
+        cursors = [connection.cursor() for connection in connections]
+        copy_queries = [copy_call[1][0] for cursor in cursors for copy_call in cursor.copy.mock_calls]
+        self.assertEquals(len(copy_queries), 2)
+        for query in copy_queries:
+            self.assertTrue(query.startswith('COPY testing.{0} (course_id,'.format(staging_table)))
+        queries = [execute_call[1][0] for cursor in cursors for execute_call in cursor.execute.mock_calls]
+        self.assertIn('CREATE TABLE testing.{0} LIKE testing.dummy_table;'.format(staging_table), queries)
+        self.assertIn(
+            'INSERT /*+ DIRECT */ INTO testing.dummy_table (course_id,interval_start,interval_end,label,count) '
+            'SELECT course_id,interval_start,interval_end,label,count FROM testing.{0};'.format(staging_table),
+            queries
+        )
+        self.assertEquals(queries[-1], 'DROP TABLE IF EXISTS testing.{0};'.format(staging_table))
+        self.assertFalse(any(connection.rollback.called for connection in connections))
+
     def test_run_with_failure(self):
         task = self.create_task()
         task.output().touch = MagicMock(side_effect=Exception("Failed to update marker"))
@@ -2,13 +2,16 @@
 Support for loading data into an HP Vertica database.
 """
 
+import hashlib
 import logging
 import traceback
 from collections import namedtuple
+from multiprocessing.pool import ThreadPool
 
 import luigi
 import luigi.configuration
 
+from edx.analytics.tasks.common.pathutil import get_part_file_targets
 from edx.analytics.tasks.util.overwrite import OverwriteOutputMixin
 from edx.analytics.tasks.util.url import ExternalURL
 from edx.analytics.tasks.util.vertica_target import CredentialFileVerticaTarget
@@ -81,6 +84,12 @@ class VerticaCopyTask(VerticaCopyTaskMixin, luigi.Task):
         default=[],
         description='List of roles to which to provide access when a database column is marked as restricted.'
     )
+    load_connections = luigi.IntParameter(
+        default=1,
+        significant=False,
+        description='If greater than 1, the part files of the source are copied concurrently over this many '
+        'connections into a staging table, which is then copied into the table in the final transaction.',
+    )
 
     def requires(self):
         if self.required_tasks is None:
@@ -411,24 +420,33 @@ class VerticaCopyTask(VerticaCopyTaskMixin, luigi.Task):
         """The field's enclosing character. Default is empty string."""
         return "''"
 
-    def copy_data_table_from_target(self, cursor):
-        """Performs the copy query from the insert source."""
+    @property
+    def column_names(self):
+        """List of the names of the columns."""
         if isinstance(self.columns[0], basestring):
-            column_names = ','.join([name for name in self.columns])
+            return list(self.columns)
         elif len(self.columns[0]) == 2:
-            column_names = ','.join([name for name, _type in self.columns])
+            return [name for name, _type in self.columns]
         else:
             raise Exception('columns must consist of column strings or '
                             '(column string, type string) tuples (was %r ...)'
                             % (self.columns[0],))
 
+    def copy_data_table_from_target(self, cursor):
+        """Performs the copy query from the insert source."""
+        self._copy_from_target(cursor, self.input()['insert_source'], self.table)
+
+    def _copy_from_target(self, cursor, input_target, table):
+        """Performs the copy query from a target holding source data into a table in the schema."""
+        column_names = ','.join(self.column_names)
+
         try:
-            with self.input()['insert_source'].open('r') as insert_source_file:
+            with input_target.open('r') as insert_source_file:
                 log.debug("Running stream copy from source file")
                 cursor.copy(
                     "COPY {schema}.{table} ({cols}) FROM STDIN ENCLOSED BY {enclosed_by} DELIMITER AS {delim} NULL AS {null} DIRECT ABORT ON ERROR NO COMMIT;".format(
                         schema=self.schema,
-                        table=self.table,
+                        table=table,
                         cols=column_names,
                         delim=self.copy_delimiter,
                         null=self.copy_null_sequence,
@@ -447,6 +465,71 @@ class VerticaCopyTask(VerticaCopyTaskMixin, luigi.Task):
             else:
                 raise
 
+    @property
+    def staging_table(self):
+        """The name of the table that the part files of the source are copied into when they are copied concurrently."""
+        return '{table}_staging_{hash}'.format(table=self.table, hash=hashlib.md5(self.update_id()).hexdigest()[:8])
+
+    def get_source_part_targets(self):
+        """Returns the part files of the source if they are to be copied concurrently, or else an empty list."""
+        if self.load_connections <= 1:
+            return []
+        return get_part_file_targets(self.input()['insert_source'].path)
+
+    def _execute_autocommit(self, queries):
+        """Executes queries, like DDL statements that commit implicitly, outside of the main transaction."""
+        connection = self.output().connect(autocommit=True)
+        try:
+            cursor = connection.cursor()
+            for query in queries:
+                log.debug(query)
+                cursor.execute(query)
+        finally:
+            connection.close()
+
+    def load_staging_table(self, part_targets):
+        """
+        Copies the part files into a new staging table over concurrent connections.
+
+        Each part file is copied and committed in its own transaction, so that only the copy of the staging table into
+        the table is part of the task's transaction.
+        """
+        self._execute_autocommit([
+            "DROP TABLE IF EXISTS {schema}.{staging_table};".format(schema=self.schema, staging_table=self.staging_table),
+            "CREATE TABLE {schema}.{staging_table} LIKE {schema}.{table};".format(
+                schema=self.schema, staging_table=self.staging_table, table=self.table
+            ),
+        ])
+        pool = ThreadPool(min(self.load_connections, len(part_targets)))
+        try:
+            pool.map(self._copy_part_file, part_targets)
+        finally:
+            pool.close()
+            pool.join()
+        log.debug("Copied %d part files into table %s.%s", len(part_targets), self.schema, self.staging_table)
+
+    def _copy_part_file(self, input_target):
+        """Copies one part file into the staging table over a new connection."""
+        connection = self.output().connect()
+        try:
+            connection.cursor().execute("SET TIMEZONE TO 'GMT';")
+            self._copy_from_target(connection.cursor(), input_target, self.staging_table)
+            connection.commit()
+        finally:
+            connection.close()
+
+    def copy_data_table_from_staging_table(self, cursor):
+        """Copies the rows copied into the staging table into the table."""
+        column_names = ','.join(self.column_names)
+        query = "INSERT /*+ DIRECT */ INTO {schema}.{table} ({cols}) SELECT {cols} FROM {schema}.{staging_table};".format(
+            schema=self.schema,
+            table=self.table,
+            cols=column_names,
+            staging_table=self.staging_table,
+        )
+        log.debug(query)
+        cursor.execute(query)
+
     @property
     def restricted_columns(self):
         return []
@@ -487,6 +570,8 @@ ENABLE;""".format(schema=self.schema, table=self.table, column=column, expressio
 
         self.check_vertica_availability()
 
+        part_targets = self.get_source_part_targets()
+
         connection = self.output().connect()
         try:
             # create schema and table only if necessary:
@@ -494,6 +579,9 @@ ENABLE;""".format(schema=self.schema, table=self.table, column=column, expressio
             self.create_table(connection)
             self.create_nonaggregate_projections(connection)
 
+            if part_targets:
+                self.load_staging_table(part_targets)
+
             # we should do nothing between initialization and copying
             # that would commit the transaction.
             self.init_copy(connection)
@@ -501,7 +589,10 @@ ENABLE;""".format(schema=self.schema, table=self.table, column=column, expressio
             connection.cursor().execute("SET TIMEZONE TO 'GMT';")
 
             cursor = connection.cursor()
-            self.copy_data_table_from_target(cursor)
+            if part_targets:
+                self.copy_data_table_from_staging_table(cursor)
+            else:
+                self.copy_data_table_from_target(cursor)
 
             # mark as complete in same transaction
             self.init_touch(connection)
@@ -530,6 +621,12 @@ ENABLE;""".format(schema=self.schema, table=self.table, column=column, expressio
             raise
         finally:
             connection.close()
+            if part_targets:
+                self._execute_autocommit([
+                    "DROP TABLE IF EXISTS {schema}.{staging_table};".format(
+                        schema=self.schema, staging_table=self.staging_table
+                    ),
+                ])
 
     def check_vertica_availability(self):
         """Call to ensure fast failure if this machine doesn't have the Vertica client library available."""
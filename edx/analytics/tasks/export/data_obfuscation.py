@@ -8,12 +8,12 @@ import tarfile
 import tempfile
 import xml.etree.ElementTree
 
-import cjson
 import luigi
 import yaml
 
 import edx.analytics.tasks.util.opaque_key_util as opaque_key_util
 from edx.analytics.tasks.common.pathutil import PathSetTask
+from edx.analytics.tasks.util import eventlog
 from edx.analytics.tasks.util.file_util import copy_file_to_file, read_config_file
 from edx.analytics.tasks.util.obfuscate_util import (
     ObfuscatorDownstreamMixin, ObfuscatorMixin, backslash_decode_value, backslash_encode_value
@@ -63,6 +63,12 @@ class BaseObfuscateDumpTask(ObfuscatorMixin, luigi.Task):
 class ObfuscateSqlDumpTask(BaseObfuscateDumpTask):
     """Task to obfuscate an sql file."""
 
+    # Index of the column holding the user_id to remap, or None if the table has no such column.
+    user_id_column = None
+
+    # Number of rows whose user_ids are remapped together.
+    ROWS_PER_BATCH = 1000
+
     def run(self):
         with self.output().open('w') as output_file:
             with self.input()['data'][0].open('r') as input_file:
@@ -74,14 +80,36 @@ class ObfuscateSqlDumpTask(BaseObfuscateDumpTask):
                 if headers:
                     writer.writerow(headers)
 
+                rows = []
                 for row in reader:
                     # Found an empty line at the bottom of test file
                     if row:
-                        filtered_row = self.filter_row(row)
-                        writer.writerow(filtered_row)
+                        rows.append(row)
+                    if len(rows) >= self.ROWS_PER_BATCH:
+                        writer.writerows(self.filter_rows(rows))
+                        rows = []
+                if rows:
+                    writer.writerows(self.filter_rows(rows))
+
+    def filter_rows(self, rows):
+        """Remap the user_ids of a batch of rows at once, and return the list of deidentified rows."""
+        remapped_user_ids = [None] * len(rows)
+        if self.user_id_column is not None:
+            # 'NULL' values can't be remapped, so they are passed on unchanged.
+            remapped_user_ids = [row[self.user_id_column] for row in rows]
+            indices = [index for index, row in enumerate(rows) if row[self.user_id_column] != 'NULL']
+            user_ids = self.remap_ids([rows[index][self.user_id_column] for index in indices])
+            for index, remapped_user_id in zip(indices, user_ids):
+                remapped_user_ids[index] = remapped_user_id
+        return [self.filter_row(row, remapped_user_id) for row, remapped_user_id in zip(rows, remapped_user_ids)]
+
+    def filter_row(self, row, remapped_user_id):
+        """
+        Function to deitentify a particular row.
 
-    def filter_row(self, row):
-        """Function to deitentify a particular row."""
+        `remapped_user_id` is the remapped value of the `user_id_column` of the row, 'NULL' if that is its value, or
+        None if there is no such column.
+        """
         raise NotImplementedError
 
 
@@ -92,8 +120,10 @@ class ObfuscateAuthUserProfileTask(ObfuscateSqlDumpTask):
     def file_pattern(self):
         return '*-auth_userprofile-*'
 
-    def filter_row(self, row):
-        row[1] = self.remap_id(row[1])  # user_id
+    user_id_column = 1
+
+    def filter_row(self, row, remapped_user_id):
+        row[1] = remapped_user_id  # user_id
         row[2] = ''  # name
         row[3] = ''  # language
         row[4] = ''  # location
@@ -114,10 +144,11 @@ class ObfuscateAuthUserTask(ObfuscateSqlDumpTask):
     def file_pattern(self):
         return '*-auth_user-*'
 
-    def filter_row(self, row):
-        user_id = row[0]
-        row[0] = self.remap_id(user_id)  # id
-        row[1] = self.generate_obfuscated_username_from_user_id(user_id)
+    user_id_column = 0
+
+    def filter_row(self, row, remapped_user_id):
+        row[0] = remapped_user_id  # id
+        row[1] = self.generate_obfuscated_username_from_remapped_id(remapped_user_id)
         row[2] = ''  # first_name
         row[3] = ''  # last_name
         row[4] = ''  # email
@@ -136,8 +167,10 @@ class ObfuscateStudentCourseEnrollmentTask(ObfuscateSqlDumpTask):
     def file_pattern(self):
         return '*-student_courseenrollment-*'
 
-    def filter_row(self, row):
-        row[1] = self.remap_id(row[1])  # user_id
+    user_id_column = 1
+
+    def filter_row(self, row, remapped_user_id):
+        row[1] = remapped_user_id  # user_id
         return row
 
 
@@ -148,8 +181,10 @@ class ObfuscateUserApiUserCourseTagTask(ObfuscateSqlDumpTask):
     def file_pattern(self):
         return '*-user_api_usercoursetag-*'
 
-    def filter_row(self, row):
-        row[1] = self.remap_id(row[1])  # user_id
+    user_id_column = 1
+
+    def filter_row(self, row, remapped_user_id):
+        row[1] = remapped_user_id  # user_id
         return row
 
 
@@ -160,7 +195,7 @@ class ObfuscateStudentLanguageProficiencyTask(ObfuscateSqlDumpTask):
     def file_pattern(self):
         return '*-student_languageproficiency-*'
 
-    def filter_row(self, row):
+    def filter_row(self, row, remapped_user_id):
         return row
 
 
@@ -171,7 +206,9 @@ class ObfuscateCoursewareStudentModule(ObfuscateSqlDumpTask):
     def file_pattern(self):
         return '*-courseware_studentmodule-*'
 
-    def filter_row(self, row):
+    user_id_column = 3
+
+    def filter_row(self, row, remapped_user_id):
         user_id = row[3]
         user_info = {'user_id': [user_id, ]}
         try:
@@ -184,7 +221,7 @@ class ObfuscateCoursewareStudentModule(ObfuscateSqlDumpTask):
         except KeyError:
             log.error("Unable to find CWSM user_id: %r in the user_by_id map of size %s", user_id, len(self.user_by_id))
 
-        row[3] = self.remap_id(user_id)  # student_id
+        row[3] = remapped_user_id  # student_id
 
         # Courseware_studentmodule is not processed with the other SQL tables, so it
         # is not escaped in the same way.  In particular, we will not decode and encode it,
@@ -194,7 +231,7 @@ class ObfuscateCoursewareStudentModule(ObfuscateSqlDumpTask):
             if state_str == 'NULL':
                 updated_state_dict = {}
             else:
-                state_dict = cjson.decode(state_str, all_unicode=True)
+                state_dict = eventlog.decode_json(state_str)
                 # Traverse the dictionary, looking for entries that need to be scrubbed.
                 updated_state_dict = self.obfuscator.obfuscate_structure(state_dict, u"state", user_info)
         except Exception:   # pylint:  disable=broad-except
@@ -204,7 +241,7 @@ class ObfuscateCoursewareStudentModule(ObfuscateSqlDumpTask):
 
         if updated_state_dict is not None:
             # Can't reset values, so update original fields.
-            updated_state = cjson.encode(updated_state_dict).replace('\\', '\\\\')
+            updated_state = eventlog.encode_json(updated_state_dict).replace('\\', '\\\\')
             row[4] = updated_state
             if self.obfuscator.is_logging_enabled():
                 log.info(u"Obfuscated state for user_id '%s' module_id '%s'", user_id, row[2])
@@ -219,8 +256,10 @@ class ObfuscateCertificatesGeneratedCertificate(ObfuscateSqlDumpTask):
     def file_pattern(self):
         return '*-certificates_generatedcertificate-*'
 
-    def filter_row(self, row):
-        row[1] = self.remap_id(row[1])  # user_id
+    user_id_column = 1
+
+    def filter_row(self, row, remapped_user_id):
+        row[1] = remapped_user_id  # user_id
         row[2] = ''  # download_url
         row[5] = ''  # key
         row[8] = ''  # verify_uuid
@@ -237,7 +276,7 @@ class ObfuscateTeamsTask(ObfuscateSqlDumpTask):
     def file_pattern(self):
         return '*-teams-*'
 
-    def filter_row(self, row):
+    def filter_row(self, row, remapped_user_id):
         return row
 
 
@@ -248,8 +287,10 @@ class ObfuscateTeamsMembershipTask(ObfuscateSqlDumpTask):
     def file_pattern(self):
         return '*-teams_membership-*'
 
-    def filter_row(self, row):
-        row[1] = self.remap_id(row[1])  # user_id
+    user_id_column = 1
+
+    def filter_row(self, row, remapped_user_id):
+        row[1] = remapped_user_id  # user_id
         return row
 
 
@@ -260,8 +301,10 @@ class ObfuscateVerificationStatusTask(ObfuscateSqlDumpTask):
     def file_pattern(self):
         return '*-verify_student_verificationstatus-*'
 
-    def filter_row(self, row):
-        row[4] = self.remap_id(row[4])  # user_id
+    user_id_column = 4
+
+    def filter_row(self, row, remapped_user_id):
+        row[4] = remapped_user_id  # user_id
         return row
 
 
@@ -272,7 +315,7 @@ class ObfuscateWikiArticleTask(ObfuscateSqlDumpTask):
     def file_pattern(self):
         return '*-wiki_article-*'
 
-    def filter_row(self, row):
+    def filter_row(self, row, remapped_user_id):
         # Removing these just to be safe.
         row[4] = ''  # owner_id
         row[5] = ''  # group_id
@@ -286,7 +329,9 @@ class ObfuscateWikiArticleRevisionTask(ObfuscateSqlDumpTask):
     def file_pattern(self):
         return '*-wiki_articlerevision-*'
 
-    def filter_row(self, row):
+    user_id_column = 5
+
+    def filter_row(self, row, remapped_user_id):
         user_id = row[5]
         user_info = {}
         if user_id != 'NULL':
@@ -306,7 +351,7 @@ class ObfuscateWikiArticleRevisionTask(ObfuscateSqlDumpTask):
         row[4] = ''  # ip_address
         # For user_id, preserve 'NULL' value if present.
         if user_id != 'NULL':
-            row[5] = self.remap_id(user_id)
+            row[5] = remapped_user_id
 
         wiki_content = backslash_decode_value(row[12].decode('utf8'))
         cleaned_content = self.obfuscator.obfuscate_text(wiki_content, user_info)
@@ -601,15 +646,15 @@ class ObfuscateMongoDumpsTask(BaseObfuscateDumpTask):
         if 'votes' in row:
             votes = row['votes']
             if 'down' in votes and len(votes['down']) > 0:
-                votes['down'] = [str(self.remap_id(user_id)) for user_id in votes['down']]
+                votes['down'] = [str(user_id) for user_id in self.remap_ids(votes['down'])]
             if 'up' in votes and len(votes['up']) > 0:
-                votes['up'] = [str(self.remap_id(user_id)) for user_id in votes['up']]
+                votes['up'] = [str(user_id) for user_id in self.remap_ids(votes['up'])]
 
         if 'abuse_flaggers' in row and len(row['abuse_flaggers']) > 0:
-            row['abuse_flaggers'] = [str(self.remap_id(user_id)) for user_id in row['abuse_flaggers']]
+            row['abuse_flaggers'] = [str(user_id) for user_id in self.remap_ids(row['abuse_flaggers'])]
         if 'historical_abuse_flaggers' in row and len(row['historical_abuse_flaggers']) > 0:
             row['historical_abuse_flaggers'] = [
-                str(self.remap_id(user_id)) for user_id in row['historical_abuse_flaggers']
+                str(user_id) for user_id in self.remap_ids(row['historical_abuse_flaggers'])
             ]
         if 'endorsement' in row and row['endorsement'] and 'user_id' in row['endorsement']:
             user_id = row['endorsement']['user_id']
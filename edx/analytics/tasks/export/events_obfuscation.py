@@ -6,7 +6,6 @@ import os
 import re
 from collections import defaultdict, namedtuple
 
-import cjson
 import luigi.date_interval
 
 import edx.analytics.tasks.util.opaque_key_util as opaque_key_util
@@ -47,6 +46,8 @@ class ObfuscateCourseEventsTask(ObfuscatorMixin, GeolocationMixin, MultiOutputMa
 
     def requires_local(self):
         results = super(ObfuscateCourseEventsTask, self).requires_local()
+        # Make sure that the user_info index, if one is used, is built before the job starts.
+        results.update(self.user_info_requirements())
 
         if os.path.basename(self.explicit_event_whitelist) != self.explicit_event_whitelist:
             results['explicit_events'] = ExternalURL(url=self.explicit_event_whitelist)
@@ -328,7 +329,7 @@ class ObfuscateCourseEventsTask(ObfuscatorMixin, GeolocationMixin, MultiOutputMa
             # Re-encode payload as a json string if it originally was one.
             # (This test works because we throw away string values that didn't parse as JSON.)
             if isinstance(event.get('event'), basestring):
-                event['event'] = cjson.encode(event_data)
+                event['event'] = eventlog.encode_json(event_data)
             else:
                 event['event'] = event_data
 
@@ -13,9 +13,10 @@ import xml.etree.ElementTree as ET
 from unittest import TestCase
 
 from luigi import LocalTarget
-from mock import MagicMock, sentinel
+from mock import MagicMock, patch, sentinel
 
 import edx.analytics.tasks.export.data_obfuscation as obfuscate
+from edx.analytics.tasks.util.id_codec import UserIdRemapperMixin
 from edx.analytics.tasks.util.obfuscate_util import reset_user_info_for_testing
 from edx.analytics.tasks.util.opaque_key_util import get_filename_safe_course_id
 from edx.analytics.tasks.util.tests.target import FakeTarget
@@ -114,6 +115,41 @@ class TestDataObfuscation(TestCase):
         ]
         self.check_output(obfuscate.ObfuscateStudentCourseEnrollmentTask, data, expected)
 
+    def test_student_course_enrollment_obfuscation_null_userid(self):
+        header = ['id', 'user_id', 'course_id', 'created', 'is_active', 'mode']
+        data = [
+            header,
+            ['123', 'NULL', 'course-v1:edX+DemoX+Test_2014', '2015-07-16 19:19:10', '1', 'honor'],
+            ['124', '123457', 'course-v1:edX+DemoX+Test_2014', '2015-07-28 12:41:13', '0', 'verified'],
+        ]
+        expected = [
+            header,
+            ['123', 'NULL', 'course-v1:edX+DemoX+Test_2014', '2015-07-16 19:19:10', '1', 'honor'],
+            ['124', '273680674', 'course-v1:edX+DemoX+Test_2014', '2015-07-28 12:41:13', '0', 'verified'],
+        ]
+        self.check_output(obfuscate.ObfuscateStudentCourseEnrollmentTask, data, expected)
+
+    def test_student_course_enrollment_obfuscation_in_batches(self):
+        header = ['id', 'user_id', 'course_id', 'created', 'is_active', 'mode']
+        data = [header] + [
+            [str(row_id), user_id, 'course-v1:edX+DemoX+Test_2014', '2015-07-16 19:19:10', '1', 'honor']
+            for row_id, user_id in enumerate(['123456', '123457', '123456'])
+        ]
+        expected = [header] + [
+            [str(row_id), user_id, 'course-v1:edX+DemoX+Test_2014', '2015-07-16 19:19:10', '1', 'honor']
+            for row_id, user_id in enumerate(['273678626', '273680674', '273678626'])
+        ]
+        with patch.object(obfuscate.ObfuscateStudentCourseEnrollmentTask, 'ROWS_PER_BATCH', 2):
+            with patch.object(
+                obfuscate.ObfuscateStudentCourseEnrollmentTask, 'remap_ids', autospec=True,
+                side_effect=UserIdRemapperMixin.remap_ids
+            ) as mock_remap_ids:
+                self.check_output(obfuscate.ObfuscateStudentCourseEnrollmentTask, data, expected)
+        self.assertEquals(
+            [call_args[0][1] for call_args in mock_remap_ids.call_args_list],
+            [['123456', '123457'], ['123456']]
+        )
+
     def test_student_language_proficiency_obfuscation(self):
         header = ['id', 'user_profile_id', 'code']
         data = [
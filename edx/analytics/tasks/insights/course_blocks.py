@@ -12,7 +12,7 @@ from requests.exceptions import HTTPError
 
 from edx.analytics.tasks.common.mapreduce import MapReduceJobTask, MapReduceJobTaskMixin
 from edx.analytics.tasks.insights.course_list import CourseListApiDataTask, CourseRecord, TimestampPartitionMixin
-from edx.analytics.tasks.util.edx_api_client import EdxApiClient
+from edx.analytics.tasks.util.edx_api_client import ApiResponseCacheMixin, map_with_api_clients
 from edx.analytics.tasks.util.hive import BareHiveTableTask, HivePartitionTask, WarehouseMixin
 from edx.analytics.tasks.util.overwrite import OverwriteOutputMixin
 from edx.analytics.tasks.util.record import BooleanField, IntegerField, Record, StringField
@@ -69,7 +69,7 @@ class CourseBlocksDownstreamMixin(TimestampPartitionMixin, WarehouseMixin, Overw
     )
 
 
-class PullCourseBlocksApiData(CourseBlocksDownstreamMixin, luigi.Task):
+class PullCourseBlocksApiData(ApiResponseCacheMixin, CourseBlocksDownstreamMixin, luigi.Task):
     """
     This task fetches the blocks from the Course Blocks edX REST API, and stores each course's result on a separate line
     of JSON.  Each line contains the "root" block ID, and a "blocks" dict of blocks.
@@ -86,6 +86,13 @@ class PullCourseBlocksApiData(CourseBlocksDownstreamMixin, luigi.Task):
         default='bearer',
         description="Type of authentication required for the API call, e.g. jwt or bearer."
     )
+    api_concurrency = luigi.IntParameter(
+        config_path={'section': 'course-blocks', 'name': 'api_concurrency'},
+        default=1,
+        significant=False,
+        description="The number of courses to fetch blocks for at the same time.  Each concurrent request uses its own "
+                    "authenticated session.  Output lines are written in the order of the course list regardless."
+    )
 
     def requires(self):
         return CourseListApiDataTask(
@@ -103,31 +110,42 @@ class PullCourseBlocksApiData(CourseBlocksDownstreamMixin, luigi.Task):
                 course = CourseRecord.from_tsv(line)
                 courses.append(course.course_id)
 
-        client = EdxApiClient(token_type=self.api_token_type)
-        params = dict(depth="all", requested_fields="children", all_blocks="true")
+        response_cache = self.get_api_response_cache('course_blocks')
         counter = 0
         with self.output().open('w') as output_file:
-            for course_id in courses:  # pylint: disable=not-an-iterable
-                params['course_id'] = course_id
-                try:
-                    # Course Blocks are returned on one page
-                    response = client.get(self.api_root_url, params=params)
-                except HTTPError as error:
-                    # 404 errors may occur if we try to fetch the course blocks for a deleted course.
-                    # So we just log and ignore them.
-                    if error.response.status_code == 404:
-                        log.error('Error fetching API resource %s: %s', params, error)
-                    else:
-                        raise error
-                else:
-                    parsed_response = response.json()
-                    parsed_response['course_id'] = course_id
+            course_blocks = map_with_api_clients(
+                self.fetch_course_blocks, courses, concurrency=self.api_concurrency, token_type=self.api_token_type,
+                response_cache=response_cache,
+            )
+            for parsed_response in course_blocks:
+                if parsed_response is not None:
                     output_file.write(json.dumps(parsed_response))
                     output_file.write('\n')
                     counter += 1
 
+        if response_cache is not None:
+            response_cache.save()
         log.info('Wrote %d records to output file', counter)
 
+    def fetch_course_blocks(self, client, course_id):
+        """Returns the parsed Course Blocks API response for a course, or None if the course was not found."""
+        params = dict(depth="all", requested_fields="children", all_blocks="true", course_id=course_id)
+        try:
+            # Course Blocks are returned on one page
+            response = client.get(self.api_root_url, params=params)
+        except HTTPError as error:
+            # 404 errors may occur if we try to fetch the course blocks for a deleted course.
+            # So we just log and ignore them.
+            if error.response.status_code == 404:
+                log.error('Error fetching API resource %s: %s', params, error)
+                return None
+            else:
+                raise error
+
+        parsed_response = response.json()
+        parsed_response['course_id'] = course_id
+        return parsed_response
+
     def output(self):
         return get_target_from_url(
             url_path_join(
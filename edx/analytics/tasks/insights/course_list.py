@@ -11,7 +11,7 @@ import logging
 import luigi
 
 from edx.analytics.tasks.common.mapreduce import MapReduceJobTask, MapReduceJobTaskMixin
-from edx.analytics.tasks.util.edx_api_client import EdxApiClient
+from edx.analytics.tasks.util.edx_api_client import ApiResponseCacheMixin, EdxApiClient
 from edx.analytics.tasks.util.hive import BareHiveTableTask, HivePartitionTask, WarehouseMixin
 from edx.analytics.tasks.util.overwrite import OverwriteOutputMixin
 from edx.analytics.tasks.util.record import DateTimeField, Record, StringField
@@ -79,7 +79,7 @@ class CourseListDownstreamMixin(TimestampPartitionMixin, WarehouseMixin, Overwri
     pass
 
 
-class PullCourseListApiData(CourseListDownstreamMixin, luigi.Task):
+class PullCourseListApiData(ApiResponseCacheMixin, CourseListDownstreamMixin, luigi.Task):
     """
     This task fetches the courses list from the Courses edX REST API, and
     writes one line of JSON for each course to the output() target.
@@ -100,7 +100,8 @@ class PullCourseListApiData(CourseListDownstreamMixin, luigi.Task):
 
     def run(self):
         self.remove_output_on_overwrite()
-        client = EdxApiClient()
+        response_cache = self.get_api_response_cache('course_list')
+        client = EdxApiClient(response_cache=response_cache)
         params = {
             'page_size': self.api_page_size,
         }
@@ -118,6 +119,8 @@ class PullCourseListApiData(CourseListDownstreamMixin, luigi.Task):
                     output_file.write('\n')
                     counter += 1
 
+        if response_cache is not None:
+            response_cache.save()
         log.info('Wrote %d records to output file', counter)
 
     def output(self):
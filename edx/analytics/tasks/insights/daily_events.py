@@ -0,0 +1,72 @@
+"""Extract the enrollment, engagement and video data of a day of tracking logs with a single scan of the logs."""
+
+import luigi
+from luigi import date_interval
+
+from edx.analytics.tasks.common.event_fanout import EventLogFanOutTask
+from edx.analytics.tasks.insights.enrollments import CourseEnrollmentEventsTask
+from edx.analytics.tasks.insights.module_engagement import ModuleEngagementDataTask
+from edx.analytics.tasks.insights.video import UserVideoViewingTask
+from edx.analytics.tasks.util.decorators import workflow_entry_point
+from edx.analytics.tasks.util.hive import WarehouseMixin
+from edx.analytics.tasks.util.url import get_target_from_url
+
+
+@workflow_entry_point
+class DailyEventsFanOutTask(WarehouseMixin, EventLogFanOutTask):
+    """
+    Run CourseEnrollmentEventsTask, ModuleEngagementDataTask and UserVideoViewingTask over one day of tracking logs.
+
+    The output of each consumer is written to the same warehouse partition that the consumer writes to when it is run
+    on its own, so downstream tasks find it there.
+    """
+
+    date = luigi.DateParameter()
+
+    # Override superclass to disable this parameter
+    interval = None
+
+    def __init__(self, *args, **kwargs):
+        super(DailyEventsFanOutTask, self).__init__(*args, **kwargs)
+
+        self.interval = date_interval.Date.from_date(self.date)
+
+    def consumer_tasks(self):
+        shared_args = {
+            'source': self.source,
+            'expand_interval': self.expand_interval,
+            'pattern': self.pattern,
+            'date_pattern': self.date_pattern,
+            'event_store': self.event_store,
+            'mapreduce_engine': self.mapreduce_engine,
+            'n_reduce_tasks': self.n_reduce_tasks,
+        }
+        return {
+            'enrollment_events': CourseEnrollmentEventsTask(
+                interval=self.interval,
+                warehouse_path=self.warehouse_path,
+                marker=self.marker,
+                **shared_args
+            ),
+            'module_engagement': ModuleEngagementDataTask(
+                date=self.date,
+                output_root=self.hive_partition_path('module_engagement', self.date),
+                **shared_args
+            ),
+            'video_viewing': UserVideoViewingTask(
+                interval=self.interval,
+                # UserVideoViewingByDateTask reads the viewings from the partition of the end of its interval.
+                output_root=self.hive_partition_path('video_viewing', self.interval.date_b),
+                **shared_args
+            ),
+        }
+
+    def mark_consumer_complete(self, consumer):
+        if isinstance(consumer, CourseEnrollmentEventsTask):
+            # Downstream tasks require an output file for each date in the interval, as CourseEnrollmentEventsTask.run()
+            # ensures.
+            for date in consumer.interval:
+                target = get_target_from_url(consumer.output_path_for_key(date.isoformat()))
+                if not target.exists():
+                    target.open('w').close()
+        super(DailyEventsFanOutTask, self).mark_consumer_complete(consumer)
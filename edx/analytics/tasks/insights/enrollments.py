@@ -1,6 +1,7 @@
 """Compute metrics related to user enrollments in courses"""
 
 import datetime
+import itertools
 import logging
 
 import luigi
@@ -52,6 +53,8 @@ class CourseEnrollmentEventsTask(
 
     counter_category_name = 'Enrollment Events'
 
+    event_types = (DEACTIVATED, ACTIVATED, MODE_CHANGED)
+
     def mapper(self, line):
         value = self.get_event_and_date_string(line)
         if value is None:
@@ -196,6 +199,22 @@ class CourseEnrollmentDownstreamMixin(WarehouseMixin, EventLogSelectionDownstrea
         description='This parameter is used by CourseEnrollmentTask which will overwrite course enrollment '
                     ' events for the most recent n days.'
     )
+    enrollment_spans = luigi.BoolParameter(
+        config_path={'section': 'enrollments', 'name': 'enrollment_spans'},
+        default=False,
+        significant=False,
+        description='Read enrollments from the course_enrollment_span table, which stores a record for each span of '
+        'days over which an enrollment did not change, instead of from the course_enrollment table, which stores a '
+        'record for every day.',
+    )
+    enrollment_checkpoint_date = luigi.DateParameter(
+        default=None,
+        significant=False,
+        description='Only used with `enrollment_spans`.  The date of an existing course_enrollment_span partition, '
+        'usually the one written by the previous run, to start from.  Only the enrollment events since this date are '
+        'replayed and the spans for earlier dates are copied from that partition.  By default all events since the '
+        'start of the interval are replayed.',
+    )
 
     @property
     def query_date(self):
@@ -203,6 +222,19 @@ class CourseEnrollmentDownstreamMixin(WarehouseMixin, EventLogSelectionDownstrea
         query_date = self.interval.date_b - datetime.timedelta(days=1)
         return query_date.isoformat()
 
+    @property
+    def course_enrollment_table(self):
+        """A Hive table expression with the columns of the course_enrollment table, for use in a FROM clause."""
+        if self.enrollment_spans:
+            return '({query})'.format(query=COURSE_ENROLLMENT_FROM_SPANS_QUERY)
+        return 'course_enrollment'
+
+    def course_enrollment_partition_task(self, **kwargs):
+        """Returns the task that populates the table read by `course_enrollment_table`."""
+        if self.enrollment_spans:
+            return CourseEnrollmentSpanPartitionTask(enrollment_checkpoint_date=self.enrollment_checkpoint_date, **kwargs)
+        return CourseEnrollmentPartitionTask(**kwargs)
+
     def __init__(self, *args, **kwargs):
         super(CourseEnrollmentDownstreamMixin, self).__init__(*args, **kwargs)
 
@@ -241,6 +273,8 @@ class CourseEnrollmentTask(CourseEnrollmentDownstreamMixin, MapReduceJobTask):
 
         self.overwrite_from_date = self.interval.date_b - datetime.timedelta(days=self.overwrite_n_days)
         self.course_enrollment_events_root = url_path_join(self.warehouse_path, 'course_enrollment_events')
+        # The date of the first event to be replayed.
+        self.replay_from_date = self.interval.date_a
 
     def requires_local(self):
         if self.overwrite_n_days == 0:
@@ -265,22 +299,21 @@ class CourseEnrollmentTask(CourseEnrollmentDownstreamMixin, MapReduceJobTask):
         # CourseEnrollmentEventsTask returns the marker as output, so we need custom logic to pass the output
         # of CourseEnrollmentEventsTask as actual hadoop input to this job.
 
-        path_selection_interval = DateIntervalParameter().parse('{}-{}'.format(
-            self.interval.date_a,
-            self.overwrite_from_date,
-        ))
+        requirements = {}
 
-        path_selection_task = PathSelectionByDateIntervalTask(
-            source=[self.course_enrollment_events_root],
-            interval=path_selection_interval,
-            pattern=[CourseEnrollmentEventsTask.FILEPATH_PATTERN],
-            expand_interval=datetime.timedelta(0),
-            date_pattern='%Y-%m-%d',
-        )
+        if self.replay_from_date < self.overwrite_from_date:
+            path_selection_interval = DateIntervalParameter().parse('{}-{}'.format(
+                self.replay_from_date,
+                self.overwrite_from_date,
+            ))
 
-        requirements = {
-            'path_selection_task': path_selection_task,
-        }
+            requirements['path_selection_task'] = PathSelectionByDateIntervalTask(
+                source=[self.course_enrollment_events_root],
+                interval=path_selection_interval,
+                pattern=[CourseEnrollmentEventsTask.FILEPATH_PATTERN],
+                expand_interval=datetime.timedelta(0),
+                date_pattern='%Y-%m-%d',
+            )
 
         if self.overwrite_n_days > 0:
             requirements['downstream_input_tasks'] = self.requires_local().downstream_input_tasks()
@@ -385,22 +418,31 @@ class DaysEnrolledForEvents(object):
         interval (luigi.date_interval.DateInterval): The interval of time in which these enrollment events took place.
         events (iterable): The enrollment events as produced by the map tasks. This is expected to be an iterable
             structure whose elements are tuples consisting of a timestamp and an event type.
+        checkpoint_spans (list): Optionally, the spans produced by enrollment_spans() for the history of the enrollment
+            up to the date of the first event, as (start datestamp, end datestamp, enrolled_at_end,
+            change_since_last_day, mode_at_end) tuples.  The state at the end of the last span is restored before
+            processing the events, and enrollment_spans() continues from these spans.
 
     """
 
     MODE_UNKNOWN = 'unknown'
 
-    def __init__(self, course_id, user_id, interval, events, increment_counter=None):
+    def __init__(self, course_id, user_id, interval, events, increment_counter=None, checkpoint_spans=None):
         self.course_id = course_id
         self.user_id = user_id
         self.interval = interval
         self.increment_counter = increment_counter
+        self.checkpoint_spans = checkpoint_spans or []
 
         self.sorted_events = sorted(events)
         # After sorting, we can discard time information since we only care about date transitions.
         self.sorted_events = [
             EnrollmentEvent(timestamp, event_type, mode) for timestamp, event_type, mode in self.sorted_events
         ]
+        if self.checkpoint_spans:
+            # A placeholder event without a type marks the end of the checkpoint. It does not change the state, but
+            # ensures that the state restored from the checkpoint is carried forward to the first real event.
+            self.sorted_events.insert(0, EnrollmentEvent(self.checkpoint_spans[-1][1], None, None))
         # Since each event looks ahead to see the time of the next event, insert a dummy event at then end that
         # indicates the end of the requested interval. If the user's last event is an enrollment activation event then
         # they are assumed to be enrolled up until the end of the requested interval. Note that the mapper ensures that
@@ -424,6 +466,9 @@ class DaysEnrolledForEvents(object):
         # time before the first event.
         self.state = self.previous_state = UNENROLLED
         self.mode = self.MODE_UNKNOWN
+        if self.checkpoint_spans:
+            _start, _end, self.state, _change, self.mode = self.checkpoint_spans[-1]
+            self.previous_state = self.state
 
     def days_enrolled(self):
         """
@@ -432,6 +477,50 @@ class DaysEnrolledForEvents(object):
         Yields:
             tuple: An enrollment record for each day during which the user was enrolled in the course.
 
+        """
+        for start_datestamp, end_datestamp, enrolled_at_end, change_since_last_day, mode_at_end in self.state_runs():
+            for datestamp in self.all_dates_between(start_datestamp, end_datestamp):
+                yield self.enrollment_record(
+                    datestamp,
+                    enrolled_at_end,
+                    change_since_last_day if datestamp == start_datestamp else 0,
+                    mode_at_end
+                )
+
+    def enrollment_spans(self):
+        """
+        A record is yielded for each span of consecutive days that would produce identical records in days_enrolled().
+
+        A span covers the dates from its start date (inclusive) up to its end date (exclusive), and expanding it
+        reproduces the records of days_enrolled(): the change is reported on the start date only, and is 0 on all other
+        days of the span.
+
+        Yields:
+            tuple: An enrollment span record.
+
+        """
+        span = None
+        for run in itertools.chain(self.checkpoint_spans, self.state_runs()):
+            start_datestamp, end_datestamp, enrolled_at_end, change_since_last_day, mode_at_end = run
+            if span is not None and change_since_last_day == 0 and (enrolled_at_end, mode_at_end) == (span[2], span[4]):
+                span[1] = end_datestamp
+                continue
+
+            if span is not None:
+                yield self.enrollment_span_record(*span)
+            span = list(run)
+
+        if span is not None:
+            yield self.enrollment_span_record(*span)
+
+    def state_runs(self):
+        """
+        Determine the state of the enrollment between consecutive dates with events.
+
+        Yields:
+            tuple: The start datestamp (inclusive), end datestamp (exclusive), enrolled_at_end, change_since_last_day
+                and mode_at_end for each range of dates that starts with a date with an event.
+
         """
         # The last element of the list is a placeholder indicating the end of the interval. Don't process it.
         for index in range(len(self.sorted_events) - 1):
@@ -445,17 +534,17 @@ class DaysEnrolledForEvents(object):
 
                 # There may be a very wide gap between this event and the next event. If the user is currently
                 # enrolled, we can assume they continue to be enrolled at least until the next day we see an event.
-                # Emit records for each of those intermediary days. Since the end of the interval is represented by
-                # a dummy event at the end of the list of events, it will be represented by self.next_event when
-                # processing the last real event in the stream. This allows the records to be produced up to the end
-                # of the interval if the last known state was "ENROLLED".
-                for datestamp in self.all_dates_between(self.event.datestamp, self.next_event.datestamp):
-                    yield self.enrollment_record(
-                        datestamp,
-                        self.state,
-                        change_since_last_day if datestamp == self.event.datestamp else 0,
-                        self.mode
-                    )
+                # Records are produced for each of those intermediary days. Since the end of the interval is
+                # represented by a dummy event at the end of the list of events, it will be represented by
+                # self.next_event when processing the last real event in the stream. This allows the records to be
+                # produced up to the end of the interval if the last known state was "ENROLLED".
+                yield (
+                    self.event.datestamp,
+                    self.next_event.datestamp,
+                    self.state,
+                    change_since_last_day,
+                    self.mode
+                )
 
                 self.previous_state = self.state
 
@@ -483,11 +572,21 @@ class DaysEnrolledForEvents(object):
         """A complete enrollment record."""
         return (datestamp, self.course_id, self.user_id, enrolled_at_end, change_since_last_day, mode_at_end)
 
+    def enrollment_span_record(self, start_datestamp, end_datestamp, enrolled_at_end, change_on_start, mode_at_end):
+        """A complete enrollment span record."""
+        return (
+            self.course_id, self.user_id, start_datestamp, end_datestamp, enrolled_at_end, change_on_start, mode_at_end
+        )
+
     def change_state(self):
         """Change state when appropriate.
 
         Note that in spite of our best efforts some events might be lost, causing invalid state transitions.
         """
+        if self.event.event_type is None:
+            # This is the placeholder for the end of the checkpoint, the state was restored in the constructor.
+            return
+
         if self.state == ENROLLED and self.event.event_type == DEACTIVATED:
             self.state = UNENROLLED
             self.increment_counter("Subset Unenrollment")
@@ -584,6 +683,148 @@ class ExternalCourseEnrollmentPartitionTask(CourseEnrollmentPartitionTask):
         )
 
 
+class CourseEnrollmentSpanTask(CourseEnrollmentTask):
+    """
+    Produce a data set with a record for each span of days over which a user's enrollment in a course was unchanged.
+
+    When `enrollment_checkpoint_date` is set, the spans in the course_enrollment_span partition for that date are read
+    instead of replaying the events before that date (or before the overwritten days, whichever is earlier).  Those
+    spans capture the state, mode and date of the last change of every enrollment, so the work done is proportional to
+    the number of enrollments and new events rather than to the full event history.  Leave the parameter unset to
+    rebuild all spans from the events.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(CourseEnrollmentSpanTask, self).__init__(*args, **kwargs)
+
+        if self.enrollment_checkpoint_date is not None:
+            self.replay_from_date = max(
+                self.interval.date_a, min(self.enrollment_checkpoint_date, self.overwrite_from_date)
+            )
+
+    @property
+    def checkpoint_url(self):
+        """The location of the course_enrollment_span partition that is used as a checkpoint."""
+        return url_path_join(
+            self.warehouse_path,
+            'course_enrollment_span',
+            'dt={}'.format(self.enrollment_checkpoint_date.isoformat()),  # pylint: disable=no-member
+        ) + '/'
+
+    def requires_hadoop(self):
+        requirements = super(CourseEnrollmentSpanTask, self).requires_hadoop()
+        if self.enrollment_checkpoint_date is not None:
+            requirements['checkpoint'] = ExternalURL(url=self.checkpoint_url)
+        return requirements
+
+    def mapper(self, line):
+        values = line.split('\t')
+        if len(values) == len(CourseEnrollmentSpanRecord.get_fields()):
+            course_id, user_id, start_date, end_date, at_end, change, mode = values
+            yield ((course_id, user_id), (start_date, end_date, int(at_end), int(change), mode))
+        else:
+            for output in super(CourseEnrollmentSpanTask, self).mapper(line):
+                yield output
+
+    def reducer(self, key, values):
+        """Emit records for each span of days that the user's enrollment in the course did not change."""
+        course_id, user_id = key
+
+        increment_counter = lambda counter_name: self.incr_counter(self.counter_category_name, counter_name, 1)
+
+        # Events before the date that replay starts from are already reflected in the checkpoint, and spans that end
+        # after it will be rebuilt from the events.
+        replay_from = self.replay_from_date.isoformat()
+        use_checkpoint = self.enrollment_checkpoint_date is not None
+        events = []
+        checkpoint_spans = []
+        for value in values:
+            if len(value) == 3:
+                if not use_checkpoint or eventlog.timestamp_to_datestamp(value[0]) >= replay_from:
+                    events.append(value)
+            else:
+                start_date, end_date, at_end, change, mode = value
+                if start_date < replay_from:
+                    checkpoint_spans.append((start_date, min(end_date, replay_from), at_end, change, mode))
+
+        event_stream_processor = DaysEnrolledForEvents(
+            course_id, user_id, self.interval, events, increment_counter, checkpoint_spans=sorted(checkpoint_spans)
+        )
+        for enrollment_span_record in event_stream_processor.enrollment_spans():
+            yield enrollment_span_record
+
+
+class CourseEnrollmentSpanRecord(Record):
+    """A span of days over which a user's enrollment in a course was unchanged."""
+    course_id = StringField(length=255, nullable=False, description='The course the learner is enrolled in.')
+    user_id = IntegerField(description='The user_id of the learner.')
+    start_date = DateField(nullable=False, description='The first date of the span.')
+    end_date = DateField(nullable=False, description='The date after the last date of the span.')
+    at_end = BooleanField(description='An indicator if the learner is still enrolled in the course at the end of each '
+                                      'date in the span.')
+    change = BooleanField(description='The change in enrollment on the first date of the span.')
+    mode = StringField(length=255, description='')
+
+
+# Expands each record of course_enrollment_span into one record per day, with the same columns as course_enrollment.
+COURSE_ENROLLMENT_FROM_SPANS_QUERY = """
+    SELECT
+        date_add(span.start_date, day.offset) AS `date`,
+        span.course_id,
+        span.user_id,
+        span.at_end,
+        IF(day.offset = 0, span.change, 0) AS change,
+        span.mode
+    FROM course_enrollment_span span
+    LATERAL VIEW posexplode(split(space(datediff(span.end_date, span.start_date) - 1), ' ')) day AS offset, unused
+"""
+
+
+class CourseEnrollmentSpanTableTask(BareHiveTableTask):
+    """Hive table that stores the spans of days over which users were enrolled in each course."""
+
+    @property
+    def table(self):
+        return 'course_enrollment_span'
+
+    @property
+    def columns(self):
+        return CourseEnrollmentSpanRecord.get_hive_schema()
+
+    @property  # pragma: no cover
+    def partition_by(self):
+        return 'dt'
+
+
+class CourseEnrollmentSpanPartitionTask(CourseEnrollmentPartitionTask):
+    """
+    Generates the course_enrollment_span hive partition.
+    """
+
+    @property
+    def hive_table_task(self):  # pragma: no cover
+        return CourseEnrollmentSpanTableTask(
+            warehouse_path=self.warehouse_path,
+            overwrite=self.overwrite
+        )
+
+    def requires(self):
+        for req in super(CourseEnrollmentPartitionTask, self).requires():
+            yield req
+
+        yield CourseEnrollmentSpanTask(
+            mapreduce_engine=self.mapreduce_engine,
+            warehouse_path=self.warehouse_path,
+            n_reduce_tasks=self.n_reduce_tasks,
+            source=self.source,
+            interval=self.interval,
+            pattern=self.pattern,
+            output_root=self.partition_location,
+            overwrite_n_days=self.overwrite_n_days,
+            enrollment_checkpoint_date=self.enrollment_checkpoint_date,
+        )
+
+
 class EnrollmentSummaryRecord(Record):
     """Summarizes a user's enrollment history for a particular course."""
 
@@ -818,13 +1059,13 @@ class EnrollmentByGenderDataTask(CourseEnrollmentDownstreamMixin, OverwriteAware
                 IF(p.gender != '', p.gender, NULL),
                 SUM(ce.at_end),
                 COUNT(ce.user_id)
-            FROM course_enrollment ce
+            FROM {course_enrollment} ce
             LEFT OUTER JOIN auth_userprofile p ON p.user_id = ce.user_id
             GROUP BY
                 ce.`date`,
                 ce.course_id,
                 IF(p.gender != '', p.gender, NULL)
-        """
+        """.format(course_enrollment=self.course_enrollment_table)
 
     @property
     def hive_partition_task(self):  # pragma: no cover
@@ -841,7 +1082,7 @@ class EnrollmentByGenderDataTask(CourseEnrollmentDownstreamMixin, OverwriteAware
 
         # the process that generates the source table used by this query
         yield (
-            CourseEnrollmentPartitionTask(
+            self.course_enrollment_partition_task(
                 mapreduce_engine=self.mapreduce_engine,
                 n_reduce_tasks=self.n_reduce_tasks,
                 source=self.source,
@@ -960,14 +1201,14 @@ class EnrollmentByBirthYearDataTask(CourseEnrollmentDownstreamMixin, OverwriteAw
                 p.year_of_birth,
                 SUM(ce.at_end),
                 COUNT(ce.user_id)
-            FROM course_enrollment ce
+            FROM {course_enrollment} ce
             LEFT OUTER JOIN auth_userprofile p ON p.user_id = ce.user_id
             WHERE ce.`date` = '{date}'
             GROUP BY
                 ce.`date`,
                 ce.course_id,
                 p.year_of_birth
-        """.format(date=self.query_date)
+        """.format(date=self.query_date, course_enrollment=self.course_enrollment_table)
 
     @property
     def hive_partition_task(self):
@@ -984,7 +1225,7 @@ class EnrollmentByBirthYearDataTask(CourseEnrollmentDownstreamMixin, OverwriteAw
 
         # the process that generates the source table used by this query
         yield (
-            CourseEnrollmentPartitionTask(
+            self.course_enrollment_partition_task(
                 mapreduce_engine=self.mapreduce_engine,
                 n_reduce_tasks=self.n_reduce_tasks,
                 source=self.source,
@@ -1107,7 +1348,7 @@ class EnrollmentByEducationLevelDataTask(CourseEnrollmentDownstreamMixin, Overwr
                         END,
                         SUM(ce.at_end),
                         COUNT(ce.user_id)
-                    FROM course_enrollment ce
+                    FROM {course_enrollment} ce
                     LEFT OUTER JOIN auth_userprofile p ON p.user_id = ce.user_id
                     WHERE ce.`date` = '{date}'
                     GROUP BY
@@ -1127,7 +1368,7 @@ class EnrollmentByEducationLevelDataTask(CourseEnrollmentDownstreamMixin, Overwr
                             WHEN 'other' THEN 'other'
                             ELSE NULL
                         END
-                """.format(date=self.query_date)
+                """.format(date=self.query_date, course_enrollment=self.course_enrollment_table)
         return query
 
     @property
@@ -1145,7 +1386,7 @@ class EnrollmentByEducationLevelDataTask(CourseEnrollmentDownstreamMixin, Overwr
 
         # the process that generates the source table used by this query
         yield (
-            CourseEnrollmentPartitionTask(
+            self.course_enrollment_partition_task(
                 mapreduce_engine=self.mapreduce_engine,
                 n_reduce_tasks=self.n_reduce_tasks,
                 source=self.source,
@@ -1266,12 +1507,12 @@ class EnrollmentByModeDataTask(CourseEnrollmentDownstreamMixin, OverwriteAwareHi
                 ce.mode,
                 SUM(ce.at_end),
                 COUNT(ce.user_id)
-            FROM course_enrollment ce
+            FROM {course_enrollment} ce
             GROUP BY
                 ce.`date`,
                 ce.course_id,
                 ce.mode
-        """.format(date=self.query_date)
+        """.format(date=self.query_date, course_enrollment=self.course_enrollment_table)
         return query
 
     @property
@@ -1289,7 +1530,7 @@ class EnrollmentByModeDataTask(CourseEnrollmentDownstreamMixin, OverwriteAwareHi
 
         # the process that generates the source table used by this query
         yield (
-            CourseEnrollmentPartitionTask(
+            self.course_enrollment_partition_task(
                 mapreduce_engine=self.mapreduce_engine,
                 n_reduce_tasks=self.n_reduce_tasks,
                 source=self.source,
@@ -1403,11 +1644,11 @@ class EnrollmentDailyDataTask(CourseEnrollmentDownstreamMixin, OverwriteAwareHiv
                 ce.`date`,
                 SUM(ce.at_end),
                 COUNT(ce.user_id)
-            FROM course_enrollment ce
+            FROM {course_enrollment} ce
             GROUP BY
                 ce.course_id,
                 ce.`date`
-        """.format(date=self.query_date)
+        """.format(date=self.query_date, course_enrollment=self.course_enrollment_table)
         return query
 
     @property
@@ -1425,7 +1666,7 @@ class EnrollmentDailyDataTask(CourseEnrollmentDownstreamMixin, OverwriteAwareHiv
 
         # the process that generates the source table used by this query
         yield (
-            CourseEnrollmentPartitionTask(
+            self.course_enrollment_partition_task(
                 mapreduce_engine=self.mapreduce_engine,
                 n_reduce_tasks=self.n_reduce_tasks,
                 source=self.source,
@@ -1888,13 +2129,13 @@ class CourseGradeByModeDataTask(CourseSummaryEnrollmentDownstreamMixin, Overwrit
         SELECT   all_enrollments.course_id AS course_id,
                  all_enrollments.mode AS mode,
                  SUM(CASE WHEN closest_enrollment.passed_timestamp IS NOT NULL THEN 1 ELSE 0 END) AS passing_users
-        FROM     course_enrollment all_enrollments
+        FROM     {course_enrollment} all_enrollments
                  LEFT OUTER JOIN (
                      SELECT ce.course_id,
                             ce.user_id,
                             MAX(ce.`date`) AS enrollment_date,
                             MAX(grades.passed_timestamp) AS passed_timestamp
-                     FROM   course_enrollment ce
+                     FROM   {course_enrollment} ce
                             INNER JOIN grades_persistentcoursegrade grades
                                     ON grades.course_id = ce.course_id
                                    AND grades.user_id = ce.user_id
@@ -1907,7 +2148,7 @@ class CourseGradeByModeDataTask(CourseSummaryEnrollmentDownstreamMixin, Overwrit
                         AND all_enrollments.`date` = closest_enrollment.enrollment_date
         GROUP BY all_enrollments.course_id,
                  all_enrollments.mode
-        """
+        """.format(course_enrollment=self.course_enrollment_table)
 
     @property
     def hive_partition_task(self):
@@ -1929,7 +2170,7 @@ class CourseGradeByModeDataTask(CourseSummaryEnrollmentDownstreamMixin, Overwrit
         )
 
         # this will give us the `course_enrollment` Hive table for the query above.
-        yield CourseEnrollmentPartitionTask(
+        yield self.course_enrollment_partition_task(
             mapreduce_engine=self.mapreduce_engine,
             n_reduce_tasks=self.n_reduce_tasks,
             source=self.source,
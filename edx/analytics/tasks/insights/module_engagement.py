@@ -13,7 +13,7 @@ import luigi.task
 from luigi import date_interval
 
 from edx.analytics.tasks.common.elasticsearch_load import ElasticsearchIndexTask
-from edx.analytics.tasks.common.mapreduce import MapReduceJobTask, MapReduceJobTaskMixin
+from edx.analytics.tasks.common.mapreduce import MapReduceJobTask, MapReduceJobTaskMixin, SumValuesMixin
 from edx.analytics.tasks.common.mysql_load import IncrementalMysqlInsertTask, MysqlInsertTask
 from edx.analytics.tasks.common.pathutil import EventLogSelectionDownstreamMixin, EventLogSelectionMixin
 from edx.analytics.tasks.insights.database_imports import (
@@ -81,7 +81,7 @@ class ModuleEngagementDownstreamMixin(WarehouseMixin, MapReduceJobTaskMixin, Eve
     interval = None
 
 
-class ModuleEngagementDataTask(EventLogSelectionMixin, OverwriteOutputMixin, MapReduceJobTask):
+class ModuleEngagementDataTask(SumValuesMixin, EventLogSelectionMixin, OverwriteOutputMixin, MapReduceJobTask):
     """
     Process the event log and categorize user engagement with various types of content.
 
@@ -104,6 +104,9 @@ class ModuleEngagementDataTask(EventLogSelectionMixin, OverwriteOutputMixin, Map
     # Override superclass to disable this parameter
     interval = None
 
+    # Only these events are categorized by get_user_actions_from_event().
+    event_line_substrings = ('problem_check', 'play_video', 'edx.forum.')
+
     # Write the output directly to the final destination and rely on the _SUCCESS file to indicate whether or not it
     # is complete. Note that this is a custom extension to luigi.
     enable_direct_output = True
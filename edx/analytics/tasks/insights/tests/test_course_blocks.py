@@ -1,5 +1,6 @@
 """Test course blocks tasks."""
 
+import datetime
 import json
 import logging
 import os
@@ -9,11 +10,14 @@ from unittest import TestCase
 from urllib import urlencode
 
 import httpretty
+import requests
 from ddt import data, ddt, unpack
+from mock import patch
 from requests.exceptions import HTTPError
 
 from edx.analytics.tasks.common.tests.map_reduce_mixins import MapperTestMixin, ReducerTestMixin
 from edx.analytics.tasks.insights.course_blocks import CourseBlocksApiDataTask, PullCourseBlocksApiData
+from edx.analytics.tasks.util.edx_api_client import EdxApiClient
 from edx.analytics.tasks.util.tests.helpers import load_fixture
 
 log = logging.getLogger(__name__)
@@ -295,6 +299,51 @@ class PullCourseBlocksApiDataTest(CourseBlocksTestMixin, TestCase):
                 lines = json_input.readlines()
                 self.assertEquals(len(lines), 1)
 
+    def test_concurrent_fetch(self):
+        course_ids = ('abc', 'def', 'ghi', 'jkl', 'mno')
+        self.create_task(api_concurrency=3)
+        self.create_input_file(course_ids)
+
+        def get(_client, _url, params=None):
+            """Return the blocks of every course but one, which is not found."""
+            response = requests.Response()
+            response.status_code = 404 if params['course_id'] == 'def' else 200
+            response._content = json.dumps(dict(root=params['course_id'], blocks={}))  # pylint: disable=protected-access
+            response.raise_for_status()
+            return response
+
+        # httpretty is not thread-safe, so the client is mocked instead.
+        with patch.object(EdxApiClient, 'get', autospec=True, side_effect=get):
+            self.task.run()
+
+        with self.task.output().open() as json_input:
+            records = [json.loads(line) for line in json_input]
+        self.assertEquals([record['course_id'] for record in records], ['abc', 'ghi', 'jkl', 'mno'])
+        self.assertEquals([record['root'] for record in records], ['abc', 'ghi', 'jkl', 'mno'])
+
+    def test_api_response_cache(self):
+        params = dict(depth="all", requested_fields="children", all_blocks="true", course_id=self.course_id)
+        body = dict(blocks={'abc': {}}, root='abc')
+        self.mock_api_call('POST', self.auth_url, body=dict(access_token='token', expires_in=2000))
+        responses = [
+            httpretty.Response(body=json.dumps(body), etag='"v1"'),
+            httpretty.Response(body='', status=304),
+        ]
+        httpretty.register_uri('GET', '{}?{}'.format(self.api_url, urlencode(params)),
+                               responses=responses, match_querystring=True)
+
+        outputs = []
+        for partition_datetime in (datetime.datetime(2016, 1, 1), datetime.datetime(2016, 1, 2)):
+            self.create_task(datetime=partition_datetime, use_api_response_cache=True)
+            self.task.run()
+            with self.task.output().open() as json_input:
+                outputs.append(json_input.read())
+
+        self.assertEquals(httpretty.last_request().headers['If-None-Match'], '"v1"')
+        self.assertEquals(outputs[0], outputs[1])
+        body['course_id'] = self.course_id
+        self.assertEquals(json.loads(outputs[1]), body)
+
     def test_cache(self):
         # The cache is clear, and the task is not complete
         self.create_task()
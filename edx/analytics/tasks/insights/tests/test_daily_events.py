@@ -0,0 +1,98 @@
+"""Tests for extracting the data of a day of tracking logs with a single scan."""
+
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import luigi.task
+
+from edx.analytics.tasks.insights.daily_events import DailyEventsFanOutTask
+
+
+class DailyEventsFanOutTaskTest(unittest.TestCase):
+    """Run DailyEventsFanOutTask end to end on local files."""
+
+    COURSE_ID = 'course-v1:edX+DemoX+Demo_2014'
+
+    def setUp(self):
+        luigi.task.Register.clear_instance_cache()
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.source = os.path.join(self.temp_dir, 'input')
+        os.makedirs(self.source)
+        self.warehouse_path = os.path.join(self.temp_dir, 'warehouse')
+
+    def create_event(self, event_type, time, event, event_source='server'):
+        """Create a tracking log line."""
+        return json.dumps({
+            'username': 'test_user',
+            'event_source': event_source,
+            'event_type': event_type,
+            'time': '2014-03-01T{0}.000000+00:00'.format(time),
+            'context': {'course_id': self.COURSE_ID, 'user_id': 10},
+            'event': event,
+        })
+
+    def read_output(self, *path):
+        """Read the lines of a file written to the warehouse."""
+        with open(os.path.join(self.warehouse_path, *path), 'r') as output_file:
+            return [line.rstrip('\n') for line in output_file]
+
+    def test_run(self):
+        lines = [
+            self.create_event(
+                'edx.course.enrollment.activated', '01:00:00',
+                {'course_id': self.COURSE_ID, 'user_id': 10, 'mode': 'honor'},
+            ),
+            self.create_event(
+                'play_video', '02:00:00',
+                json.dumps({'id': 'video1', 'currentTime': 0, 'code': 'html5'}),
+                event_source='browser',
+            ),
+            self.create_event(
+                'pause_video', '02:00:05',
+                json.dumps({'id': 'video1', 'currentTime': 5, 'code': 'html5'}),
+                event_source='browser',
+            ),
+            self.create_event('problem_check', '03:00:00', {'problem_id': 'problem1', 'success': 'correct'}),
+            'garbage',
+        ]
+        with open(os.path.join(self.source, 'tracking.log-20140301'), 'w') as log_file:
+            log_file.write('\n'.join(lines) + '\n')
+
+        task = DailyEventsFanOutTask(
+            date=datetime.date(2014, 3, 1),
+            source=(self.source,),
+            pattern=(r'.*tracking.log-(?P<date>\d{8}).*',),
+            expand_interval=datetime.timedelta(0),
+            warehouse_path=self.warehouse_path,
+            mapreduce_engine='local',
+            marker=os.path.join(self.temp_dir, 'marker'),
+        )
+        task.run()
+
+        self.assertTrue(task.complete())
+        for consumer in task.consumers.itervalues():
+            self.assertTrue(consumer.complete())
+
+        self.assertEqual(
+            self.read_output(
+                'course_enrollment_events', 'dt=2014-03-01', 'course_enrollment_events_2014-03-01'
+            ),
+            [
+                '{0}\t10\t2014-03-01T01:00:00.000000\tedx.course.enrollment.activated\thonor'.format(
+                    self.COURSE_ID
+                ),
+            ]
+        )
+        self.assertEqual(self.read_output('module_engagement', 'dt=2014-03-01', 'part-00000'), [
+            '{0}\ttest_user\t2014-03-01\tproblem\tproblem1\tattempted\t1'.format(self.COURSE_ID),
+            '{0}\ttest_user\t2014-03-01\tproblem\tproblem1\tcompleted\t1'.format(self.COURSE_ID),
+            '{0}\ttest_user\t2014-03-01\tvideo\tvideo1\tviewed\t1'.format(self.COURSE_ID),
+        ])
+        viewings = self.read_output('video_viewing', 'dt=2014-03-02', 'part-00000')
+        self.assertEqual(len(viewings), 1)
+        self.assertTrue(viewings[0].startswith('10\t{0}\tvideo1\t'.format(self.COURSE_ID)))
@@ -1,15 +1,15 @@
 """Test enrollment computations"""
 
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest import TestCase
 
 import luigi
 
 from edx.analytics.tasks.common.tests.map_reduce_mixins import MapperTestMixin, ReducerTestMixin
 from edx.analytics.tasks.insights.enrollments import (
-    ACTIVATED, DEACTIVATED, MODE_CHANGED, CourseEnrollmentEventsTask, CourseEnrollmentSummaryTask, CourseEnrollmentTask,
-    CourseMetaSummaryEnrollmentIntoMysql
+    ACTIVATED, DEACTIVATED, MODE_CHANGED, CourseEnrollmentEventsTask, CourseEnrollmentSpanTask,
+    CourseEnrollmentSummaryTask, CourseEnrollmentTask, CourseMetaSummaryEnrollmentIntoMysql, EnrollmentDailyDataTask
 )
 from edx.analytics.tasks.util.tests.opaque_key_mixins import InitializeLegacyKeysMixin, InitializeOpaqueKeysMixin
 
@@ -414,6 +414,161 @@ class CourseEnrollmentTaskReducerTest(ReducerTestMixin, TestCase):
         self._check_output_complete_tuple(inputs, expected)
 
 
+class CourseEnrollmentSpanTaskReducerTest(ReducerTestMixin, TestCase):
+    """
+    Tests to verify that the enrollment span reducer works correctly.
+    """
+    def setUp(self):
+        self.task_class = CourseEnrollmentSpanTask
+        self.create_enrollment_task()
+        self.user_id = 0
+        self.course_id = 'foo/bar/baz'
+        self.reduce_key = (self.course_id, self.user_id)
+
+    def create_enrollment_task(self, interval='2013-01-01', task_class=CourseEnrollmentSpanTask, **kwargs):
+        """Create a task for testing purposes."""
+        fake_param = luigi.DateIntervalParameter()
+        self.task = task_class(
+            interval=fake_param.parse(interval),
+            output_root="/fake/output",
+            overwrite_n_days=5,
+            **kwargs
+        )
+        return self.task
+
+    def test_no_events(self):
+        self.assert_no_output([])
+
+    def test_single_enrollment(self):
+        self.create_enrollment_task('2012-12-30-2013-01-04')
+        inputs = [('2013-01-01T00:00:01', ACTIVATED, 'honor'), ]
+        expected = ((self.course_id, self.user_id, '2013-01-01', '2013-01-04', 1, 1, 'honor'),)
+        self._check_output_complete_tuple(inputs, expected)
+
+    def test_missing_days(self):
+        self.create_enrollment_task('2012-12-30-2013-01-07')
+        inputs = [
+            ('2013-01-01T00:00:01', ACTIVATED, 'honor'),
+            ('2013-01-02T00:00:01', ACTIVATED, 'honor'),
+            ('2013-01-04T00:00:01', DEACTIVATED, 'honor'),
+            ('2013-01-06T00:00:01', ACTIVATED, 'honor'),
+        ]
+        expected = (
+            (self.course_id, self.user_id, '2013-01-01', '2013-01-04', 1, 1, 'honor'),
+            (self.course_id, self.user_id, '2013-01-04', '2013-01-06', 0, -1, 'honor'),
+            (self.course_id, self.user_id, '2013-01-06', '2013-01-07', 1, 1, 'honor'),
+        )
+        self._check_output_complete_tuple(inputs, expected)
+
+    def test_mode_change(self):
+        self.create_enrollment_task('2013-01-01-2013-01-04')
+        inputs = [
+            ('2013-01-01T00:00:01', ACTIVATED, 'honor'),
+            ('2013-01-02T00:00:02', MODE_CHANGED, 'verified')
+        ]
+        expected = (
+            (self.course_id, self.user_id, '2013-01-01', '2013-01-02', 1, 1, 'honor'),
+            (self.course_id, self.user_id, '2013-01-02', '2013-01-04', 1, 0, 'verified'),
+        )
+        self._check_output_complete_tuple(inputs, expected)
+
+    def test_expand_to_days_enrolled(self):
+        interval = '2012-12-30-2013-01-10'
+        inputs = [
+            ('2013-01-01T00:00:04', DEACTIVATED, 'honor'),
+            ('2013-01-01T00:00:03', ACTIVATED, 'honor'),
+            ('2013-01-02T00:00:01', ACTIVATED, 'honor'),
+            ('2013-01-03T00:00:01', MODE_CHANGED, 'honor'),
+            ('2013-01-04T00:00:01', MODE_CHANGED, 'verified'),
+            ('2013-01-06T00:00:01', DEACTIVATED, 'verified'),
+            ('2013-01-07T00:00:01', DEACTIVATED, 'verified'),
+            ('2013-01-08T00:00:01', ACTIVATED, 'audit'),
+        ]
+        days = tuple(self.create_enrollment_task(interval, CourseEnrollmentTask).reducer(self.reduce_key, inputs))
+        spans = tuple(self.create_enrollment_task(interval).reducer(self.reduce_key, inputs))
+
+        self.assertEqual(len(spans), 5)
+        self.assertEqual(tuple(self.expand_spans(spans)), days)
+
+    def expand_spans(self, spans):
+        """Convert span records into the equivalent records for each day, as the Hive query does."""
+        for course_id, user_id, start_date, end_date, at_end, change, mode in spans:
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+            for offset in range((end_date - start_date).days):
+                date = start_date + timedelta(days=offset)
+                yield (date.isoformat(), course_id, user_id, at_end, change if offset == 0 else 0, mode)
+
+    def test_resume_from_checkpoint(self):
+        inputs = [
+            ('2013-01-01T00:00:01', ACTIVATED, 'honor'),
+            ('2013-01-02T00:00:01', MODE_CHANGED, 'verified'),
+            ('2013-01-06T00:00:01', DEACTIVATED, 'verified'),
+            ('2013-01-08T00:00:01', ACTIVATED, 'verified'),
+        ]
+        full_rebuild = tuple(self.create_enrollment_task('2012-12-30-2013-01-10').reducer(self.reduce_key, inputs))
+
+        # The previous run covered the events up to 2013-01-07.
+        previous_run = self.create_enrollment_task('2012-12-30-2013-01-07').reducer(self.reduce_key, inputs[:3])
+        checkpoint_values = [span[2:] for span in previous_run]
+
+        task = self.create_enrollment_task(
+            '2012-12-30-2013-01-10',
+            enrollment_checkpoint_date=datetime(2013, 1, 7).date(),
+        )
+        # Only the events in the overwritten days are replayed.
+        self.assertEqual(task.replay_from_date.isoformat(), '2013-01-05')
+        self.assertEqual(tuple(task.reducer(self.reduce_key, checkpoint_values + inputs[2:])), full_rebuild)
+
+    def test_checkpoint_without_new_events(self):
+        checkpoint_values = [
+            ('2013-01-01', '2013-01-03', 1, 1, 'honor'),
+            ('2013-01-03', '2013-01-07', 0, -1, 'honor'),
+        ]
+        task = self.create_enrollment_task(
+            '2012-12-30-2013-01-10',
+            enrollment_checkpoint_date=datetime(2013, 1, 7).date(),
+        )
+        self.assertEqual(tuple(task.reducer(self.reduce_key, checkpoint_values)), (
+            (self.course_id, self.user_id, '2013-01-01', '2013-01-03', 1, 1, 'honor'),
+            (self.course_id, self.user_id, '2013-01-03', '2013-01-10', 0, -1, 'honor'),
+        ))
+
+    def test_map_checkpoint(self):
+        task = self.create_enrollment_task(enrollment_checkpoint_date=datetime(2013, 1, 7).date())
+        line = '\t'.join([self.course_id, '0', '2013-01-01', '2013-01-03', '1', '1', 'honor'])
+        self.assertEqual(tuple(task.mapper(line)), (
+            ((self.course_id, '0'), ('2013-01-01', '2013-01-03', 1, 1, 'honor')),
+        ))
+
+    def test_checkpoint_input(self):
+        task = self.create_enrollment_task(
+            '2012-12-30-2013-01-10',
+            warehouse_path='/fake/warehouse',
+            enrollment_checkpoint_date=datetime(2013, 1, 7).date(),
+        )
+        requirements = task.requires_hadoop()
+        self.assertEqual(requirements['checkpoint'].url, '/fake/warehouse/course_enrollment_span/dt=2013-01-07/')
+        # All of the events since the checkpoint are in the overwritten days.
+        self.assertNotIn('path_selection_task', requirements)
+
+        task = self.create_enrollment_task(
+            '2012-12-30-2013-01-10',
+            warehouse_path='/fake/warehouse',
+            enrollment_checkpoint_date=datetime(2013, 1, 3).date(),
+        )
+        path_selection_interval = task.requires_hadoop()['path_selection_task'].interval
+        self.assertEqual(
+            (path_selection_interval.date_a.isoformat(), path_selection_interval.date_b.isoformat()),
+            ('2013-01-03', '2013-01-05')
+        )
+
+    def test_hive_query_reads_spans(self):
+        task = EnrollmentDailyDataTask(interval=luigi.DateIntervalParameter().parse('2013-01-01'), enrollment_spans=True)
+        self.assertIn('FROM course_enrollment_span span', task.insert_query)
+        self.assertNotIn('FROM course_enrollment ce', task.insert_query)
+
+
 class CourseEnrollmentSummaryTaskReducerTest(ReducerTestMixin, TestCase):
     """
     Tests to verify that events-per-day-per-user reducer works correctly.
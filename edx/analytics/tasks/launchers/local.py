@@ -22,17 +22,18 @@ import cjson
 import filechunkio
 import idna
 import luigi
+import luigi.cmdline_parser
 import luigi.configuration
 import luigi.contrib.hadoop
 import luigi.retcodes
 import opaque_keys
-import pyinstrument
 import requests
 import six
 import stevedore
 import urllib3
 
 import edx.analytics.tasks
+from edx.analytics.tasks.launchers import task_index
 
 # Tell urllib3 to switch the ssl backend to PyOpenSSL.
 # see https://urllib3.readthedocs.org/en/latest/security.html#pyopenssl
@@ -61,9 +62,8 @@ def main():
     # In order to see errors during extension loading, you can uncomment the next line.
     logging.basicConfig(level=logging.DEBUG)
 
-    # Load tasks configured using entry_points
-    # TODO: launch tasks by their entry_point name
-    stevedore.ExtensionManager('edx.analytics.tasks')
+    # Load the task, using the task index to avoid loading all of the tasks configured using entry_points.
+    load_tasks(cmdline_args)
 
     # Load the override configuration if it's specified/exists.
     configuration = luigi.configuration.get_config()
@@ -85,7 +85,7 @@ def main():
     # Tell luigi what dependencies to pass to the Hadoop nodes:
     # - edx.analytics.tasks is used to load the pipeline code, since we cannot trust all will be loaded automatically.
     # - boto is used for all direct interactions with s3.
-    # - cjson is used for all parsing event logs.
+    # - cjson is used for all parsing event logs, unless another library is configured in [map-reduce] json_codec.
     # - filechunkio is used for multipart uploads of large files to s3.
     # - opaque_keys is used to interpret serialized course_ids
     #   - opaque_keys extensions:  ccx_keys
@@ -99,6 +99,10 @@ def main():
         import ccx_keys
         luigi.contrib.hadoop.attach(ccx_keys)
 
+    json_codec_name = configuration.get('map-reduce', 'json_codec', 'cjson')
+    if json_codec_name in ('ujson', 'simplejson'):
+        luigi.contrib.hadoop.attach(__import__(json_codec_name))
+
     # TODO: setup logging for tasks or configured logging mechanism
 
     # Launch Luigi using the default builder
@@ -107,6 +111,15 @@ def main():
         luigi.retcodes.run_with_retcodes(cmdline_args)
 
 
+def load_tasks(cmdline_args):
+    """
+    Imports the module of the task named on the command line, or the modules of all tasks if it is not in the index.
+    """
+    # pylint: disable=protected-access
+    known_args, _unknown_args = luigi.cmdline_parser.CmdlineParser._build_parser().parse_known_args(args=cmdline_args)
+    return task_index.load_task(known_args.root_task, task_index.get_index_path())
+
+
 def get_cleaned_command_line_args():
     """
     Gets a list of command-line arguments after removing local launcher-specific parameters.
@@ -126,6 +139,7 @@ def get_cleaned_command_line_args():
 @contextmanager
 def profile_if_necessary(profiler_name, file_path):
     if profiler_name == 'pyinstrument':
+        import pyinstrument
         profiler = pyinstrument.Profiler(use_signal=False)
         profiler.start()
 
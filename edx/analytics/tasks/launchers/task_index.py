@@ -0,0 +1,139 @@
+"""
+Index of the task families that can be launched, and the modules that define them.
+
+Loading every `edx.analytics.tasks` entry point imports every task module of the pipeline along with all of their
+dependencies, which takes a large share of the wall time of short workflows.  The index maps each task family to the
+module that defines it, so that `launch-task` only needs to import the module of the task it runs.
+
+The index can be written ahead of time with `launch-task-index`.  When a task is missing from the index, or its module
+no longer defines it, every entry point is loaded as before and the index is written again.
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import tempfile
+
+import stevedore
+from luigi.task_register import Register, TaskClassException
+
+log = logging.getLogger(__name__)
+
+ENTRY_POINT_NAMESPACE = 'edx.analytics.tasks'
+# The index is read from and written to this path unless another one is given in the LAUNCH_TASK_INDEX environment
+# variable.  Setting that variable to an empty string disables the index.
+DEFAULT_INDEX_PATH = os.path.join(tempfile.gettempdir(), 'edx-analytics-task-index.json')
+
+
+def get_index_path():
+    """Returns the path of the task index, or None if the index is disabled."""
+    return os.getenv('LAUNCH_TASK_INDEX', DEFAULT_INDEX_PATH) or None
+
+
+def load_all_tasks():
+    """Import every task module named by an entry point."""
+    stevedore.ExtensionManager(ENTRY_POINT_NAMESPACE)
+
+
+def is_task_registered(task_family):
+    """Returns True if a single task class is registered for the task family."""
+    try:
+        Register.get_task_cls(task_family)
+    except TaskClassException:
+        return False
+    return True
+
+
+def get_registered_task_modules():
+    """Returns a dict mapping the families of all of the registered tasks to the names of their modules."""
+    task_modules = {}
+    for task_family in Register.task_names():
+        try:
+            task_modules[task_family] = Register.get_task_cls(task_family).__module__
+        except TaskClassException:
+            # Ambiguous task families can't be launched by name anyway.
+            pass
+    return task_modules
+
+
+def build_task_index():
+    """Load every entry point and return the index of the registered tasks."""
+    load_all_tasks()
+    return get_registered_task_modules()
+
+
+def read_task_index(path):
+    """Returns the index stored at the path, or an empty index if it can't be read."""
+    try:
+        with open(path, 'r') as index_file:
+            return json.load(index_file)
+    except (IOError, ValueError) as error:
+        log.debug('Unable to read task index %s: %s', path, error)
+        return {}
+
+
+def write_task_index(task_index, path):
+    """Store the index at the path, replacing any previous index atomically."""
+    temp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+    with open(temp_path, 'w') as index_file:
+        json.dump(task_index, index_file, indent=0, sort_keys=True)
+    os.rename(temp_path, path)
+
+
+def load_task(task_family, index_path=None):
+    """
+    Import the module that defines a task family, using the index if there is one.
+
+    Every entry point is loaded if the task family is unknown or can't be loaded through the index, in which case the
+    index is written again.
+
+    Returns:
+        True if the task was loaded without loading every entry point.
+    """
+    if task_family and index_path:
+        if is_task_registered(task_family):
+            return True
+
+        module_name = read_task_index(index_path).get(task_family)
+        if module_name:
+            try:
+                importlib.import_module(module_name)
+            except Exception:  # pylint: disable=broad-except
+                log.exception('Unable to import module %s of task %s', module_name, task_family)
+            if is_task_registered(task_family):
+                log.debug('Loaded task %s from module %s', task_family, module_name)
+                return True
+
+        log.debug('Task %s is not in the task index %s, loading all tasks', task_family, index_path)
+
+    load_all_tasks()
+    if index_path:
+        try:
+            write_task_index(get_registered_task_modules(), index_path)
+        except (IOError, OSError) as error:
+            log.warning('Unable to write task index %s: %s', index_path, error)
+    return False
+
+
+def main():
+    """Command-line utility to write the task index."""
+    arg_parser = argparse.ArgumentParser(
+        description='Write the index of the task modules used by launch-task to avoid importing all of them.'
+    )
+    arg_parser.add_argument(
+        '-o', '--output',
+        help='Write the index here.  Defaults to the LAUNCH_TASK_INDEX environment variable or ' + DEFAULT_INDEX_PATH,
+        default=None,
+    )
+    args = arg_parser.parse_args()
+
+    path = args.output or get_index_path() or DEFAULT_INDEX_PATH
+    task_index = build_task_index()
+    write_task_index(task_index, path)
+    print 'Wrote {0} tasks to {1}'.format(len(task_index), path)
+
+
+if __name__ == '__main__':
+    main()
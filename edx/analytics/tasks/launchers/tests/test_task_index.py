@@ -0,0 +1,86 @@
+"""Tests for loading tasks through the task index."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from mock import patch
+
+from edx.analytics.tasks.launchers import task_index
+from edx.analytics.tasks.launchers.local import load_tasks
+from edx.analytics.tasks.tools.launch_task_benchmark import run_benchmark
+
+
+TASK_MODULE_TEMPLATE = '''
+import luigi
+
+
+class {task_family}(luigi.Task):
+    pass
+'''
+
+
+class LoadTaskTestCase(unittest.TestCase):
+    """Tests for load_task()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        sys.path.insert(0, self.temp_dir)
+        self.addCleanup(sys.path.remove, self.temp_dir)
+        self.index_path = os.path.join(self.temp_dir, 'index.json')
+        patcher = patch.dict(os.environ, {'LAUNCH_TASK_INDEX': self.index_path})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Task classes stay registered, so every test needs a task family of its own.
+        self.task_family = 'IndexTestTask{0}'.format(self.id().rpartition('.')[2])
+        self.module_name = 'task_index_test_{0}'.format(self.id().rpartition('.')[2])
+        with open(os.path.join(self.temp_dir, self.module_name + '.py'), 'w') as module_file:
+            module_file.write(TASK_MODULE_TEMPLATE.format(task_family=self.task_family))
+        self.addCleanup(sys.modules.pop, self.module_name, None)
+
+        patcher = patch.object(task_index, 'load_all_tasks', side_effect=self.load_all_tasks)
+        self.mock_load_all_tasks = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def load_all_tasks(self):
+        """Stand in for loading the entry points by importing the test task module."""
+        __import__(self.module_name)
+
+    def test_indexed_task(self):
+        task_index.write_task_index({self.task_family: self.module_name}, self.index_path)
+
+        self.assertTrue(load_tasks([self.task_family, '--local-scheduler']))
+        self.assertTrue(task_index.is_task_registered(self.task_family))
+        self.assertFalse(self.mock_load_all_tasks.called)
+
+    def test_missing_index(self):
+        self.assertFalse(task_index.load_task(self.task_family, self.index_path))
+        self.assertTrue(self.mock_load_all_tasks.called)
+        self.assertEqual(task_index.read_task_index(self.index_path)[self.task_family], self.module_name)
+
+    def test_stale_index(self):
+        task_index.write_task_index({self.task_family: 'os'}, self.index_path)
+
+        self.assertFalse(task_index.load_task(self.task_family, self.index_path))
+        self.assertTrue(self.mock_load_all_tasks.called)
+        self.assertEqual(task_index.read_task_index(self.index_path)[self.task_family], self.module_name)
+
+    def test_disabled_index(self):
+        with patch.dict(os.environ, {'LAUNCH_TASK_INDEX': ''}):
+            self.assertIsNone(task_index.get_index_path())
+            self.assertFalse(load_tasks([self.task_family]))
+        self.assertTrue(self.mock_load_all_tasks.called)
+        self.assertFalse(os.path.exists(self.index_path))
+
+    def test_benchmark(self):
+        with patch('edx.analytics.tasks.tools.launch_task_benchmark.subprocess.check_call') as mock_check_call:
+            results = run_benchmark(self.task_family, self.index_path, repeat=3)
+
+        self.assertEqual([result['mode'] for result in results], ['index', 'all'])
+        self.assertEqual(mock_check_call.call_count, 7)
+        index_paths = [call[1]['env']['LAUNCH_TASK_INDEX'] for call in mock_check_call.call_args_list]
+        self.assertEqual(index_paths, [self.index_path] * 4 + [''] * 3)
@@ -4,14 +4,14 @@ import logging
 
 import luigi
 
-from edx.analytics.tasks.common.mapreduce import MapReduceJobTask
+from edx.analytics.tasks.common.mapreduce import MapReduceJobTask, SumValuesMixin
 from edx.analytics.tasks.common.pathutil import EventLogSelectionMixin
 from edx.analytics.tasks.util.url import get_target_from_url
 
 log = logging.getLogger(__name__)
 
 
-class TotalEventsDailyTask(EventLogSelectionMixin, MapReduceJobTask):
+class TotalEventsDailyTask(SumValuesMixin, EventLogSelectionMixin, MapReduceJobTask):
     """Produce a dataset for total events within a given time period."""
 
     output_root = luigi.Parameter()
@@ -29,8 +29,5 @@ class TotalEventsDailyTask(EventLogSelectionMixin, MapReduceJobTask):
         count = sum(values)
         yield key, count
 
-    # Take advantage of a combiner to optimize network hops
-    combiner = reducer
-
     def output(self):
         return get_target_from_url(self.output_root)
@@ -100,12 +100,13 @@ class TotalEventsTaskMapTest(InitializeOpaqueKeysMixin, MapperTestMixin, TestCas
         event_line = self.create_event_dict()
         del event_line["time"]
         line = json.dumps(event_line)
-        # When the time element is missing, luigi will print an error to stderr.
-        # Capture stderr and assert it is what we expect. Also assert that we do not
-        # count the event.
+        # When the time element is missing, luigi will print an error to stderr
+        # once the counters are flushed. Capture stderr and assert it is what we
+        # expect. Also assert that we do not count the event.
         test_stderr = StringIO()
         sys.stderr = test_stderr
         self.assert_no_map_output_for(line)
+        self.task._flush_batch_incr_counter()  # pylint: disable=protected-access
         test_stderr = test_stderr.getvalue().strip()
         self.assertEquals(test_stderr, 'reporter:counter:Event,Discard Missing Time Field,1')
 
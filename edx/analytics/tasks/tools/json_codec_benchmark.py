@@ -0,0 +1,139 @@
+"""
+Command-line utility to compare the JSON libraries supported by `json_codec` on a sample of tracking log lines.
+
+For every installed library, each line is decoded the same way `eventlog.parse_json_event()` does it and the result is
+compared to the result obtained with the json module from the standard library.  The number of lines that could not
+be decoded, the number of lines that decoded to something different, and the time taken to decode all of the lines and
+to encode the decoded events again are reported.
+"""
+
+import argparse
+import gzip
+import time
+
+from edx.analytics.tasks.util import eventlog, json_codec
+
+REFERENCE_CODEC = 'json'
+
+
+def read_lines(paths, max_lines=None):
+    """Read up to `max_lines` tracking log lines from the given files, which may be gzipped."""
+    lines = []
+    for path in paths:
+        open_file = gzip.open if path.endswith('.gz') else open
+        with open_file(path, 'rb') as input_file:
+            for line in input_file:
+                if max_lines is not None and len(lines) >= max_lines:
+                    return lines
+                line = line.rstrip('\r\n')
+                if line:
+                    lines.append(line)
+    return lines
+
+
+def decode_line(codec, line):
+    """Decode a line using the codec, including the recovery of events prefixed by other data, or return None."""
+    try:
+        return codec.decode(line)
+    except Exception:  # pylint: disable=broad-except
+        json_match = eventlog.PATTERN_JSON.match(line)
+        if json_match:
+            try:
+                return codec.decode(json_match.group(1))
+            except Exception:  # pylint: disable=broad-except
+                pass
+    return None
+
+
+def benchmark_codec(codec, lines, reference_events):
+    """Returns a dict of statistics for decoding and encoding the lines with the codec."""
+    start_time = time.time()
+    events = [decode_line(codec, line) for line in lines]
+    decode_seconds = time.time() - start_time
+
+    decoded_events = [event for event in events if event is not None]
+    start_time = time.time()
+    encode_failures = 0
+    for event in decoded_events:
+        try:
+            codec.encode(event)
+        except Exception:  # pylint: disable=broad-except
+            encode_failures += 1
+    encode_seconds = time.time() - start_time
+
+    return {
+        'codec': codec.name,
+        'lines': len(lines),
+        'decode_failures': sum(1 for event in events if event is None),
+        'mismatches': sum(
+            1 for event, expected in zip(events, reference_events) if event is not None and event != expected
+        ),
+        'encode_failures': encode_failures,
+        'decode_seconds': decode_seconds,
+        'encode_seconds': encode_seconds,
+    }
+
+
+def run_benchmark(lines, codec_names=None):
+    """Returns a list of statistics, one dict per codec, for the installed codecs or the named ones."""
+    if codec_names:
+        codecs = [json_codec.get_codec(name) for name in codec_names]
+    else:
+        codecs = json_codec.get_available_codecs()
+
+    reference_codec = json_codec.get_codec(REFERENCE_CODEC)
+    reference_events = [decode_line(reference_codec, line) for line in lines]
+
+    return [benchmark_codec(codec, lines, reference_events) for codec in codecs]
+
+
+def print_results(results):
+    """Print the statistics as a table."""
+    row_format = '{codec:<12} {lines:>10} {decode_failures:>10} {mismatches:>10} {encode_failures:>10} ' \
+        '{decode_seconds:>12} {encode_seconds:>12}'
+    print row_format.format(
+        codec='codec',
+        lines='lines',
+        decode_failures='failed',
+        mismatches='mismatched',
+        encode_failures='unencoded',
+        decode_seconds='decode (s)',
+        encode_seconds='encode (s)',
+    )
+    for result in results:
+        formatted = dict(result)
+        formatted['decode_seconds'] = '{0:.3f}'.format(result['decode_seconds'])
+        formatted['encode_seconds'] = '{0:.3f}'.format(result['encode_seconds'])
+        print row_format.format(**formatted)
+
+
+def main():
+    """Command-line utility to compare the JSON libraries on a sample of tracking log lines."""
+    arg_parser = argparse.ArgumentParser(
+        description='Compare the speed and correctness of JSON libraries on tracking log files.'
+    )
+    arg_parser.add_argument(
+        'input',
+        help='Read tracking log lines from these local files, which may be gzipped.',
+        nargs='+',
+    )
+    arg_parser.add_argument(
+        '-c', '--codecs',
+        help='Only benchmark these libraries.  Defaults to all of the installed ones.',
+        nargs='*',
+        choices=list(json_codec.CODEC_LOADERS),
+    )
+    arg_parser.add_argument(
+        '-n', '--max-lines',
+        help='Read at most this many lines.',
+        type=int,
+        default=None,
+    )
+    args = arg_parser.parse_args()
+
+    lines = read_lines(args.input, args.max_lines)
+    print_results(run_benchmark(lines, args.codecs))
+
+
+if __name__ == '__main__':
+    main()
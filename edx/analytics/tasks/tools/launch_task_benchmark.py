@@ -0,0 +1,85 @@
+"""
+Command-line utility to measure how long `launch-task` takes to start up and load a task.
+
+Each run starts a new Python process that imports the launcher and loads the task, either through the task index or by
+loading every entry point, and the wall time of the process is reported.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from edx.analytics.tasks.launchers import task_index
+
+LOAD_TASK_SCRIPT = 'import sys; from edx.analytics.tasks.launchers import local; local.load_tasks(sys.argv[1:])'
+
+
+def time_startup(task_family, index_path):
+    """Returns the wall time, in seconds, of a process that loads the task, using the index unless it is None."""
+    env = dict(os.environ)
+    env['LAUNCH_TASK_INDEX'] = index_path or ''
+    start_time = time.time()
+    subprocess.check_call([sys.executable, '-c', LOAD_TASK_SCRIPT, task_family], env=env)
+    return time.time() - start_time
+
+
+def run_benchmark(task_family, index_path, repeat=5):
+    """Returns a list of statistics, one dict for loading the task through the index and one for loading all tasks."""
+    # Make sure the index exists and knows about the task before it is measured.
+    time_startup(task_family, index_path)
+
+    results = []
+    for mode, mode_index_path in (('index', index_path), ('all', None)):
+        timings = sorted(time_startup(task_family, mode_index_path) for _ in range(repeat))
+        results.append({
+            'mode': mode,
+            'runs': repeat,
+            'min_seconds': timings[0],
+            'median_seconds': timings[len(timings) // 2],
+        })
+    return results
+
+
+def print_results(results):
+    """Print the statistics as a table."""
+    row_format = '{mode:<8} {runs:>6} {min_seconds:>10} {median_seconds:>12}'
+    print row_format.format(mode='mode', runs='runs', min_seconds='min (s)', median_seconds='median (s)')
+    for result in results:
+        formatted = dict(result)
+        formatted['min_seconds'] = '{0:.3f}'.format(result['min_seconds'])
+        formatted['median_seconds'] = '{0:.3f}'.format(result['median_seconds'])
+        print row_format.format(**formatted)
+
+
+def main():
+    """Command-line utility to measure the startup time of launch-task."""
+    arg_parser = argparse.ArgumentParser(
+        description='Compare the time launch-task takes to load a task through the task index and without it.'
+    )
+    arg_parser.add_argument(
+        'task',
+        help='The task family to load, as given to launch-task.',
+    )
+    arg_parser.add_argument(
+        '-i', '--index',
+        help='Use the task index at this path.  Defaults to the LAUNCH_TASK_INDEX environment variable or {0}'.format(
+            task_index.DEFAULT_INDEX_PATH
+        ),
+        default=None,
+    )
+    arg_parser.add_argument(
+        '-n', '--repeat',
+        help='Start the launcher this many times for each mode.',
+        type=int,
+        default=5,
+    )
+    args = arg_parser.parse_args()
+
+    index_path = args.index or task_index.get_index_path() or task_index.DEFAULT_INDEX_PATH
+    print_results(run_benchmark(args.task, index_path, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -26,7 +26,6 @@ import sys
 from collections import defaultdict, namedtuple
 from cStringIO import StringIO
 
-import cjson
 from pyinstrument import Profiler
 
 from edx.analytics.tasks.common.pathutil import PathSetTask
@@ -378,13 +377,11 @@ class BulkObfuscator(object):
             log.info(u"Obfuscated %s event with event_type = '%s'", event_source, event_type)
 
             if event_json_decoded:
-                # TODO: should really use cjson, if that were originally used for decoding the json.
-                updated_event_data = json.dumps(updated_event_data)
+                updated_event_data = eventlog.encode_json(updated_event_data)
 
             event['event'] = updated_event_data
 
-        # TODO: should really use cjson, if that were originally used for decoding the json.
-        return json.dumps(event)
+        return eventlog.encode_json(event)
 
     def obfuscate_courseware_file(self, input_filepath, output_dir):
         # Check for loading user_profile:
@@ -440,7 +437,7 @@ class BulkObfuscator(object):
         # is not escaped in the same way.  In particular, we will not decode and encode it.
         state_str = record.state.replace('\\\\', '\\')
         try:
-            state_dict = cjson.decode(state_str, all_unicode=True)
+            state_dict = eventlog.decode_json(state_str)
         except Exception as exc:
             log.exception(u"Unable to parse state as JSON for record %s: type = %s, state = %r", record.id, type(state_str), state_str)
             return line
@@ -450,7 +447,7 @@ class BulkObfuscator(object):
 
         if updated_state_dict is not None:
             # Can't reset values, so update original fields.
-            updated_state = json.dumps(updated_state_dict).replace('\\', '\\\\')
+            updated_state = eventlog.encode_json(updated_state_dict).replace('\\', '\\\\')
             fields[4] = updated_state
             log.info(u"Obfuscated state for user_id '%s' module_id '%s'", record.student_id, record.module_id)
 
@@ -539,7 +536,7 @@ class BulkObfuscator(object):
         # are also different, as to when \u notation is used for a character as
         # opposed to a utf8 encoding of the character.
         try:
-            entry = cjson.decode(line, all_unicode=True)
+            entry = eventlog.decode_json(line)
         except ValueError as exc:
             log.error("Failed to parse json for line: %r", line)
             return ""
@@ -0,0 +1,75 @@
+"""
+Command-line utility to write a user agent lookup file from a sample of tracking log lines.
+
+The most common agents found in the events are canonicalized and written to the output file, which can then be used
+by the event record export tasks through the `[event-logs] user_agent_lookup_path` setting instead of parsing those
+agents again for every event.
+"""
+
+import argparse
+import gzip
+from collections import Counter
+
+from edx.analytics.tasks.util import eventlog
+from edx.analytics.tasks.util.user_agent import canonicalize_user_agent, format_user_agent_lookup_line
+
+
+def count_agents(paths):
+    """Returns a Counter of the agent strings found in the events in the given files, which may be gzipped."""
+    agents = Counter()
+    for path in paths:
+        open_file = gzip.open if path.endswith('.gz') else open
+        with open_file(path, 'rb') as input_file:
+            for line in input_file:
+                event = eventlog.parse_json_event(line)
+                if event is None:
+                    continue
+                agent = event.get('agent')
+                if agent and isinstance(agent, basestring) and '\t' not in agent and '\n' not in agent:
+                    agents[agent] += 1
+    return agents
+
+
+def write_lookup(agents, output_file):
+    """Write a line to the output file for each agent that can be parsed, returning the number of lines written."""
+    count = 0
+    for agent in agents:
+        agent_dict = canonicalize_user_agent(agent)
+        if agent_dict is not None:
+            output_file.write(format_user_agent_lookup_line(agent, agent_dict))
+            output_file.write('\n')
+            count += 1
+    return count
+
+
+def main():
+    """Command-line utility to write a user agent lookup file."""
+    arg_parser = argparse.ArgumentParser(
+        description='Write a lookup file of the canonical information for the user agents found in tracking logs.'
+    )
+    arg_parser.add_argument(
+        'input',
+        help='Read tracking log lines from these local files, which may be gzipped.',
+        nargs='+',
+    )
+    arg_parser.add_argument(
+        '-o', '--output',
+        help='Write the lookup file here.',
+        required=True,
+    )
+    arg_parser.add_argument(
+        '-n', '--max-agents',
+        help='Only write the most common agents.',
+        type=int,
+        default=None,
+    )
+    args = arg_parser.parse_args()
+
+    agents = count_agents(args.input)
+    with open(args.output, 'wb') as output_file:
+        count = write_lookup((agent for agent, _count in agents.most_common(args.max_agents)), output_file)
+    print 'Wrote {0} of {1} distinct agents to {2}'.format(count, len(agents), args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,20 @@
 """A simple client for authenticated access to Open edX REST APIs."""
 
+import hashlib
+import json
 import logging
+import threading
 from datetime import datetime, timedelta
+from multiprocessing.pool import ThreadPool
 
+import luigi
 import requests
 from luigi import configuration
+from luigi.target import FileSystemException
 from requests.auth import AuthBase
 
 from edx.analytics.tasks.util.retry import retry
+from edx.analytics.tasks.util.url import get_target_from_url, url_path_join
 
 log = logging.getLogger(__name__)
 
@@ -63,13 +70,16 @@ class EdxApiClient(object):
             configuration file
         token_type (str): The type of authentication token required for the API call.  Should be one of 'jwt' (default)
             or 'bearer'.
+        response_cache (ApiResponseCache): If provided, pages that were fetched before are requested conditionally, and
+            their cached bodies are reused when the server responds that they have not been modified.
     """
 
     def __init__(self, auth_url=None,
                  client_id=None, client_secret=None,
                  oauth_username=None, oauth_password=None,
-                 token_type=None):
+                 token_type=None, response_cache=None):
 
+        self.response_cache = response_cache
         self._expires_at = None
         self._session = requests.Session()
         self._session.hooks = {
@@ -206,11 +216,32 @@ class EdxApiClient(object):
                     the `params` kwarg from the call.
             """
             if next_url is None:
-                raw_response = self.authenticated_session.get(url, params=params)
+                page_url, page_params = url, params
             else:
-                raw_response = self.authenticated_session.get(next_url)
-
-            raw_response.raise_for_status()
+                page_url, page_params = next_url, None
+
+            cache_entry = None
+            headers = None
+            if self.response_cache is not None:
+                cache_entry = self.response_cache.get(page_url, page_params)
+                if cache_entry is not None:
+                    headers = ApiResponseCache.conditional_headers(cache_entry)
+
+            raw_response = self.authenticated_session.get(page_url, params=page_params, headers=headers)
+
+            cached_response = None
+            if cache_entry is not None and raw_response.status_code == requests.codes.not_modified:
+                cached_response = self.response_cache.cached_response(cache_entry, raw_response)
+                if cached_response is None:
+                    # The cached body is gone, so the page has to be requested in full.
+                    raw_response = self.authenticated_session.get(page_url, params=page_params)
+
+            if cached_response is not None:
+                raw_response = cached_response
+            else:
+                raw_response.raise_for_status()
+                if self.response_cache is not None:
+                    self.response_cache.put(page_url, page_params, raw_response)
 
             # Get next URL if pagination was requested
             next_url = get_next_url_from_response(raw_response)
@@ -225,6 +256,196 @@ class EdxApiClient(object):
                 break
 
 
+def map_with_api_clients(func, items, concurrency=1, **client_kwargs):
+    """
+    Calls `func(client, item)` for each of the items, using up to `concurrency` threads.
+
+    Each thread authenticates once and reuses its own EdxApiClient, and so its own session, for all of the items it
+    handles.  Retries are handled by the client as usual, and any exception raised by `func` is re-raised.
+
+    Arguments:
+        func (callable): Called with an EdxApiClient and an item, typically to fetch the resource for the item.
+        items (list): The items to call the function for.
+        concurrency (int): The maximum number of requests to make at the same time.
+        client_kwargs: Keyword arguments used to construct each EdxApiClient.
+
+    Yields: The result of each call, in the same order as the items.
+    """
+    items = list(items)
+    if concurrency <= 1 or len(items) <= 1:
+        client = EdxApiClient(**client_kwargs)
+        for item in items:
+            yield func(client, item)
+        return
+
+    thread_data = threading.local()
+
+    def call_with_thread_client(item):
+        """Call the function with the client belonging to the current thread, creating it if needed."""
+        client = getattr(thread_data, 'client', None)
+        if client is None:
+            client = thread_data.client = EdxApiClient(**client_kwargs)
+        return func(client, item)
+
+    pool = ThreadPool(min(concurrency, len(items)))
+    try:
+        for result in pool.imap(call_with_thread_client, items):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+class ApiResponseCache(object):
+    """
+    A persistent cache of API responses that carry an ETag or Last-Modified header.
+
+    The cache is stored in the directory at `url`.  Its index is a file of JSON lines, one per response, keyed by the URL
+    of the request including its query string, which only holds the validators of the response.  The body of each
+    response is stored in a file of its own, named by a hash of the key, and is only read when the server responds that
+    it has not been modified.  Only the entries that were used or added since the cache was loaded are saved, so
+    responses that are no longer requested are dropped.  The cache can be shared by clients running in different
+    threads.
+
+    Arguments:
+        url (str): The URL of the directory the cache is loaded from and saved to.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.index_url = url_path_join(url, 'index.json')
+        self.entries = {}
+        self.used_entries = {}
+        self.hits = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(url, params=None):
+        """Returns the full URL of a request, with its parameters sorted so that it does not depend on dict order."""
+        params = sorted(params.items()) if params else None
+        return requests.Request('GET', url, params=params).prepare().url
+
+    def body_url(self, key):
+        """Returns the URL of the file that holds the cached body of the response with the given key."""
+        return url_path_join(self.url, 'bodies', hashlib.sha1(key).hexdigest())
+
+    def load(self):
+        """Read the index saved by a previous run, if there is one."""
+        target = get_target_from_url(self.index_url)
+        if not target.exists():
+            return
+        entries = {}
+        try:
+            with target.open('r') as index_file:
+                for line in index_file:
+                    entry = json.loads(line)
+                    entries[entry['key']] = entry
+        except (ValueError, KeyError):
+            log.warning('Ignoring the invalid API response cache index at %s', self.index_url)
+            return
+        self.entries = entries
+        log.info('Loaded %d cached API responses from %s', len(self.entries), self.url)
+
+    def save(self):
+        """Write the index of the entries that were used or added since the cache was loaded, and drop the others."""
+        with get_target_from_url(self.index_url).open('w') as index_file:
+            for key in sorted(self.used_entries):
+                index_file.write(json.dumps(self.used_entries[key]))
+                index_file.write('\n')
+        for key in self.entries:
+            if key not in self.used_entries:
+                target = get_target_from_url(self.body_url(key))
+                if target.exists():
+                    target.remove()
+        log.info('Saved %d API responses to %s, of which %d were not modified', len(self.used_entries), self.url,
+                 self.hits)
+
+    def get(self, url, params=None):
+        """Returns the cache entry for a request, or None if there is none."""
+        key = self.cache_key(url, params)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.used_entries[key] = entry
+            return entry
+
+    def put(self, url, params, response):
+        """Cache a successful response to a request, if it can be validated later."""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag is None and last_modified is None:
+            return
+        try:
+            response.content.decode('utf8')
+        except UnicodeDecodeError:
+            return
+        key = self.cache_key(url, params)
+        with get_target_from_url(self.body_url(key)).open('w') as body_file:
+            body_file.write(response.content)
+        entry = {
+            'key': key,
+            'etag': etag,
+            'last_modified': last_modified,
+        }
+        with self.lock:
+            self.entries[key] = entry
+            self.used_entries[key] = entry
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Returns the headers that ask the server to respond with 304 Not Modified if the entry is still valid."""
+        headers = {}
+        if entry['etag'] is not None:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified'] is not None:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def cached_response(self, entry, not_modified_response):
+        """
+        Returns a successful response with the cached body, in place of a 304 Not Modified response.
+
+        Returns None if the cached body can't be read.
+        """
+        body_url = self.body_url(entry['key'])
+        try:
+            with get_target_from_url(body_url).open('r') as body_file:
+                body = body_file.read()
+        except (IOError, OSError, FileSystemException) as error:
+            log.warning('Unable to read the cached API response body %s: %s', body_url, error)
+            return None
+        with self.lock:
+            self.hits += 1
+        response = requests.Response()
+        response.status_code = requests.codes.ok
+        response.headers = not_modified_response.headers
+        response.url = not_modified_response.url
+        response.request = not_modified_response.request
+        response.encoding = 'utf8'
+        response._content = body  # pylint: disable=protected-access
+        return response
+
+
+class ApiResponseCacheMixin(object):
+    """Allows tasks that pull data from the API to cache the responses in the warehouse between runs."""
+
+    use_api_response_cache = luigi.BoolParameter(
+        config_path={'section': 'edx-rest-api', 'name': 'use_response_cache'},
+        default=False,
+        significant=False,
+        description='If True, API responses with an ETag or Last-Modified header are stored under the warehouse path, '
+                    'and the next run only downloads the responses that have changed since.',
+    )
+
+    def get_api_response_cache(self, name):
+        """Returns the loaded response cache with the given name, or None if the cache is not used."""
+        if not self.use_api_response_cache:
+            return None
+        cache = ApiResponseCache(url_path_join(self.warehouse_path, 'api_response_cache', name))
+        cache.load()
+        return cache
+
+
 class SuppliedAuth(AuthBase):
     """Attaches a supplied authentication to the given Request object."""
 
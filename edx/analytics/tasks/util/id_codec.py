@@ -26,17 +26,25 @@ def decode_id(encoded_id):
 
 
 class PermutationGenerator(object):
-    """Class to calculate reversible 1-1 mapping using a permutation matrix."""
+    """
+    Class to calculate reversible 1-1 mapping using a permutation matrix.
+
+    Multiplying a vector of bits by the permutation matrix is slow when done for every single id, so the permutation is
+    also stored as a set of lookup tables, one per byte of the input, that map the value of that byte to the bits it
+    contributes to the output.  Use `permute_many()` and `unpermute_many()` to convert a whole sequence of ids at once.
+    """
+
+    BYTE_BITS = 8
 
     def __init__(self, seed, matrix_dim, bits):
         self.bits = bits
         self.permutation_matrix = self.random_permutation_matrix(seed, matrix_dim)
+        self.permute_tables = self.byte_lookup_tables(self.permutation_matrix)
+        self.unpermute_tables = self.byte_lookup_tables(self.permutation_matrix.T)
 
     def int_to_binvec(self, int_value):
         """Convert int_value, which must be less than 2**bits, to an np vector of bits 0/1 bits."""
-        if int_value < 0 or int_value >= 2 ** self.bits:
-            raise ValueError("{} out of range [0, 2**{}]".format(int_value, self.bits))
-
+        self.check_range(int_value)
         str_int_value = bin(int_value)[2:].zfill(self.bits)
         return np.array([int(b) for b in str_int_value])
 
@@ -45,6 +53,11 @@ class PermutationGenerator(object):
         # more string hacks
         return int("".join(map(str, vec)), 2)
 
+    def check_range(self, int_value):
+        """Raise a ValueError if int_value is not in the range [0, 2**bits)."""
+        if int_value < 0 or int_value >= 2 ** self.bits:
+            raise ValueError("{} out of range [0, 2**{}]".format(int_value, self.bits))
+
     def random_permutation_matrix(self, seed, matrix_dim):
         """Return a random permutation matrix of dimension matrix_dim using seed."""
         rng = random.Random(seed)
@@ -57,17 +70,66 @@ class PermutationGenerator(object):
             permutation[i, mapping[i]] = 1
         return permutation
 
+    def byte_lookup_tables(self, matrix):
+        """
+        Return an array of shape (number of bytes, 256) equivalent to multiplying bit vectors by `matrix`.
+
+        Row `k` maps each value of byte `k` of the input (counting from the least significant byte) to the bits that
+        byte sets in the output, so the output is the bitwise OR of the entries for every byte of the input.
+        """
+        # Bit vectors are ordered with the most significant bit first, so row i of the matrix moves the input bit with
+        # value 2**(bits - 1 - i) to the output bit with value 2**(bits - 1 - j), where j is the column set in that row.
+        output_bit_values = [2 ** (self.bits - 1 - int(np.argmax(matrix[i]))) for i in range(self.bits)]
+
+        num_bytes = (self.bits + self.BYTE_BITS - 1) // self.BYTE_BITS
+        tables = np.zeros((num_bytes, 2 ** self.BYTE_BITS), dtype=np.int64)
+        for byte_index in range(num_bytes):
+            for byte_value in range(2 ** self.BYTE_BITS):
+                output_value = 0
+                for bit in range(self.BYTE_BITS):
+                    input_bit = byte_index * self.BYTE_BITS + bit
+                    if byte_value & (1 << bit) and input_bit < self.bits:
+                        output_value |= output_bit_values[self.bits - 1 - input_bit]
+                tables[byte_index, byte_value] = output_value
+        return tables
+
+    def _lookup(self, tables, int_value):
+        """Apply the byte lookup tables to a single int."""
+        self.check_range(int_value)
+        output_value = 0
+        for byte_index, table in enumerate(tables):
+            output_value |= int(table[(int_value >> (byte_index * self.BYTE_BITS)) & 0xff])
+        return output_value
+
+    def _lookup_many(self, tables, int_values):
+        """Apply the byte lookup tables to every int in a sequence at once, returning a list of ints."""
+        values = np.asarray(int_values, dtype=np.int64)
+        if values.size == 0:
+            return []
+        out_of_range = (values < 0) | (values >= 2 ** self.bits)
+        if out_of_range.any():
+            self.check_range(int(values[out_of_range][0]))
+
+        output_values = np.zeros(values.shape, dtype=np.int64)
+        for byte_index, table in enumerate(tables):
+            output_values |= table[(values >> (byte_index * self.BYTE_BITS)) & 0xff]
+        return output_values.tolist()
+
     def permute(self, int_value):
         """Given int `int_value` with bits `bits`, permute it using the specified bits-by-bits permutation."""
-        vec = self.int_to_binvec(int_value)
-        permuted = vec.dot(self.permutation_matrix)
-        return self.binvec_to_int(permuted)
+        return self._lookup(self.permute_tables, int_value)
 
     def unpermute(self, int_value):
         """Given int `int_value` with bits `bits`, unpermute it using the specified bits-by-bits permutation."""
-        vec = self.int_to_binvec(int_value)
-        permuted = vec.dot(self.permutation_matrix.T)
-        return self.binvec_to_int(permuted)
+        return self._lookup(self.unpermute_tables, int_value)
+
+    def permute_many(self, int_values):
+        """Returns a list with the result of `permute()` for each of the ints in `int_values`."""
+        return self._lookup_many(self.permute_tables, int_values)
+
+    def unpermute_many(self, int_values):
+        """Returns a list with the result of `unpermute()` for each of the ints in `int_values`."""
+        return self._lookup_many(self.unpermute_tables, int_values)
 
 
 class UserIdRemapperMixin(object):
@@ -89,6 +151,14 @@ class UserIdRemapperMixin(object):
         "Returns a reversible mapping of input id."
         return self.permutation_generator.permute(int(id_value))
 
+    def remap_ids(self, id_values):
+        "Returns a list with the reversible mapping of each of the input ids, converting them all in one call."
+        return self.permutation_generator.permute_many([int(id_value) for id_value in id_values])
+
     def generate_obfuscated_username_from_user_id(self, user_id):
         """Returns a username to use in obfuscation, based on remapped user_id."""
-        return "username_{0}".format(self.remap_id(user_id))
+        return self.generate_obfuscated_username_from_remapped_id(self.remap_id(user_id))
+
+    def generate_obfuscated_username_from_remapped_id(self, remapped_user_id):
+        """Returns a username to use in obfuscation, given a user_id that has already been remapped."""
+        return "username_{0}".format(remapped_user_id)
@@ -0,0 +1,103 @@
+"""
+Select the library used to encode and decode JSON.
+
+Decoding tracking log events is one of the most expensive things most map reduce jobs do, and the JSON libraries
+available differ both in speed and in how faithfully they handle the data found in the tracking logs.  Code that
+processes large volumes of JSON calls `decode()` and `encode()` in this module (usually through
+`eventlog.decode_json()` and `eventlog.encode_json()`), and the library behind them is chosen with `set_codec()`.
+MapReduceJobTask calls `set_codec()` with the value of `[map-reduce] json_codec` before running mappers and reducers.
+
+Use the `json-codec-benchmark` command to compare the libraries on real tracking log data.
+"""
+import json
+import logging
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CODEC = 'cjson'
+
+
+class JsonCodec(object):
+    """A pair of functions to decode and encode JSON using a particular library."""
+
+    def __init__(self, name, decode, encode):
+        self.name = name
+        self.decode = decode
+        self.encode = encode
+
+    def __repr__(self):
+        return 'JsonCodec({0})'.format(self.name)
+
+
+def _load_cjson():
+    """Returns the python-cjson codec."""
+    import cjson
+    return JsonCodec('cjson', cjson.decode, cjson.encode)
+
+
+def _load_ujson():
+    """Returns the ujson codec."""
+    import ujson
+    return JsonCodec('ujson', ujson.loads, ujson.dumps)
+
+
+def _load_simplejson():
+    """Returns the simplejson codec."""
+    import simplejson
+    return JsonCodec('simplejson', simplejson.loads, simplejson.dumps)
+
+
+def _load_stdlib_json():
+    """Returns the codec that uses the json module from the standard library."""
+    return JsonCodec('json', json.loads, json.dumps)
+
+
+# Loaders for each of the supported codecs, keyed by name.  The libraries are imported lazily since most of them are
+# optional dependencies.
+CODEC_LOADERS = OrderedDict([
+    ('cjson', _load_cjson),
+    ('ujson', _load_ujson),
+    ('simplejson', _load_simplejson),
+    ('json', _load_stdlib_json),
+])
+
+
+def get_codec(name):
+    """
+    Returns the JsonCodec with the given name.
+
+    Raises a ValueError if the name is not one of CODEC_LOADERS, and an ImportError if the library is not installed.
+    """
+    try:
+        loader = CODEC_LOADERS[name]
+    except KeyError:
+        raise ValueError('Unknown JSON codec "{0}", choose one of: {1}'.format(name, ', '.join(CODEC_LOADERS)))
+    return loader()
+
+
+def get_available_codecs():
+    """Returns a list of the codecs whose libraries are installed."""
+    codecs = []
+    for name in CODEC_LOADERS:
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            log.debug('JSON codec "%s" is not installed', name)
+    return codecs
+
+
+def set_codec(name):
+    """Use the named codec in subsequent calls to `decode()` and `encode()`."""
+    global decode, encode, active_codec  # pylint: disable=global-statement,invalid-name
+    codec = get_codec(name)
+    if codec.name != active_codec.name:
+        log.info('Using the %s library to encode and decode JSON', codec.name)
+    active_codec = codec
+    decode = codec.decode
+    encode = codec.encode
+
+
+active_codec = get_codec(DEFAULT_CODEC)  # pylint: disable=invalid-name
+decode = active_codec.decode  # pylint: disable=invalid-name
+encode = active_codec.encode  # pylint: disable=invalid-name
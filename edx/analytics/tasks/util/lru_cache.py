@@ -0,0 +1,114 @@
+"""
+Bounded caches for the results of functions that map functions call for every event.
+
+Functions like course id parsing are called millions of times by a single mapper with a small set of distinct
+arguments, so caching their results saves a lot of time, but the caches must stay small since mappers often run with
+limited memory.  Every cache keeps track of its hits and misses, and MapReduceJobTask reports them as Hadoop counters in
+the "Cache" group.
+"""
+import functools
+import weakref
+from collections import OrderedDict
+
+COUNTER_GROUP = 'Cache'
+
+# Every cache in use in this process, so that their statistics can be reported.
+_caches = weakref.WeakSet()  # pylint: disable=invalid-name
+
+
+class LruCache(object):
+    """
+    A mapping that holds up to `max_size` entries, discarding the least recently used entry when it is full.
+
+    Args:
+        name (str): A name for the cache that is used to report its hits and misses.
+        max_size (int): The maximum number of entries to keep.
+    """
+
+    def __init__(self, name, max_size):
+        self.name = name
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.reported_hits = 0
+        self.reported_misses = 0
+        _caches.add(self)
+
+    def get(self, key, default=None):
+        """Returns the value for the key and marks it as the most recently used entry, or `default` if it is absent."""
+        try:
+            value = self.entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries[key] = value
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Stores the value for the key, evicting the least recently used entry if the cache is full."""
+        self.entries.pop(key, None)
+        if len(self.entries) >= self.max_size:
+            self.entries.popitem(last=False)
+        self.entries[key] = value
+
+    def clear(self):
+        """Discard all entries."""
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def pop_counter_increments(self):
+        """Returns a dict of the hits and misses since the last call, keyed by (group, name) counter keys."""
+        increments = {
+            (COUNTER_GROUP, '{0} Hits'.format(self.name)): self.hits - self.reported_hits,
+            (COUNTER_GROUP, '{0} Misses'.format(self.name)): self.misses - self.reported_misses,
+        }
+        self.reported_hits = self.hits
+        self.reported_misses = self.misses
+        return increments
+
+
+_MISSING = object()
+
+
+def lru_cached(name, max_size):
+    """
+    Decorates a function of hashable arguments to cache its results in an LruCache.
+
+    Exceptions are not cached.  The cache is available as the `cache` attribute of the decorated function.
+    """
+    def decorator(func):
+        """Wrap the function with a new cache."""
+        cache = LruCache(name, max_size)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            """Returns the cached result of the function if there is one."""
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            try:
+                value = cache.get(key, _MISSING)
+            except TypeError:
+                # The arguments are not hashable, so they can't be cached.
+                return func(*args, **kwargs)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                cache.put(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def pop_counter_increments():
+    """Returns a dict of the hits and misses of every cache since the last call, keyed by (group, name)."""
+    increments = {}
+    for cache in _caches:
+        for key, count in cache.pop_counter_increments().iteritems():
+            if count != 0:
+                increments[key] = increments.get(key, 0) + count
+    return increments
@@ -1,12 +1,18 @@
 """Utilities that are used for performing obfuscation, or what passes for such."""
 
+import hashlib
 import logging
+import os
 import re
+import shutil
+import tempfile
 
 import luigi
 
 from edx.analytics.tasks.util.id_codec import UserIdRemapperMixin
-from edx.analytics.tasks.util.url import ExternalURL
+from edx.analytics.tasks.util.lru_cache import lru_cached
+from edx.analytics.tasks.util.url import ExternalURL, get_target_from_url, url_path_join
+from edx.analytics.tasks.util.user_info_index import UserInfoIndex, write_user_info_index
 
 log = logging.getLogger(__name__)
 
@@ -14,20 +20,94 @@ log = logging.getLogger(__name__)
 # Define user-info maps to be global scope.
 _USER_BY_ID = None
 _USER_BY_USERNAME = None
+_USER_INFO_INDEX = None
 
 
 def reset_user_info_for_testing():
     """Test method for clearing user_info tables between tests."""
     global _USER_BY_ID  # pylint: disable=global-statement
     global _USER_BY_USERNAME  # pylint: disable=global-statement
+    global _USER_INFO_INDEX  # pylint: disable=global-statement
     _USER_BY_ID = None
     _USER_BY_USERNAME = None
+    if _USER_INFO_INDEX is not None:
+        _USER_INFO_INDEX.close()
+    _USER_INFO_INDEX = None
+
+
+def read_auth_user(auth_user_file):
+    """Generates (user_id, username) pairs from the lines of an auth_user dump from Sqoop."""
+    for line in auth_user_file:
+        # TODO: Fix ugly hack to get around reading .metadata record information.
+        if line.startswith('{'):
+            line = line.split('}', 2)[1]
+        split_line = line.rstrip('\r\n').split('\x01')
+        try:
+            user_id = int(split_line[0])
+        except ValueError:
+            log.error("Unexpected non-int value for user_id read from auth_user file: %s", split_line)
+            continue
+        username = split_line[1].decode('utf8').strip()
+        if len(username) == 0:
+            log.error("Unexpected whitespace value for username read from auth_user file: %s", split_line)
+            continue
+        yield user_id, username
+
+
+def read_auth_user_profile(auth_user_profile_file):
+    """Generates (user_id, name) pairs from the lines of an auth_userprofile dump from Sqoop."""
+    for line in auth_user_profile_file:
+        # TODO: Fix ugly hack to get around reading .metadata record information.
+        if line.startswith('{'):
+            line = line.split('}', 2)[1]
+        split_line = line.rstrip('\r\n').split('\x01')
+        try:
+            user_id = int(split_line[0])
+        except ValueError:
+            log.error("Unexpected non-int value for user_id read from auth_user_profile file: %s", split_line)
+            continue
+        yield user_id, split_line[1].decode('utf8')
 
 
 class UserInfoDownstreamMixin(object):
     """Mixin providing parameters for downstream classes dependent on classes using UserInfoMixin."""
     auth_user_path = luigi.Parameter()
     auth_userprofile_path = luigi.Parameter()
+    user_info_index_root = luigi.Parameter(
+        default=None,
+        config_path={'section': 'obfuscation', 'name': 'user_info_index_root'},
+        significant=False,
+        description='A URL to a directory in which to write an index of auth_user and auth_userprofile, which is '
+        'memory-mapped by the workers instead of loading the dumps into memory.  If not set, the dumps are loaded.',
+    )
+
+
+class UserInfoIndexTask(UserInfoDownstreamMixin, luigi.Task):
+    """Converts the auth_user and auth_userprofile dumps into an index file that can be memory-mapped."""
+
+    user_info_index_root = luigi.Parameter()
+
+    def requires(self):
+        return {
+            'auth_user': ExternalURL(self.auth_user_path),
+            'auth_userprofile': ExternalURL(self.auth_userprofile_path),
+        }
+
+    def output(self):
+        # Dumps taken at different times have different paths, so they get different index files.
+        paths_hash = hashlib.sha1('\n'.join([self.auth_user_path, self.auth_userprofile_path])).hexdigest()
+        return get_target_from_url(url_path_join(self.user_info_index_root, 'user_info_{0}.idx'.format(paths_hash)))
+
+    def run(self):
+        with self.input()['auth_user'].open('r') as auth_user_file:
+            with self.input()['auth_userprofile'].open('r') as auth_user_profile_file:
+                with self.output().open('w') as output_file:
+                    count = write_user_info_index(
+                        read_auth_user(auth_user_file),
+                        read_auth_user_profile(auth_user_profile_file),
+                        output_file,
+                    )
+        log.info("Wrote %s users to the user_info index %s.", count, self.output().path)
 
 
 class UserInfoMixin(UserInfoDownstreamMixin):
@@ -35,6 +115,14 @@ class UserInfoMixin(UserInfoDownstreamMixin):
 
     def user_info_requirements(self):
         """Define values to add to requirements() for tasks including this mixin."""
+        if self.user_info_index_root:
+            return {
+                'user_info_index': UserInfoIndexTask(
+                    auth_user_path=self.auth_user_path,
+                    auth_userprofile_path=self.auth_userprofile_path,
+                    user_info_index_root=self.user_info_index_root,
+                ),
+            }
         return {
             'auth_user': ExternalURL(self.auth_user_path),
             'auth_userprofile': ExternalURL(self.auth_userprofile_path),
@@ -73,21 +161,8 @@ class UserInfoMixin(UserInfoDownstreamMixin):
 
         count = 0
         with input_targets['auth_user'].open('r') as auth_user_file:
-            for line in auth_user_file:
+            for user_id, username in read_auth_user(auth_user_file):
                 count += 1
-                # TODO: Fix ugly hack to get around reading .metadata record information.
-                if line.startswith('{'):
-                    line = line.split('}', 2)[1]
-                split_line = line.rstrip('\r\n').split('\x01')
-                try:
-                    user_id = int(split_line[0])
-                except ValueError:
-                    log.error("Unexpected non-int value for user_id read from auth_user file: %s", split_line)
-                    continue
-                username = split_line[1].decode('utf8').strip()
-                if len(username) == 0:
-                    log.error("Unexpected whitespace value for username read from auth_user file: %s", split_line)
-                    continue
                 _USER_BY_ID[user_id] = {'username': username, 'user_id': user_id}
                 # Point to the same object so that we can just store two pointers to the data instead of two
                 # copies of the data
@@ -100,18 +175,8 @@ class UserInfoMixin(UserInfoDownstreamMixin):
 
         count = 0
         with input_targets['auth_userprofile'].open('r') as auth_user_profile_file:
-            for line in auth_user_profile_file:
+            for user_id, name in read_auth_user_profile(auth_user_profile_file):
                 count += 1
-                # TODO: Fix ugly hack to get around reading .metadata record information.
-                if line.startswith('{'):
-                    line = line.split('}', 2)[1]
-                split_line = line.rstrip('\r\n').split('\x01')
-                try:
-                    user_id = int(split_line[0])
-                except ValueError:
-                    log.error("Unexpected non-int value for user_id read from auth_user_profile file: %s", split_line)
-                    continue
-                name = split_line[1].decode('utf8')
                 try:
                     _USER_BY_ID[user_id]['name'] = name
                 except KeyError:
@@ -125,6 +190,27 @@ class UserInfoMixin(UserInfoDownstreamMixin):
             log.info("Finished loading %s auth_userprofile records from %s into user_info data.",
                      count, input_targets['auth_userprofile'].path)
 
+    def _load_user_info_index(self, input_targets):
+        """Map the user_info index into memory, copying it to a local file first if it is remote."""
+        global _USER_INFO_INDEX  # pylint: disable=global-statement
+
+        index_target = input_targets['user_info_index']
+        if isinstance(index_target, luigi.LocalTarget):
+            local_path = index_target.path
+        else:
+            # The copy is shared by all of the processes on this machine, so the pages are only loaded once.
+            local_path = os.path.join(tempfile.gettempdir(), os.path.basename(index_target.path))
+            if not os.path.exists(local_path):
+                temporary_file = tempfile.NamedTemporaryFile(dir=tempfile.gettempdir(), delete=False)
+                with temporary_file:
+                    with index_target.open('r') as index_file:
+                        shutil.copyfileobj(index_file, temporary_file)
+                os.rename(temporary_file.name, local_path)
+
+        _USER_INFO_INDEX = UserInfoIndex(local_path)
+        log.info("Mapped %s users from the user_info index %s.", _USER_INFO_INDEX.count, index_target.path)
+        return _USER_INFO_INDEX
+
     def _initialize_user_info(self):
         """Make sure that user_info (auth_user and auth_userprofile) is loaded *once*."""
 
@@ -134,11 +220,16 @@ class UserInfoMixin(UserInfoDownstreamMixin):
         if _USER_BY_ID is None:
             log.info("Loading user_info data.")
             try:
-                _USER_BY_ID = {}
-                _USER_BY_USERNAME = {}
                 input_targets = {k: v.output() for k, v in self.user_info_requirements().items()}
-                self._load_auth_user(input_targets)
-                self._load_auth_user_profile(input_targets)
+                if 'user_info_index' in input_targets:
+                    user_info_index = self._load_user_info_index(input_targets)
+                    _USER_BY_ID = user_info_index.user_by_id
+                    _USER_BY_USERNAME = user_info_index.user_by_username
+                else:
+                    _USER_BY_ID = {}
+                    _USER_BY_USERNAME = {}
+                    self._load_auth_user(input_targets)
+                    self._load_auth_user_profile(input_targets)
 
             except Exception:
                 # Don't leave a half-initialized set of structures for the next task to use.
@@ -215,6 +306,9 @@ def find_all_matches(pattern, string, label, log_context=DEFAULT_LOG_CONTEXT):
     of match, if present.
 
     A negative value for log_context disables logging of matches.
+
+    If label is None, the name of the group that matched is used as the label, so that a pattern combining named
+    alternatives can be used to find several kinds of values in a single pass.
     """
     output = []
     output_end = 0
@@ -227,9 +321,10 @@ def find_all_matches(pattern, string, label, log_context=DEFAULT_LOG_CONTEXT):
             right = backslash_encode_value(string[end:end + log_context])
             value1 = match.group(0)
             value = unicode(value1)
-            log.info(u"Found %s:  %s<<%s>>%s", label, left, value, right)
+            log.info(u"Found %s:  %s<<%s>>%s", label if label is not None else match.lastgroup, left, value, right)
+        match_label = label if label is not None else match.lastgroup
         output.append(string[output_end:start])
-        output.append("<<{}>>".format(label))
+        output.append("<<{}>>".format(match_label))
         output_end = end
     if output_end > 0:
         output.append(string[output_end:])
@@ -291,18 +386,28 @@ def find_emails(text, log_context=DEFAULT_LOG_CONTEXT):
         return text
 
 
+# The same users are looked for in many strings (every string in an event, every row of courseware_studentmodule),
+# so the patterns built for them are compiled once and cached.
+USER_PATTERN_CACHE_SIZE = 10000
+
+
 #####################
 # username
 #####################
 
 
-def find_username(text, username, log_context=DEFAULT_LOG_CONTEXT):
-    """Replaces the provided username value as it appears in text."""
-    username_pattern = re.compile(
+@lru_cached('Username Pattern', USER_PATTERN_CACHE_SIZE)
+def get_username_pattern(username):
+    """Returns a compiled pattern matching the username as a word."""
+    return re.compile(
         r'\b({})\b'.format(re.escape(username)),
         re.IGNORECASE,
     )
-    return find_all_matches(username_pattern, text, "USERNAME", log_context)
+
+
+def find_username(text, username, log_context=DEFAULT_LOG_CONTEXT):
+    """Replaces the provided username value as it appears in text."""
+    return find_all_matches(get_username_pattern(username), text, "USERNAME", log_context)
 
 
 #####################
@@ -310,13 +415,18 @@ def find_username(text, username, log_context=DEFAULT_LOG_CONTEXT):
 #####################
 
 
-def find_userid(text, user_id, log_context=DEFAULT_LOG_CONTEXT):
-    """Replaces the provided user_id value as it appears in text."""
-    userid_pattern = re.compile(
+@lru_cached('User Id Pattern', USER_PATTERN_CACHE_SIZE)
+def get_userid_pattern(user_id):
+    """Returns a compiled pattern matching the user_id as a word."""
+    return re.compile(
         r'\b({})\b'.format(user_id),
         re.IGNORECASE,
     )
-    return find_all_matches(userid_pattern, text, "USER_ID", log_context)
+
+
+def find_userid(text, user_id, log_context=DEFAULT_LOG_CONTEXT):
+    """Replaces the provided user_id value as it appears in text."""
+    return find_all_matches(get_userid_pattern(user_id), text, "USER_ID", log_context)
 
 
 #####################
@@ -338,11 +448,14 @@ REJECTED_NAMES = set()
 STOPWORDS = ['the', 'and', 'can']
 
 
-def find_user_fullname(text, fullname, log_context=DEFAULT_LOG_CONTEXT):
-    """Culls 'fullnames' originally from auth_userprofile.name and replaces them in text."""
+def get_fullname_alternatives(fullname):
+    """
+    Returns a list of patterns for the parts of a fullname that should be matched, most specific first.
 
+    Returns None if the fullname is rejected, after adding it to REJECTED_NAMES.
+    """
     if fullname in REJECTED_NAMES:
-        return text
+        return None
 
     # Indian names use special abbreviations for "son of"/"daughter of".
     # For the purposes of finding matches, just strip these out.
@@ -361,7 +474,7 @@ def find_user_fullname(text, fullname, log_context=DEFAULT_LOG_CONTEXT):
     if not LEGAL_NAME_PATTERN.match(fullname2):
         log.error(u"Fullname '%r' contains unexpected characters.", fullname)
         REJECTED_NAMES.add(fullname)
-        return text
+        return None
 
     # Strip parentheses and commas and the like, and escape the characters that are
     # legal in names but may have different meanings in regexps (i.e. apostrophe and period).
@@ -382,7 +495,7 @@ def find_user_fullname(text, fullname, log_context=DEFAULT_LOG_CONTEXT):
     if len(names) == 0:
         log.error(u"Fullname '%r' contains only whitespace characters.", fullname)
         REJECTED_NAMES.add(fullname)
-        return text
+        return None
 
     patterns = []
     # add the whole, then add each individual part if it's long enough.
@@ -390,16 +503,106 @@ def find_user_fullname(text, fullname, log_context=DEFAULT_LOG_CONTEXT):
     for name in names:
         if len(name) > 2 and name.lower() not in STOPWORDS and not name.endswith('.'):
             patterns.append(name)
+    return patterns
+
+
+@lru_cached('Fullname Pattern', USER_PATTERN_CACHE_SIZE)
+def get_fullname_pattern(fullname):
+    """Returns a compiled pattern matching the fullname or its parts, or None if the fullname is rejected."""
+    patterns = get_fullname_alternatives(fullname)
+    if patterns is None:
+        return None
 
     # Because we're operating with unicode instead of raw strings, make sure that
     # the slashes are escaped.
-    fullname_pattern = re.compile(
+    return re.compile(
         u'\\b({})\\b'.format(u"|".join(patterns)),
         re.IGNORECASE + re.UNICODE,
     )
+
+
+def find_user_fullname(text, fullname, log_context=DEFAULT_LOG_CONTEXT):
+    """Culls 'fullnames' originally from auth_userprofile.name and replaces them in text."""
+    if fullname in REJECTED_NAMES:
+        return text
+
+    fullname_pattern = get_fullname_pattern(fullname)
+    if fullname_pattern is None:
+        return text
     return find_all_matches(fullname_pattern, text, "FULLNAME", log_context)
 
 
+#####################
+# All user info
+#####################
+
+ASCII_WORD_CHARACTER = r'[0-9A-Za-z_]'
+ASCII_WORD_CHARACTER_PATTERN = re.compile(ASCII_WORD_CHARACTER)
+
+
+def ascii_word_pattern(value):
+    """
+    Returns a pattern matching the value as a word, with word boundaries that ignore the re.UNICODE flag.
+
+    The username and user_id patterns are matched without re.UNICODE, unlike fullnames, so their `\\b` assertions
+    are spelled out as lookarounds to keep the same matches when they are combined with fullnames in one pattern.
+    """
+    value = unicode(value)
+    if ASCII_WORD_CHARACTER_PATTERN.match(value[0]):
+        prefix = u'(?<!{})'.format(ASCII_WORD_CHARACTER)
+    else:
+        prefix = u'(?<={})'.format(ASCII_WORD_CHARACTER)
+    if ASCII_WORD_CHARACTER_PATTERN.match(value[-1]):
+        suffix = u'(?!{})'.format(ASCII_WORD_CHARACTER)
+    else:
+        suffix = u'(?={})'.format(ASCII_WORD_CHARACTER)
+    return prefix + re.escape(value) + suffix
+
+
+@lru_cached('User Info Pattern', USER_PATTERN_CACHE_SIZE)
+def get_user_info_pattern(fullnames, usernames, user_ids):
+    """
+    Returns a compiled pattern matching any of the fullnames, usernames or user_ids, or None if there are none.
+
+    The alternatives are put in groups named after the labels to use for them, FULLNAME, USERNAME and USER_ID, so the
+    pattern can be passed to find_all_matches() without a label.  Where several alternatives match at the same
+    position, fullnames are preferred to usernames, and usernames to user_ids.
+
+    The arguments should be tuples, so that they can be used as keys in the cache.
+    """
+    fullname_patterns = []
+    for fullname in fullnames:
+        patterns = get_fullname_alternatives(fullname)
+        if patterns is not None:
+            fullname_patterns.extend(patterns)
+
+    groups = []
+    if fullname_patterns:
+        groups.append(u'(?P<FULLNAME>\\b(?:{})\\b)'.format(u'|'.join(fullname_patterns)))
+    username_patterns = [ascii_word_pattern(username) for username in usernames if username]
+    if username_patterns:
+        groups.append(u'(?P<USERNAME>{})'.format(u'|'.join(username_patterns)))
+    user_id_patterns = [ascii_word_pattern(user_id) for user_id in user_ids if unicode(user_id)]
+    if user_id_patterns:
+        groups.append(u'(?P<USER_ID>{})'.format(u'|'.join(user_id_patterns)))
+
+    if not groups:
+        return None
+    return re.compile(u'|'.join(groups), re.IGNORECASE + re.UNICODE)
+
+
+def find_user_info(text, fullnames=(), usernames=(), user_ids=(), log_context=DEFAULT_LOG_CONTEXT):
+    """Replaces all of the provided fullnames, usernames and user_ids in text, in a single pass over the text."""
+    user_info_pattern = get_user_info_pattern(
+        tuple(sorted(set(fullnames))),
+        tuple(sorted(set(usernames))),
+        tuple(sorted(set(user_ids))),
+    )
+    if user_info_pattern is None:
+        return text
+    return find_all_matches(user_info_pattern, text, None, log_context)
+
+
 #####################
 # Development:  Personal context
 #####################
@@ -534,17 +737,13 @@ class Obfuscator(object):
 
         # Find Names and IDs, using supplied information to search for.
         if user_info is not None:
-            if 'fullname' in entities:
-                for fullname in user_info.get('name', []):
-                    text = find_user_fullname(text, fullname, log_context)
-
-            if 'username' in entities:
-                for username in user_info.get('username', []):
-                    text = find_username(text, username, log_context)
-
-            if 'userid' in entities:
-                for user_id in user_info.get('user_id', []):
-                    text = find_userid(text, user_id, log_context)
+            text = find_user_info(
+                text,
+                fullnames=user_info.get('name', []) if 'fullname' in entities else (),
+                usernames=user_info.get('username', []) if 'username' in entities else (),
+                user_ids=user_info.get('user_id', []) if 'userid' in entities else (),
+                log_context=log_context,
+            )
 
         # Find phone numbers.
         if 'phone' in entities:
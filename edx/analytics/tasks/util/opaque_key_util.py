@@ -7,6 +7,8 @@ from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import CourseLocator
 
+from edx.analytics.tasks.util.lru_cache import lru_cached
+
 log = logging.getLogger(__name__)
 
 
@@ -15,6 +17,28 @@ COURSE_KEY_PATTERN = r'(?P<course_key_string>[^/+]+(/|\+)[^/+]+(/|\+)[^/]+)'
 COURSE_ID_PATTERN = COURSE_KEY_PATTERN.replace('course_key_string', 'course_id')
 # from common/djangoapps/util/request.py:
 COURSE_REGEX = re.compile(r'^.*?/courses/{}'.format(COURSE_ID_PATTERN))
+FILENAME_UNSAFE_CHARACTERS_REGEX = re.compile(r'[^\w\.\-]')
+
+# Mappers see the same few thousand course ids over and over, so the results of parsing them are cached.
+COURSE_KEY_CACHE_SIZE = 20000
+
+
+@lru_cached('Course Key', COURSE_KEY_CACHE_SIZE)
+def _parse_course_key(course_id):
+    """Returns a (course_key, error) tuple, where exactly one of the values is None, for the course_id."""
+    try:
+        return CourseKey.from_string(course_id), None
+    except InvalidKeyError as exc:
+        return None, exc
+
+
+def get_course_key(course_id):
+    """
+    Returns the CourseKey for the course_id, or None if it cannot be parsed.
+
+    Unlike `CourseKey.from_string()`, the result is cached.
+    """
+    return _parse_course_key(course_id)[0]
 
 
 def normalize_course_id(course_id):
@@ -33,12 +57,11 @@ def is_valid_course_id(course_id):
         log.error("Found course_id that ends with a newline character '%s'", course_id)
         return False
 
-    try:
-        _course_key = CourseKey.from_string(course_id)
-        return True
-    except InvalidKeyError as exc:
+    course_key, exc = _parse_course_key(course_id)
+    if course_key is None:
         log.error("Unable to parse course_id '%s' : error = %s", course_id, exc)
         return False
+    return True
 
 
 def is_valid_org_id(org_id):
@@ -61,30 +84,29 @@ def get_org_id_for_course(course_id):
     Returns:
         The org_id extracted from the course_id, or None if none is found.
     """
-
-    try:
-        course_key = CourseKey.from_string(course_id)
-        return course_key.org
-    except InvalidKeyError:
+    course_key = get_course_key(course_id)
+    if course_key is None:
         return None
+    return course_key.org
 
 
+@lru_cached('Filename Safe Course Id', COURSE_KEY_CACHE_SIZE)
 def get_filename_safe_course_id(course_id, replacement_char='_'):
     """
     Create a representation of a course_id that can be used safely in a filepath.
     """
-    try:
-        course_key = CourseKey.from_string(course_id)
+    course_key = get_course_key(course_id)
+    if course_key is not None:
         # Ignore the namespace of the course_id altogether, for backwards compatibility.
         filename = course_key._to_string()  # pylint: disable=protected-access
-    except InvalidKeyError:
+    else:
         # If the course_id doesn't parse, we will still return a value here.
         filename = course_id
 
     # The safest characters are A-Z, a-z, 0-9, <underscore>, <period> and <hyphen>.
     # We represent the first four with \w.
     # TODO: Once we support courses with unicode characters, we will need to revisit this.
-    return re.sub(r'[^\w\.\-]', unicode(replacement_char), filename)
+    return FILENAME_UNSAFE_CHARACTERS_REGEX.sub(unicode(replacement_char), filename)
 
 
 def get_course_key_from_url(url):
@@ -97,10 +119,6 @@ def get_course_key_from_url(url):
     match = COURSE_REGEX.match(url)
     course_key = None
     if match:
-        course_id_string = match.group('course_id')
-        try:
-            course_key = CourseKey.from_string(course_id_string)
-        except InvalidKeyError:
-            pass
+        course_key = get_course_key(match.group('course_id'))
 
     return course_key
@@ -15,6 +15,296 @@ except ImportError:
 DEFAULT_NULL_VALUE = '\\N'  # This is the default string used by Hive to represent a NULL value.
 
 
+class Field(object):
+    """
+    Represents a field within a record.
+
+    The field is an abstract representation of a type. It can be used to generate schemas for various data manipulation
+    systems as well as interpret data. It is intended to provide structure so that downstream code does not have to
+    handle edge cases related to dynamic typing. It enforces the type and ensures that the data conforms to the
+    declared schema.
+    """
+    counter = 0
+
+    def __init__(self, **kwargs):
+        self.nullable = kwargs.pop('nullable', True)
+
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+        # This counter lets us "see" the order in which the class member variables appear in the class they are declared
+        # in. Sorting by this counter will allow us to order them appropriately. Note that this isn't atomic and has
+        # all kinds of issues, but is functional and doesn't require parsing the AST or anything *more* hacky.
+        self.counter = Field.counter
+        Field.counter += 1
+
+        self.validate_parameters()
+
+    def validate_parameters(self):
+        """Once all kwargs have been assigned to attributes, validate them and set any defaults."""
+        pass
+
+    def validate(self, value):
+        """
+        Determine if this value is an acceptable value for this field.
+
+        The goal of this method is to do some trivial checks to detect problems with the data as early as possible and
+        raise an error. This will prevent us from attempting to insert data into the database that will definitely cause
+        errors on insertion. It also allows downstream code to make assumptions about the data (e.g. that it isn't
+        None) since the Field will enforce those constraints.
+
+        Arguments:
+            value (object):
+
+        Returns: A list of validation error strings. If the list is empty, the value is acceptable.
+        """
+        validation_errors = []
+        if value is None and not self.nullable:
+            validation_errors.append('The field cannot accept null values')
+        return validation_errors
+
+    def serialize_to_string(self, value):
+        """Returns a unicode string representation of a value for this field."""
+        return unicode(value)
+
+    def deserialize_from_string(self, string_value):
+        """Returns a typed representation of the value from its string representation."""
+        return string_value
+
+    @property
+    def sql_type(self):
+        """Returns a SQL-92 compliant declaration that can be used to generate a table that includes this field."""
+        base_type = self.sql_base_type
+        if not self.nullable:
+            base_type += ' NOT NULL'
+        return base_type
+
+    @property
+    def sql_base_type(self):
+        """Returns the core SQL-92 data type without any modifiers (such as NOT NULL)."""
+        raise NotImplementedError
+
+    @property
+    def hive_type(self):
+        """Returns the HiveQL data type for this type of field."""
+        raise NotImplementedError
+
+    @property
+    def bigquery_type(self):
+        """Returns the BigQuery data type for this type of field."""
+        raise NotImplementedError
+
+    @property
+    def elasticsearch_type(self):
+        """Returns the elasticsearch type for this type of field."""
+        raise NotImplementedError
+
+
+class RecordMeta(type):
+    """
+    Compiles each Record subclass when it is declared.
+
+    Records are created and serialized once per event in many map functions, so rather than iterating over the fields
+    and looking them up by name on every call, the fields are collected once and stored in `__slots__`, and specialized
+    functions are generated from the list of fields for the constructor, the trusted constructor and the conversion to
+    and from tuples of strings.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        fields = {}
+        record_field_names = set()
+        for base in reversed(bases):
+            if isinstance(base, RecordMeta):
+                base_fields = base.get_fields()
+                record_field_names.update(base_fields)
+            else:
+                base_fields = {
+                    field_name: getattr(base, field_name) for field_name in dir(base)
+                    if isinstance(getattr(base, field_name), Field)
+                }
+            fields.update(base_fields)
+
+        own_fields = {key: value for key, value in namespace.items() if isinstance(value, Field)}
+        fields.update(own_fields)
+        for field_name in own_fields:
+            del namespace[field_name]
+
+        # Field ordering matters! Note that parent classes must be processed before any subclasses, so their fields will
+        # appear first in the list. Also note that the ordering is very difficult to predict in cases of complex
+        # multiple-inheritance. The fields will appear in the order they are declared in the source file, which may be
+        # rather unintuitive.
+        namespace['_record_fields'] = OrderedDict(sorted(fields.items(), key=lambda t: t[1].counter))
+        namespace['__slots__'] = tuple(sorted(field_name for field_name in fields if field_name not in record_field_names))
+
+        cls = super(RecordMeta, mcs).__new__(mcs, name, bases, namespace)
+        _compile_record_class(cls)
+        return cls
+
+
+# Marks a value that was not provided to a generated constructor. Don't use None since that may be a real value for a
+# field.
+_MISSING = object()
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def _raise_too_many_args(extra_args):
+    """Raised by the constructor when more values have been provided than there are fields in the record."""
+    raise TypeError(
+        'Too many positional arguments. Unused args: {0}'.format(', '.join(repr(a) for a in extra_args))
+    )
+
+
+def _raise_multiple_values(field_name, value, other_value):
+    """Raised by the constructor when a value is provided both as a positional and as a keyword argument."""
+    raise TypeError(
+        'Multiple values provided for the same field "{0}": {1} and {2}'.format(
+            field_name, repr(value), repr(other_value)
+        )
+    )
+
+
+def _raise_invalid_value(field_name, value, validation_errors):
+    """Raised by the constructor when a value is not compatible with its field."""
+    raise ValueError('Unable to assign the value {value} to the field named "{name}": {errors}'.format(
+        value=repr(value),
+        name=field_name,
+        errors=', '.join(validation_errors)
+    ))
+
+
+def _raise_missing_fields(missing_fields):
+    """Raised by the constructor when no value was provided for some fields of a record that isn't sparse."""
+    raise TypeError('Required fields not specified: {0}'.format(', '.join(missing_fields)))
+
+
+def _raise_unknown_fields(kwargs):
+    """Raised by the constructor when keyword arguments don't match any field."""
+    raise TypeError('Unknown fields specified: {0}'.format(', '.join(kwargs.keys())))
+
+
+def _generate_constructor_source(function_name, field_names, validate, set_missing_fields_to_none):
+    """
+    Returns the source of a function that assigns the values of `field_names` to a record from its arguments.
+
+    Positional arguments are mapped to the fields in order of declaration, the remaining fields are read from the
+    keyword arguments.
+    """
+    lines = [
+        'def {0}(_self, *_args, **_kwargs):'.format(function_name),
+        '    _nargs = len(_args)',
+        '    if _nargs > {0}:'.format(len(field_names)),
+        '        _raise_too_many_args(_args[{0}:])'.format(len(field_names)),
+        '    _missing_fields = []',
+        '    _pop = _kwargs.pop',
+    ]
+    for index, field_name in enumerate(field_names):
+        lines.extend([
+            '    if _nargs > {0}:'.format(index),
+            '        _value = _args[{0}]'.format(index),
+            '        if {0!r} in _kwargs:'.format(field_name),
+            '            _raise_multiple_values({0!r}, _value, _kwargs[{0!r}])'.format(field_name),
+            '    else:',
+            '        _value = _pop({0!r}, {1})'.format(field_name, 'None' if set_missing_fields_to_none else '_MISSING'),
+        ])
+        assignment = []
+        if validate:
+            assignment.extend([
+                '_errors = _validate_{0}(_value)'.format(index),
+                'if _errors:',
+                '    _raise_invalid_value({0!r}, _value, _errors)'.format(field_name),
+            ])
+        assignment.append('_set_{0}(_self, _value)'.format(index))
+        if set_missing_fields_to_none:
+            lines.extend('    ' + line for line in assignment)
+        else:
+            lines.extend([
+                '    if _value is _MISSING:',
+                '        _missing_fields.append({0!r})'.format(field_name),
+                '    else:',
+            ])
+            lines.extend('        ' + line for line in assignment)
+    lines.extend([
+        '    if _missing_fields:',
+        '        _raise_missing_fields(_missing_fields)',
+        '    if _kwargs:',
+        '        _raise_unknown_fields(_kwargs)',
+    ])
+    return '\n'.join(lines)
+
+
+def _generate_accessor_source(field_names, fields):
+    """Returns the source of the functions that read all of the values of a record and convert them to strings."""
+    values = ''.join('_self.{0}, '.format(field_name) for field_name in field_names)
+    lines = [
+        'def _get_values(_self):',
+        '    return ({0})'.format(values),
+        '',
+        'def _to_string_tuple(_self):',
+    ]
+    for index, field_name in enumerate(field_names):
+        serialized = '_serialize_{0}(_value)'.format(index)
+        if getattr(fields[field_name], 'normalize_whitespace', False):
+            serialized = "_normalize_whitespace(' ', {0})".format(serialized)
+        lines.extend([
+            '    _value = _self.{0}'.format(field_name),
+            "    _string_{0} = _null_value if _value is None else {1}.encode('utf8')".format(index, serialized),
+        ])
+    lines.extend([
+        '    return ({0})'.format(''.join('_string_{0}, '.format(index) for index in range(len(field_names)))),
+        '',
+        'def _values_from_string_tuple(_strings):',
+        '    if len(_strings) != {0}:'.format(len(field_names)),
+        "        raise ValueError('The length of the tuple of strings must exactly match the number of fields in the "
+        "Record')",
+        '    return (',
+    ])
+    for index in range(len(field_names)):
+        lines.append(
+            "        None if _strings[{0}] == _null_value else _deserialize_{0}(_strings[{0}].decode('utf8')),".format(
+                index
+            )
+        )
+    lines.append('    )')
+    return '\n'.join(lines)
+
+
+def _compile_record_class(cls):
+    """Generate the specialized functions for a Record class from its fields and attach them to the class."""
+    fields = cls.get_fields()
+    field_names = list(fields)
+    namespace = {
+        '_MISSING': _MISSING,
+        '_null_value': DEFAULT_NULL_VALUE,
+        '_normalize_whitespace': WHITESPACE_PATTERN.sub,
+        '_raise_too_many_args': _raise_too_many_args,
+        '_raise_multiple_values': _raise_multiple_values,
+        '_raise_invalid_value': _raise_invalid_value,
+        '_raise_missing_fields': _raise_missing_fields,
+        '_raise_unknown_fields': _raise_unknown_fields,
+    }
+    for index, (field_name, field_obj) in enumerate(fields.items()):
+        # This is the descriptor of the slot that stores the value, so this sets the value without going through
+        # __setattr__.
+        namespace['_set_{0}'.format(index)] = getattr(cls, field_name).__set__
+        namespace['_validate_{0}'.format(index)] = field_obj.validate
+        namespace['_serialize_{0}'.format(index)] = field_obj.serialize_to_string
+        namespace['_deserialize_{0}'.format(index)] = field_obj.deserialize_from_string
+
+    set_missing_fields_to_none = cls.set_missing_fields_to_none
+    source = '\n\n'.join([
+        _generate_constructor_source('_init_validated', field_names, True, set_missing_fields_to_none),
+        _generate_constructor_source('_init_trusted', field_names, False, set_missing_fields_to_none),
+        _generate_accessor_source(field_names, fields),
+    ])
+    code = compile(source, '<record {0}>'.format(cls.__name__), 'exec')
+    exec code in namespace  # pylint: disable=exec-used
+
+    for function_name in ('_init_validated', '_init_trusted', '_get_values', '_to_string_tuple'):
+        setattr(cls, function_name, namespace[function_name])
+    cls._values_from_string_tuple = staticmethod(namespace['_values_from_string_tuple'])
+
+
 class Record(object):
     """
     Represents a strongly typed record that can be stored in various storage engines and processed by Map Reduce jobs.
@@ -75,6 +365,9 @@ class Record(object):
         class G(A):
             zipcode = StringField()
     """
+    __metaclass__ = RecordMeta
+    __slots__ = ()
+
     # For the base record class, we want the values of all fields to
     # be explicitly set.  An error is returned if any field is not
     # set.  However, we provide a flag here so that subclasses can
@@ -84,59 +377,21 @@ class Record(object):
     set_missing_fields_to_none = False
 
     def __init__(self, *args, **kwargs):
-        fields = self.get_fields()
-
-        # First process all of the positional arguments, and map them to the fields in order of field declaration.
-
-        # Create a one-off object that will represent a NULL value. Don't use None since that may be a real value for
-        # a field.
-        sentinel = object()
-        # Args that aren't assigned to fields will be stored here and included in the exception later.
-        extra_args = []
-        # Fields that had no argument mapped to them
-        remaining_fields = []
-        # Use izip_longest instead of zip since it allows us to detect the case when more values have been provided than
-        # there are fields in the object. This case should raise a TypeError, so we need to detect it here.
-        for val, field_name in itertools.izip_longest(args, fields.keys(), fillvalue=sentinel):
-            if val is sentinel:
-                remaining_fields.append(field_name)
-            elif field_name is sentinel:
-                # We have exhausted the fields and there are unconsumed arguments, raise an error later.
-                extra_args.append(val)
-            else:
-                self.initialize_field(field_name, val)
-                if field_name in kwargs:
-                    raise TypeError(
-                        'Multiple values provided for the same field "{0}": {1} and {2}'.format(
-                            field_name, repr(val), repr(kwargs[field_name])
-                        )
-                    )
-
-        if len(extra_args) > 0:
-            raise TypeError(
-                'Too many positional arguments. Unused args: {0}'.format(', '.join(repr(a) for a in extra_args))
-            )
-
-        # Now iterate through any remaining fields and try to find them in the keyword arguments.
-        missing_fields = []
-        for field_name in remaining_fields:
-            try:
-                val = kwargs.pop(field_name)
-                self.initialize_field(field_name, val)
-            except KeyError:
-                if self.set_missing_fields_to_none:
-                    self.initialize_field(field_name, None)
-                else:
-                    missing_fields.append(field_name)
+        # The constructor is generated by RecordMeta for each class. It maps positional arguments to the fields in order
+        # of field declaration, then looks for the remaining fields in the keyword arguments, and validates every value.
+        self._init_validated(*args, **kwargs)
 
-        if len(missing_fields) > 0:
-            raise TypeError('Required fields not specified: {0}'.format(', '.join(missing_fields)))
-
-        # Raise an error if we found any keyword arguments that weren't mapped to a field.
-        if len(kwargs) > 0:
-            raise TypeError('Unknown fields specified: {0}'.format(', '.join(kwargs.keys())))
+    @classmethod
+    def from_trusted_values(cls, *args, **kwargs):
+        """
+        Construct a record without validating the values.
 
-        self._initialized = True
+        This accepts the same arguments as the constructor, and is intended for code that creates a very large number
+        of records from values that are known to be compatible with the fields.
+        """
+        record = cls.__new__(cls)
+        record._init_trusted(*args, **kwargs)  # pylint: disable=protected-access
+        return record
 
     def initialize_field(self, field_name, value):
         """
@@ -150,25 +405,18 @@ class Record(object):
         field_obj = self.get_fields()[field_name]
         validation_errors = field_obj.validate(value)
         if len(validation_errors) > 0:
-            raise ValueError('Unable to assign the value {value} to the field named "{name}": {errors}'.format(
-                value=repr(value),
-                name=field_name,
-                errors=', '.join(validation_errors)
-            ))
+            _raise_invalid_value(field_name, value, validation_errors)
         else:
-            setattr(self, field_name, value)
+            object.__setattr__(self, field_name, value)
 
     def __setattr__(self, key, value):
-        if hasattr(self, '_initialized'):
-            raise TypeError('Records are intended to be immutable')
-        else:
-            super(Record, self).__setattr__(key, value)
+        raise TypeError('Records are intended to be immutable')
 
     def __delattr__(self, item):
-        if hasattr(self, '_initialized'):
-            raise TypeError('Records are intended to be immutable')
-        else:
-            super(Record, self).__delattr__(item)
+        raise TypeError('Records are intended to be immutable')
+
+    def __reduce__(self):
+        return (self.__class__, self._get_values())
 
     def __repr__(self):
         arg_strs = []
@@ -208,29 +456,7 @@ class Record(object):
 
         Returns: An OrderedDict mapping field names to the field objects in the order they are declared in the record.
         """
-        # We don't want to read the fields from the parent class, so we use a variable that is private to this
-        # class. This format ensures that the scope is constrained to only cls, not its parents or children.
-        class_private_var_name = '_{0}__fields'.format(cls.__name__)
-        field_dict = getattr(cls, class_private_var_name, None)
-        if field_dict is None:
-            fields = []
-            for field_name in dir(cls):
-                field_obj = getattr(cls, field_name)
-                if not isinstance(field_obj, Field):
-                    continue
-
-                fields.append((field_name, field_obj))
-
-                # Field ordering matters! Note that parent classes must be processed before any subclasses, so their
-                # fields will appear first in the list. Also note that the ordering is very difficult to predict in
-                # cases of complex multiple-inheritance. The fields will appear in the order they are declared in the
-                # source file, which may be rather unintuitive.
-                fields.sort(key=lambda t: t[1].counter)
-
-            field_dict = OrderedDict(fields)
-            setattr(cls, class_private_var_name, field_dict)
-
-        return field_dict
+        return cls._record_fields
 
     def replace(self, **kwargs):
         """
@@ -252,7 +478,7 @@ class Record(object):
 
         """
         if string_encoder is None:
-            string_encoder = HiveTsvEncoder()
+            return self._to_string_tuple()
 
         field_values = []
         for field_name, field_obj in self.get_fields().items():
@@ -270,12 +496,7 @@ class Record(object):
 
         Returns: a dictionary mapping field names to their respective values.
         """
-        field_values = OrderedDict()
-        for field_name in self.get_fields():
-            val = getattr(self, field_name)
-            field_values[field_name] = val
-
-        return field_values
+        return OrderedDict(itertools.izip(self.get_fields(), self._get_values()))
 
     def to_separated_values(self, sep=u'\t', string_encoder=None):
         """
@@ -304,7 +525,7 @@ class Record(object):
 
         """
         if string_decoder is None:
-            string_decoder = HiveTsvEncoder()
+            return cls(*cls._values_from_string_tuple(string_tuple))
 
         fields = cls.get_fields()
         if len(string_tuple) != len(fields):
@@ -459,7 +680,7 @@ class HiveTsvEncoder(object):
             return self.null_value
         else:
             if self.normalize_whitespace or getattr(field_obj, 'normalize_whitespace', False):
-                decoded_string = re.sub(r'\s+', ' ', decoded_string)
+                decoded_string = WHITESPACE_PATTERN.sub(' ', decoded_string)
 
         return decoded_string.encode('utf8')
 
@@ -470,91 +691,6 @@ class HiveTsvEncoder(object):
             return encoded_string.decode('utf8')
 
 
-class Field(object):
-    """
-    Represents a field within a record.
-
-    The field is an abstract representation of a type. It can be used to generate schemas for various data manipulation
-    systems as well as interpret data. It is intended to provide structure so that downstream code does not have to
-    handle edge cases related to dynamic typing. It enforces the type and ensures that the data conforms to the
-    declared schema.
-    """
-    counter = 0
-
-    def __init__(self, **kwargs):
-        self.nullable = kwargs.pop('nullable', True)
-
-        for key, value in kwargs.items():
-            setattr(self, key, value)
-
-        # This counter lets us "see" the order in which the class member variables appear in the class they are declared
-        # in. Sorting by this counter will allow us to order them appropriately. Note that this isn't atomic and has
-        # all kinds of issues, but is functional and doesn't require parsing the AST or anything *more* hacky.
-        self.counter = Field.counter
-        Field.counter += 1
-
-        self.validate_parameters()
-
-    def validate_parameters(self):
-        """Once all kwargs have been assigned to attributes, validate them and set any defaults."""
-        pass
-
-    def validate(self, value):
-        """
-        Determine if this value is an acceptable value for this field.
-
-        The goal of this method is to do some trivial checks to detect problems with the data as early as possible and
-        raise an error. This will prevent us from attempting to insert data into the database that will definitely cause
-        errors on insertion. It also allows downstream code to make assumptions about the data (e.g. that it isn't
-        None) since the Field will enforce those constraints.
-
-        Arguments:
-            value (object):
-
-        Returns: A list of validation error strings. If the list is empty, the value is acceptable.
-        """
-        validation_errors = []
-        if value is None and not self.nullable:
-            validation_errors.append('The field cannot accept null values')
-        return validation_errors
-
-    def serialize_to_string(self, value):
-        """Returns a unicode string representation of a value for this field."""
-        return unicode(value)
-
-    def deserialize_from_string(self, string_value):
-        """Returns a typed representation of the value from its string representation."""
-        return string_value
-
-    @property
-    def sql_type(self):
-        """Returns a SQL-92 compliant declaration that can be used to generate a table that includes this field."""
-        base_type = self.sql_base_type
-        if not self.nullable:
-            base_type += ' NOT NULL'
-        return base_type
-
-    @property
-    def sql_base_type(self):
-        """Returns the core SQL-92 data type without any modifiers (such as NOT NULL)."""
-        raise NotImplementedError
-
-    @property
-    def hive_type(self):
-        """Returns the HiveQL data type for this type of field."""
-        raise NotImplementedError
-
-    @property
-    def bigquery_type(self):
-        """Returns the BigQuery data type for this type of field."""
-        raise NotImplementedError
-
-    @property
-    def elasticsearch_type(self):
-        """Returns the elasticsearch type for this type of field."""
-        raise NotImplementedError
-
-
 class StringField(Field):  # pylint: disable=abstract-method
     """Represents a field that contains a relatively short string."""
 
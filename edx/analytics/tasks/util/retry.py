@@ -1,6 +1,7 @@
 """Utility decorator for retrying functions that fail."""
 
 import logging
+import random
 import time
 from datetime import datetime, timedelta
 
@@ -71,3 +72,40 @@ def retry(should_retry=retry_on_any_exception, base_delay=0.5, timeout=None):
                         raise
         return retry_function
     return retry_func_wrapper
+
+
+def wait_until(condition, timeout, base_delay=0.1, max_delay=10):
+    """
+    Call the condition until it returns a true value or the timeout expires.
+
+    This is meant for waiting until something, like a file written by another process, exists.  The condition is checked
+    right away, and then with a jittered exponential back-off: the first delay is between half of and all of
+    `base_delay`, and the upper bound doubles after each attempt until it reaches `max_delay`.  The randomness keeps
+    processes that wait for the same thing from polling in lock step.
+
+    Arguments:
+      condition (callable): A function without arguments that returns a true value once the wait is over.
+
+      timeout (float): Stop waiting when this many seconds have elapsed since the first call.  The condition is checked
+        one final time when the timeout expires.
+
+      base_delay (float): The upper bound of the first delay, in seconds.
+
+      max_delay (float): The largest upper bound of any delay, in seconds.
+
+    Returns:
+      The first true value returned by the condition, or its last value if the timeout expired.
+    """
+    deadline = time.time() + timeout
+    delay = base_delay
+    while True:
+        result = condition()
+        if result:
+            return result
+        remaining_seconds = deadline - time.time()
+        if remaining_seconds <= 0:
+            return result
+        sleep_for_seconds = min(random.uniform(delay / 2.0, delay), remaining_seconds)
+        log.debug('Condition not met, sleeping for %f seconds', sleep_for_seconds)
+        time.sleep(sleep_for_seconds)
+        delay = min(delay * 2, max_delay)
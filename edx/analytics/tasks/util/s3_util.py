@@ -1,16 +1,22 @@
 """
 Utility methods for interacting with S3 via boto.
 """
+import atexit
 import logging
 import os
+import threading
 import time
 from fnmatch import fnmatch
 from urlparse import urlparse
 
+from boto.connection import ConnectionPool
+from luigi import configuration
 from luigi.contrib.hdfs.format import Plain
 from luigi.contrib.hdfs.target import HdfsTarget
 from luigi.contrib.s3 import AtomicS3File, S3Client
 
+from edx.analytics.tasks.util.retry import wait_until
+
 log = logging.getLogger(__name__)
 
 # S3 does not permit using "put" for files larger than 5 GB, and
@@ -31,17 +37,26 @@ MINIMUM_BYTES_PER_CHUNK = 5242880
 # putting the object.  Define here what that policy will be.
 DEFAULT_KEY_ACCESS_POLICY = 'bucket-owner-full-control'
 
+# The number of seconds to wait for a file to appear in S3 before giving up.
+KEY_WAIT_TIMEOUT = 60
+
+# The number of seconds after which the shared client is replaced, so that credentials it got by assuming a role with
+# aws_role_arn are renewed before they expire, after an hour by default.  It can be changed with the "client_ttl"
+# setting of the "s3-client" section of the configuration file.
+DEFAULT_CLIENT_TTL = 45 * 60
+
+# The maximum number of idle connections to S3 that the shared client keeps open for reuse.  It can be changed with the
+# "connection_pool_size" setting of the "s3-client" section of the configuration file.
+DEFAULT_CONNECTION_POOL_SIZE = 10
+
+# The statistics of the shared client are logged after this many lookups.
+CLIENT_CACHE_STATS_INTERVAL = 10000
+
 
 def get_file_from_key(s3_client, url, output_path):
     """Downloads a file from a given S3 URL to the output_path."""
     # Files won't appear in S3 instantaneously, wait for the files to appear.
-    # TODO: exponential backoff
-    for _index in range(30):
-        key = s3_client.get_key(url)
-        if key is not None:
-            break
-        else:
-            time.sleep(2)
+    key = wait_until(lambda: s3_client.get_key(url), timeout=KEY_WAIT_TIMEOUT)
 
     if key is None:
         log.error("Unable to find expected output file %s", url)
@@ -65,9 +80,9 @@ def join_as_s3_url(bucket, root, path):
 
 
 def get_s3_key(s3_conn, url):
-    """Returns an S3 key for use in further boto actions."""
+    """Returns an S3 key for use in further boto actions, using the shared client if `s3_conn` is None."""
     bucket_name, key_name = get_s3_bucket_key_names(url)
-    bucket = s3_conn.get_bucket(bucket_name)
+    bucket = get_s3_bucket(bucket_name) if s3_conn is None else s3_conn.get_bucket(bucket_name)
     key = bucket.get_key(key_name)
     return key
 
@@ -78,7 +93,7 @@ def generate_s3_sources(s3_conn, source, patterns=['*'], include_zero_length=Fal
 
     Args:
 
-      s3_conn: a boto connection to S3.
+      s3_conn: a boto connection to S3, or None to use the shared client.
       source:  a url to S3.
       patterns:  a list of strings, each of which defines a pattern to match.
 
@@ -93,7 +108,7 @@ def generate_s3_sources(s3_conn, source, patterns=['*'], include_zero_length=Fal
     """
     bucket_name, root = get_s3_bucket_key_names(source)
 
-    bucket = s3_conn.get_bucket(bucket_name)
+    bucket = get_s3_bucket(bucket_name) if s3_conn is None else s3_conn.get_bucket(bucket_name)
 
     # Make sure that the listing is done on a "folder" boundary,
     # since list() just looks for matching prefixes.
@@ -139,6 +154,129 @@ class ScalableS3Client(S3Client):
 
         super(ScalableS3Client, self).__init__(aws_access_key_id=aws_access_key_id, aws_secret_access_key=aws_secret_access_key, **kwargs)
 
+    def __getstate__(self):
+        # Connections can't be shared with other processes, so a copy of the client opens its own.
+        state = self.__dict__.copy()
+        state['_s3'] = None
+        return state
+
+
+class BoundedConnectionPool(ConnectionPool):
+    """A boto connection pool that closes connections instead of keeping more than `max_size` of them for reuse."""
+
+    def __init__(self, max_size=DEFAULT_CONNECTION_POOL_SIZE):
+        super(BoundedConnectionPool, self).__init__()
+        self.max_size = max_size
+
+    def put_http_connection(self, host, port, is_secure, conn):
+        if self.size() >= self.max_size:
+            conn.close()
+        else:
+            super(BoundedConnectionPool, self).put_http_connection(host, port, is_secure, conn)
+
+
+class PooledS3Client(ScalableS3Client):
+    """S3 client whose connection keeps at most `pool_size` idle connections open for reuse."""
+
+    def __init__(self, pool_size=DEFAULT_CONNECTION_POOL_SIZE, **kwargs):
+        super(PooledS3Client, self).__init__(**kwargs)
+        self.pool_size = pool_size
+
+    @property
+    def s3(self):
+        connection = super(PooledS3Client, self).s3
+        if not isinstance(getattr(connection, '_pool', None), BoundedConnectionPool):
+            connection._pool = BoundedConnectionPool(self.pool_size)  # pylint: disable=protected-access
+        return connection
+
+
+class S3ClientCache(object):
+    """
+    A client for the process to share, and the buckets looked up with it.
+
+    Every client looks up its credentials, possibly by assuming a role, and opens its own connections, so sharing one
+    client saves those lookups and allows connections to be kept alive between requests.  Bucket lookups are cached
+    since they each cost a request.  A forked process creates a new client, since connections can't be shared with it,
+    and the client is replaced once it is older than the `[s3-client] client_ttl` setting, so that credentials
+    obtained by assuming a role are renewed before they expire.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.client = None
+        self.client_expiration = None
+        self.buckets = {}
+        self.client_hits = 0
+        self.client_misses = 0
+        self.bucket_hits = 0
+        self.bucket_misses = 0
+        self.lookups = 0
+
+    def get_client(self):
+        """Returns the shared client, creating it if needed."""
+        with self.lock:
+            now = time.time()
+            if self.client is None or self.pid != os.getpid() or now >= self.client_expiration:
+                config = configuration.get_config()
+                pool_size = config.getint('s3-client', 'connection_pool_size', DEFAULT_CONNECTION_POOL_SIZE)
+                self.client = PooledS3Client(pool_size=pool_size)
+                self.client_expiration = now + config.getint('s3-client', 'client_ttl', DEFAULT_CLIENT_TTL)
+                self.buckets = {}
+                if self.pid is None:
+                    atexit.register(self.log_stats)
+                self.pid = os.getpid()
+                self.client_misses += 1
+            else:
+                self.client_hits += 1
+            self._count_lookup()
+            return self.client
+
+    def get_bucket(self, bucket_name):
+        """Returns the bucket with the given name, looking it up with the shared client if needed."""
+        connection = self.get_client().s3
+        with self.lock:
+            cached_connection, bucket = self.buckets.get(bucket_name, (None, None))
+            if cached_connection is connection:
+                self.bucket_hits += 1
+                return bucket
+
+        bucket = connection.get_bucket(bucket_name)
+        with self.lock:
+            self.buckets[bucket_name] = (connection, bucket)
+            self.bucket_misses += 1
+        return bucket
+
+    def _count_lookup(self):
+        """Log the statistics of the cache every CLIENT_CACHE_STATS_INTERVAL lookups.  Called with the lock held."""
+        self.lookups += 1
+        if self.lookups % CLIENT_CACHE_STATS_INTERVAL == 0:
+            self.log_stats()
+
+    def log_stats(self):
+        """Log the hits and misses of the cache and the number of connections kept open for reuse."""
+        connection = self.client._s3 if self.client is not None else None  # pylint: disable=protected-access
+        pool = getattr(connection, '_pool', None)
+        log.info(
+            'Shared S3 client: %d client hits, %d client misses, %d bucket hits, %d bucket misses, '
+            '%d open connections',
+            self.client_hits, self.client_misses, self.bucket_hits, self.bucket_misses,
+            pool.size() if isinstance(pool, ConnectionPool) else 0
+        )
+
+
+_client_cache = S3ClientCache()  # pylint: disable=invalid-name
+
+
+def get_s3_client():
+    """Returns the S3 client shared by the process."""
+    return _client_cache.get_client()
+
+
+def get_s3_bucket(bucket_name):
+    """Returns the named bucket, looked up with the shared S3 client."""
+    return _client_cache.get_bucket(bucket_name)
+
 
 class S3HdfsTarget(HdfsTarget):
     """HDFS target that supports writing and reading files directly in S3."""
@@ -160,5 +298,5 @@ class S3HdfsTarget(HdfsTarget):
         else:
             safe_path = self.path.replace('s3n://', 's3://')
             if not hasattr(self, 's3_client'):
-                self.s3_client = ScalableS3Client()
+                self.s3_client = get_s3_client()
             return AtomicS3File(safe_path, self.s3_client, policy=DEFAULT_KEY_ACCESS_POLICY)
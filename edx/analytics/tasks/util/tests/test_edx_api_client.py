@@ -1,6 +1,10 @@
 """Test the API client"""
 
 import json
+import os
+import shutil
+import tempfile
+import threading
 from datetime import datetime, timedelta
 from unittest import TestCase
 
@@ -9,7 +13,7 @@ import requests
 from ddt import data, ddt, unpack
 from mock import patch
 
-from edx.analytics.tasks.util.edx_api_client import EdxApiClient
+from edx.analytics.tasks.util.edx_api_client import ApiResponseCache, EdxApiClient, map_with_api_clients
 from edx.analytics.tasks.util.tests.config import with_luigi_config
 
 FAKE_AUTH_URL = 'http://example.com/oauth2/access_token'
@@ -258,3 +262,146 @@ class EdxApiClientTestCase(TestCase):
         self.assertEquals(
             httpretty.httpretty.latest_requests[5].querystring, {'limit': ['2'], 'foo': ['bar'], 'offset': ['4']}
         )
+
+
+@httpretty.activate
+class ApiResponseCacheTestCase(TestCase):
+    """Test conditional requests made through the response cache."""
+
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        self.cache_path = os.path.join(temp_dir, 'cache', 'resource')
+        self.cache = ApiResponseCache(self.cache_path)
+
+    def create_client(self, cache):
+        """Returns a client that uses the cache."""
+        EdxApiClientTestCase.prepare_for_token_request()
+        return EdxApiClient(auth_url=FAKE_AUTH_URL, client_id=FAKE_CLIENT_ID, client_secret=FAKE_CLIENT_SECRET,
+                            response_cache=cache)
+
+    def test_not_modified(self):
+        body = {'results': [{'a': 1}]}
+        httpretty.register_uri('GET', FAKE_RESOURCE_URL,
+                               responses=[
+                                   httpretty.Response(body=json.dumps(body), etag='"v1"',
+                                                      last_modified='Fri, 01 Jan 2016 00:00:00 GMT'),
+                                   httpretty.Response(body='', status=304),
+                               ])
+        client = self.create_client(self.cache)
+        params = {'limit': 2, 'foo': 'bar'}
+
+        self.assertEqual(client.get(FAKE_RESOURCE_URL, params=params).json(), body)
+        self.assertNotIn('If-None-Match', httpretty.last_request().headers)
+
+        response = client.get(FAKE_RESOURCE_URL, params={'foo': 'bar', 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), body)
+        self.assertEqual(httpretty.last_request().headers['If-None-Match'], '"v1"')
+        self.assertEqual(httpretty.last_request().headers['If-Modified-Since'], 'Fri, 01 Jan 2016 00:00:00 GMT')
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_modified(self):
+        httpretty.register_uri('GET', FAKE_RESOURCE_URL,
+                               responses=[
+                                   httpretty.Response(body='{"a": 1}', etag='"v1"'),
+                                   httpretty.Response(body='{"a": 2}', etag='"v2"'),
+                                   httpretty.Response(body='', status=304),
+                               ])
+        client = self.create_client(self.cache)
+
+        self.assertEqual([client.get(FAKE_RESOURCE_URL).json() for _ in range(3)], [{'a': 1}, {'a': 2}, {'a': 2}])
+        self.assertEqual(httpretty.last_request().headers['If-None-Match'], '"v2"')
+
+    def test_response_without_validators(self):
+        httpretty.register_uri('GET', FAKE_RESOURCE_URL, body='{"a": 1}')
+        client = self.create_client(self.cache)
+
+        client.get(FAKE_RESOURCE_URL)
+        client.get(FAKE_RESOURCE_URL)
+        self.assertNotIn('If-None-Match', httpretty.last_request().headers)
+        self.assertEqual(self.cache.entries, {})
+
+    def test_save_and_load(self):
+        other_url = FAKE_RESOURCE_URL + 'other/'
+        httpretty.register_uri('GET', FAKE_RESOURCE_URL, body='{"a": 1}', etag='"v1"')
+        httpretty.register_uri('GET', other_url, body='{"b": 1}', etag='"v1"')
+        client = self.create_client(self.cache)
+        client.get(FAKE_RESOURCE_URL)
+        client.get(other_url)
+        self.cache.save()
+
+        # Only the entries used by the next run are saved again.
+        cache = ApiResponseCache(self.cache_path)
+        cache.load()
+        self.assertEqual(len(cache.entries), 2)
+        httpretty.register_uri('GET', FAKE_RESOURCE_URL, body='', status=304)
+        self.assertEqual(self.create_client(cache).get(FAKE_RESOURCE_URL).json(), {'a': 1})
+        cache.save()
+
+        cache = ApiResponseCache(self.cache_path)
+        cache.load()
+        self.assertEqual(cache.entries.keys(), [FAKE_RESOURCE_URL])
+        self.assertNotIn('body', cache.entries[FAKE_RESOURCE_URL])
+        self.assertTrue(os.path.exists(cache.body_url(FAKE_RESOURCE_URL)))
+        self.assertFalse(os.path.exists(cache.body_url(other_url)))
+
+    def test_missing_body(self):
+        httpretty.register_uri('GET', FAKE_RESOURCE_URL,
+                               responses=[
+                                   httpretty.Response(body='{"a": 1}', etag='"v1"'),
+                                   httpretty.Response(body='', status=304),
+                                   httpretty.Response(body='{"a": 1}', etag='"v1"'),
+                               ])
+        client = self.create_client(self.cache)
+        client.get(FAKE_RESOURCE_URL)
+        os.remove(self.cache.body_url(FAKE_RESOURCE_URL))
+
+        self.assertEqual(client.get(FAKE_RESOURCE_URL).json(), {'a': 1})
+        self.assertNotIn('If-None-Match', httpretty.last_request().headers)
+        self.assertEqual(self.cache.hits, 0)
+        self.assertTrue(os.path.exists(self.cache.body_url(FAKE_RESOURCE_URL)))
+
+    def test_load_missing_cache(self):
+        self.cache.load()
+        self.assertEqual(self.cache.entries, {})
+
+
+@ddt
+class MapWithApiClientsTestCase(TestCase):
+    """Test fetching resources with a client per thread."""
+
+    def setUp(self):
+        self.clients = {}
+        self.lock = threading.Lock()
+
+    def fetch(self, client, item):
+        """Record the client used by the current thread, and fail for negative items."""
+        with self.lock:
+            self.clients.setdefault(threading.current_thread().ident, set()).add(client)
+        if item < 0:
+            raise requests.HTTPError('Not found')
+        return item * 2
+
+    @data(1, 4)
+    def test_results_in_order(self, concurrency):
+        items = range(20)
+        results = list(map_with_api_clients(self.fetch, items, concurrency=concurrency, auth_url=FAKE_AUTH_URL,
+                                            client_id=FAKE_CLIENT_ID, client_secret=FAKE_CLIENT_SECRET))
+
+        self.assertEqual(results, [item * 2 for item in items])
+        self.assertLessEqual(len(self.clients), concurrency)
+        # Every thread reuses one client.
+        for clients in self.clients.values():
+            self.assertEqual(len(clients), 1)
+        self.assertEqual(len(set.union(*self.clients.values())), len(self.clients))
+
+    @data(1, 4)
+    def test_error(self, concurrency):
+        with self.assertRaises(requests.HTTPError):
+            list(map_with_api_clients(self.fetch, [1, 2, -1, 3], concurrency=concurrency, auth_url=FAKE_AUTH_URL,
+                                      client_id=FAKE_CLIENT_ID, client_secret=FAKE_CLIENT_SECRET))
+
+    def test_no_items(self):
+        self.assertEqual(list(map_with_api_clients(self.fetch, [], concurrency=4, auth_url=FAKE_AUTH_URL,
+                                                   client_id=FAKE_CLIENT_ID, client_secret=FAKE_CLIENT_SECRET)), [])
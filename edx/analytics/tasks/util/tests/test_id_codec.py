@@ -40,3 +40,24 @@ class PermutationGeneratorTest(TestCase):
 
         unpermuted = permutation_generator.unpermute(permuted)
         self.assertEquals(unpermuted, id_value)
+
+    def test_lookup_tables_match_matrix(self):
+        permutation_generator = id_codec.PermutationGenerator(42, 32, 32)
+        id_values = [0, 1, 2, 255, 256, 123456, 2 ** 31, 2 ** 32 - 1]
+
+        for id_value in id_values:
+            vec = permutation_generator.int_to_binvec(id_value)
+            expected = permutation_generator.binvec_to_int(vec.dot(permutation_generator.permutation_matrix))
+            self.assertEquals(permutation_generator.permute(id_value), expected)
+
+        permuted = permutation_generator.permute_many(id_values)
+        self.assertEquals(permuted, [permutation_generator.permute(id_value) for id_value in id_values])
+        self.assertEquals(permutation_generator.unpermute_many(permuted), id_values)
+        self.assertEquals(permutation_generator.permute_many([]), [])
+
+    def test_out_of_range(self):
+        permutation_generator = id_codec.PermutationGenerator(42, 32, 32)
+        with self.assertRaises(ValueError):
+            permutation_generator.permute(2 ** 32)
+        with self.assertRaises(ValueError):
+            permutation_generator.permute_many([1, -1])
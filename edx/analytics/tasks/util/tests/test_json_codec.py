@@ -0,0 +1,51 @@
+"""Tests for selecting the JSON library."""
+
+import unittest
+
+from ddt import data, ddt
+
+from edx.analytics.tasks.tools.json_codec_benchmark import run_benchmark
+from edx.analytics.tasks.util import eventlog, json_codec
+
+
+@ddt
+class JsonCodecTest(unittest.TestCase):
+    """Tests for json_codec."""
+
+    def setUp(self):
+        self.addCleanup(json_codec.set_codec, json_codec.active_codec.name)
+
+    @data(*json_codec.CODEC_LOADERS.keys())
+    def test_codec(self, name):
+        try:
+            json_codec.set_codec(name)
+        except ImportError:
+            self.skipTest('{0} is not installed'.format(name))
+
+        event = {'username': 'test_user', 'event': {'answers': [1, 2.5, None, True]}}
+        self.assertEqual(eventlog.decode_json(eventlog.encode_json(event)), event)
+        self.assertEqual(eventlog.parse_json_event('2013-12-17 prefix {"a": "b"}'), {'a': 'b'})
+        self.assertEqual(json_codec.active_codec.name, name)
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            json_codec.set_codec('yaml')
+        self.assertEqual(json_codec.active_codec.name, json_codec.DEFAULT_CODEC)
+
+    def test_available_codecs(self):
+        names = [codec.name for codec in json_codec.get_available_codecs()]
+        self.assertIn(json_codec.DEFAULT_CODEC, names)
+        self.assertIn('json', names)
+
+    def test_benchmark(self):
+        lines = [
+            '{"event_type": "play_video", "page": "http:\\/\\/example.com\\/"}',
+            '2013-12-17 prefix {"event_type": "pause_video"}',
+            'not json',
+        ]
+        results = {result['codec']: result for result in run_benchmark(lines, ['cjson', 'json'])}
+
+        self.assertEqual(results['json']['decode_failures'], 1)
+        self.assertEqual(results['json']['mismatches'], 0)
+        # python-cjson does not unescape forward slashes.
+        self.assertEqual(results['cjson']['mismatches'], 1)
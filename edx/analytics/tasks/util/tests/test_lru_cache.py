@@ -0,0 +1,43 @@
+"""Tests for the bounded caches."""
+from unittest import TestCase
+
+from edx.analytics.tasks.util import lru_cache
+
+
+class LruCacheTest(TestCase):
+    """Tests for LruCache and lru_cached."""
+
+    def test_evict_least_recently_used(self):
+        cache = lru_cache.LruCache('Test', 2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+    def test_counter_increments(self):
+        cache = lru_cache.LruCache('Test', 2)
+        cache.get('a')
+        cache.put('a', 1)
+        cache.get('a')
+        cache.get('a')
+
+        self.assertEqual(cache.pop_counter_increments(), {('Cache', 'Test Hits'): 2, ('Cache', 'Test Misses'): 1})
+        self.assertEqual(cache.pop_counter_increments(), {('Cache', 'Test Hits'): 0, ('Cache', 'Test Misses'): 0})
+
+    def test_lru_cached(self):
+        calls = []
+
+        @lru_cache.lru_cached('Test', 10)
+        def double(value, factor=2):
+            """Double the value, recording the call."""
+            calls.append(value)
+            return value * factor
+
+        self.assertEqual([double(1), double(1), double(1, factor=3), double([1])], [2, 2, 3, [1, 1]])
+        self.assertEqual(calls, [1, 1, [1]])
+        self.assertEqual(len(double.cache), 2)
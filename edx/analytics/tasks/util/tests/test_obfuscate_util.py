@@ -1,14 +1,18 @@
 # -*- coding: utf-8 -*-
 """Tests for obfuscation utilities."""
 
+import os
 import textwrap
+from StringIO import StringIO
 from unittest import TestCase
 
 from ddt import data, ddt, unpack
 from mock import MagicMock, patch
 
 import edx.analytics.tasks.util.obfuscate_util as obfuscate_util
+from edx.analytics.tasks.util.tempdir import make_temp_directory
 from edx.analytics.tasks.util.tests.target import FakeTask
+from edx.analytics.tasks.util.user_info_index import UserInfoIndex, write_user_info_index
 
 
 @ddt
@@ -334,6 +338,58 @@ class FindMatchesTestCase(TestCase):
         self.assertEquals(raw, result)
         self.assertTrue(fullname in obfuscate_util.REJECTED_NAMES)
 
+    #####################
+    # all user info
+    #####################
+
+    @data(
+        ('First Last', '<<FULLNAME>>'),
+        ('first', '<<FULLNAME>>'),
+        ('UserName', '<<USERNAME>>'),
+        ('12345', '<<USER_ID>>'),
+        ('First (username) 12345', '<<FULLNAME>> (<<USERNAME>>) <<USER_ID>>'),
+        ('ausername 123456', 'ausername 123456'),
+        (u'\u00e9username', u'\u00e9<<USERNAME>>'),
+        (u'username\u00e9', u'<<USERNAME>>\u00e9'),
+    )
+    @unpack
+    def test_find_user_info(self, text, result):
+        raw = self.SIMPLE_CONTEXT.format(text)
+        expected = self.SIMPLE_CONTEXT.format(result)
+        actual = obfuscate_util.find_user_info(
+            raw, fullnames=[u'First Last'], usernames=set(['username']), user_ids=[12345]
+        )
+        self.assertEquals(expected, actual)
+
+    @data(
+        ('First Last', 'First Last', 'username', 12345),
+        ('My name is Username, I\'m from A.', 'First Last', 'username', 12345),
+        ('Find 12345 and user-name, Other', 'Other', 'user-name', 12345),
+        ('Find 12345 and user-name', '???', '', 12345),
+    )
+    @unpack
+    def test_find_user_info_matches_separate_patterns(self, text, fullname, username, user_id):
+        expected = obfuscate_util.find_user_fullname(text, fullname)
+        if username:
+            expected = obfuscate_util.find_username(expected, username)
+        expected = obfuscate_util.find_userid(expected, user_id)
+        actual = obfuscate_util.find_user_info(text, fullnames=[fullname], usernames=[username], user_ids=[user_id])
+        self.assertEquals(expected, actual)
+
+    def test_find_user_info_without_values(self):
+        raw = self.SIMPLE_CONTEXT.format('username')
+        self.assertEquals(raw, obfuscate_util.find_user_info(raw))
+        self.assertIsNone(obfuscate_util.get_user_info_pattern((), ('',), ()))
+
+    def test_user_info_pattern_cached(self):
+        args = ((u'Cached Name',), (u'cachedusername',), (54321,))
+        pattern = obfuscate_util.get_user_info_pattern(*args)
+        self.assertIs(pattern, obfuscate_util.get_user_info_pattern(*args))
+        self.assertIs(
+            obfuscate_util.get_username_pattern('cachedusername'),
+            obfuscate_util.get_username_pattern('cachedusername'),
+        )
+
 
 @ddt
 class FindMatchLogContextTestCase(TestCase):
@@ -455,6 +511,61 @@ class UserInfoTestCase(TestCase):
         super(UserInfoTestCase, self).setUp()
         obfuscate_util.reset_user_info_for_testing()
 
+    def test_with_index(self):
+        def reformat_as_sqoop_output(string):
+            """Convert tab-delimited data to look like Sqoop output."""
+            return StringIO(textwrap.dedent(string).strip().replace('\t', '\x01'))
+
+        index_file = StringIO()
+        write_user_info_index(
+            obfuscate_util.read_auth_user(reformat_as_sqoop_output(DEFAULT_AUTH_USER)),
+            obfuscate_util.read_auth_user_profile(reformat_as_sqoop_output(DEFAULT_AUTH_USER_PROFILE)),
+            index_file,
+        )
+        user_info = obfuscate_util.UserInfoMixin()
+        user_info.user_info_requirements = MagicMock(return_value={
+            'user_info_index': FakeTask(path='s3://fake/user_info_test.idx', value=index_file.getvalue()),
+        })
+        with make_temp_directory() as temp_dir:
+            with patch('tempfile.tempdir', temp_dir):
+                self.assertEquals(user_info.user_by_id[2], {'user_id': 2, 'username': 'audit', 'name': 'Audit John'})
+                self.assertTrue(os.path.exists(os.path.join(temp_dir, 'user_info_test.idx')))
+        self.assertEquals(user_info.user_by_username['staff']['name'], 'Static Staff')
+        self.assertEquals(len(user_info.user_by_id), 4)
+        self.assertNotIn(5, user_info.user_by_id)
+        obfuscate_util.reset_user_info_for_testing()
+
+    def test_user_info_index_task(self):
+        with make_temp_directory() as temp_dir:
+            paths = {}
+            for name, value in (('auth_user', DEFAULT_AUTH_USER), ('auth_userprofile', DEFAULT_AUTH_USER_PROFILE)):
+                paths[name] = os.path.join(temp_dir, name)
+                with open(paths[name], 'w') as dump_file:
+                    dump_file.write(textwrap.dedent(value).strip().replace('\t', '\x01'))
+            task = obfuscate_util.UserInfoIndexTask(
+                auth_user_path=paths['auth_user'],
+                auth_userprofile_path=paths['auth_userprofile'],
+                user_info_index_root=os.path.join(temp_dir, 'index'),
+            )
+            other_task = obfuscate_util.UserInfoIndexTask(
+                auth_user_path=paths['auth_user'],
+                auth_userprofile_path=paths['auth_user'],
+                user_info_index_root=os.path.join(temp_dir, 'index'),
+            )
+            self.assertNotEquals(task.output().path, other_task.output().path)
+
+            task.run()
+            index = UserInfoIndex(task.output().path)
+            try:
+                self.assertDictEqual(dict(index.user_by_username), {
+                    'honor': {'user_id': 1, 'username': 'honor', 'name': 'Honor Student'},
+                    'audit': {'user_id': 2, 'username': 'audit', 'name': 'Audit John'},
+                    'verified': {'user_id': 3, 'username': 'verified', 'name': 'Verified Vera'},
+                    'staff': {'user_id': 4, 'username': 'staff', 'name': 'Static Staff'},
+                })
+            finally:
+                index.close()
+
     def test_default(self):
         user_info = obfuscate_util.UserInfoMixin()
         user_info.user_info_requirements = get_mock_user_info_requirements()
@@ -110,3 +110,16 @@ class CourseIdTest(TestCase):
         url = u"https://courses.edx.org/courses/{course_id}/stuff".format(course_id=course_id)
         course_key = opaque_key_util.get_course_key_from_url(url)
         self.assertIsNone(course_key)
+
+    def test_cached_course_key(self):
+        cache = opaque_key_util._parse_course_key.cache  # pylint: disable=protected-access
+        cache.clear()
+        hits = cache.hits
+
+        self.assertTrue(opaque_key_util.is_valid_course_id(VALID_COURSE_ID))
+        self.assertEquals(opaque_key_util.get_org_id_for_course(VALID_COURSE_ID), 'org')
+        self.assertFalse(opaque_key_util.is_valid_course_id(INVALID_LEGACY_COURSE_ID))
+        self.assertIsNone(opaque_key_util.get_org_id_for_course(INVALID_LEGACY_COURSE_ID))
+
+        self.assertEquals(len(cache), 2)
+        self.assertEquals(cache.hits, hits + 2)
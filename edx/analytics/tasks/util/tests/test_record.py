@@ -409,6 +409,46 @@ class RecordTestCase(TestCase):
         self.assertFalse(test_record is new_record)
         self.assertEqual(test_record, new_record)
 
+    def test_from_trusted_values(self):
+        test_record = ThreeFieldSparseRecord.from_trusted_values('a', third=10)
+
+        self.assertEqual(test_record.to_ordered_dict(), {'first': 'a', 'second': None, 'third': 10})
+        with self.assertRaisesRegexp(TypeError, 'Records are intended to be immutable'):
+            test_record.first = 'b'
+        with self.assertRaisesRegexp(TypeError, 'Unknown fields specified: fourth'):
+            ThreeFieldSparseRecord.from_trusted_values(fourth='d')
+
+    def test_slots(self):
+        test_record = ExtendedSingleField('foo', 'bar')
+
+        self.assertFalse(hasattr(test_record, '__dict__'))
+        self.assertEqual(ExtendedSingleField.__slots__, ('another_field',))
+        self.assertIsInstance(ExtendedSingleField.get_fields()['name'], StringField)
+
+    @data(
+        ('a', 10, datetime.date(2015, 11, 1)),
+        (UNICODE_STRING, None, None),
+    )
+    def test_default_encoder_round_trip(self, values):
+        test_record = SampleStruct(*values)
+        string_tuple = test_record.to_string_tuple()
+
+        self.assertEqual(string_tuple, test_record.to_string_tuple(string_encoder=HiveTsvEncoder()))
+        self.assertEqual(SampleStruct.from_string_tuple(string_tuple), test_record)
+        self.assertEqual(
+            SampleStruct.from_string_tuple(string_tuple, string_decoder=HiveTsvEncoder()), test_record
+        )
+
+    def test_custom_constructor(self):
+        class WithConstructor(Record):
+            """A record with a hand-written constructor."""
+            name = StringField()
+
+            def __init__(self, name):
+                super(WithConstructor, self).__init__(name=name.lower())
+
+        self.assertEqual(WithConstructor('FOO').name, 'foo')
+
 
 class NoFields(Record):
     """A record without any fields"""
@@ -3,9 +3,9 @@
 from datetime import datetime, timedelta
 from unittest import TestCase
 
-from mock import call, patch, sentinel
+from mock import Mock, call, patch, sentinel
 
-from edx.analytics.tasks.util.retry import RetryTimeoutError, retry
+from edx.analytics.tasks.util.retry import RetryTimeoutError, retry, wait_until
 
 
 class RetryTestCase(TestCase):
@@ -164,3 +164,52 @@ def retry_on_runtime_errors(exc):
 class UserError(Exception):
     """An example error."""
     pass
+
+
+class WaitUntilTestCase(TestCase):
+    """Test waiting for a condition with a jittered exponential back-off."""
+
+    def setUp(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+        def sleep(seconds):
+            """Advance the fake clock instead of sleeping."""
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+        sleep_patcher = patch('edx.analytics.tasks.util.retry.time.sleep', side_effect=sleep)
+        sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+        time_patcher = patch('edx.analytics.tasks.util.retry.time.time', side_effect=lambda: self.now)
+        time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+
+    def condition_met_after(self, attempts):
+        """Returns a condition that is met on the given attempt."""
+        calls = []
+
+        def condition():
+            """Count the calls."""
+            calls.append(None)
+            return sentinel.result if len(calls) >= attempts else None
+
+        return condition
+
+    def test_condition_met(self):
+        self.assertEqual(wait_until(self.condition_met_after(1), timeout=10), sentinel.result)
+        self.assertEqual(self.sleeps, [])
+
+    def test_backoff(self):
+        self.assertEqual(wait_until(self.condition_met_after(7), timeout=60, base_delay=0.1, max_delay=1),
+                         sentinel.result)
+        self.assertEqual(len(self.sleeps), 6)
+        for sleep_seconds, max_seconds in zip(self.sleeps, [0.1, 0.2, 0.4, 0.8, 1, 1]):
+            self.assertGreaterEqual(sleep_seconds, max_seconds / 2.0)
+            self.assertLessEqual(sleep_seconds, max_seconds)
+
+    def test_timeout(self):
+        condition = Mock(return_value=False)
+        self.assertEqual(wait_until(condition, timeout=30, base_delay=1, max_delay=4), False)
+        self.assertAlmostEqual(sum(self.sleeps), 30)
+        self.assertEqual(condition.call_count, len(self.sleeps) + 1)
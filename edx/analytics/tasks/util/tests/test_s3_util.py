@@ -1,10 +1,13 @@
 """Tests for S3-related utility functionality."""
 
+import os
+import pickle
 from unittest import TestCase
 
-from mock import MagicMock
+from mock import MagicMock, patch
 
 from edx.analytics.tasks.util import s3_util
+from edx.analytics.tasks.util.tests.config import with_luigi_config
 
 
 class GenerateS3SourcesTestCase(TestCase):
@@ -97,3 +100,88 @@ class GenerateS3SourcesTestCase(TestCase):
             (bucket_name, root.rstrip('/'), "subdir1/path1"),
             (bucket_name, root.rstrip('/'), "path2")
         ]))
+
+
+class S3ClientCacheTestCase(TestCase):
+    """Tests for sharing an S3 client."""
+
+    def setUp(self):
+        self.cache = s3_util.S3ClientCache()
+        patcher = patch('luigi.contrib.s3.S3Client.s3')
+        self.s3_conn = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_shared_client(self):
+        client = self.cache.get_client()
+        self.assertIsInstance(client, s3_util.ScalableS3Client)
+        self.assertIs(self.cache.get_client(), client)
+        self.assertEqual((self.cache.client_hits, self.cache.client_misses), (1, 1))
+
+    def test_forked_process(self):
+        client = self.cache.get_client()
+        with patch('os.getpid', return_value=os.getpid() + 1):
+            self.assertIsNot(self.cache.get_client(), client)
+
+    @with_luigi_config('s3-client', 'client_ttl', '100')
+    def test_expired_client(self):
+        with patch('edx.analytics.tasks.util.s3_util.time.time', return_value=1000):
+            client = self.cache.get_client()
+            self.cache.get_bucket('foo')
+        with patch('edx.analytics.tasks.util.s3_util.time.time', return_value=1099):
+            self.assertIs(self.cache.get_client(), client)
+        with patch('edx.analytics.tasks.util.s3_util.time.time', return_value=1100):
+            new_client = self.cache.get_client()
+            self.assertIsNot(new_client, client)
+            self.assertIs(self.cache.get_client(), new_client)
+        self.assertEqual(self.cache.buckets, {})
+
+    def test_bucket(self):
+        bucket = self.cache.get_bucket('foo')
+        self.assertIs(bucket, self.s3_conn.get_bucket.return_value)
+        self.assertIs(self.cache.get_bucket('foo'), bucket)
+        self.cache.get_bucket('bar')
+        self.assertEqual(self.s3_conn.get_bucket.call_count, 2)
+        self.assertEqual((self.cache.bucket_hits, self.cache.bucket_misses), (1, 2))
+
+    def test_bounded_connection_pool(self):
+        connection = self.cache.get_client().s3
+        self.assertIsInstance(connection._pool, s3_util.BoundedConnectionPool)  # pylint: disable=protected-access
+
+        pool = s3_util.BoundedConnectionPool(max_size=2)
+        connections = [MagicMock() for _ in range(3)]
+        for conn in connections:
+            pool.put_http_connection('s3.amazonaws.com', 443, True, conn)
+        self.assertEqual(pool.size(), 2)
+        self.assertEqual([conn.close.called for conn in connections], [False, False, True])
+
+    def test_pickled_client(self):
+        client = s3_util.ScalableS3Client()
+        client._s3 = 'connection'  # pylint: disable=protected-access
+        self.assertIsNone(pickle.loads(pickle.dumps(client))._s3)  # pylint: disable=protected-access
+
+
+class GetFileFromKeyTestCase(TestCase):
+    """Tests for get_file_from_key()."""
+
+    def setUp(self):
+        sleep_patcher = patch('edx.analytics.tasks.util.retry.time.sleep')
+        self.mock_sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+        self.s3_client = MagicMock()
+
+    def test_key_appears(self):
+        key = MagicMock()
+        self.s3_client.get_key.side_effect = [None, None, key]
+        path = s3_util.get_file_from_key(self.s3_client, 's3://foo/bar/baz.tsv', '/tmp/output')
+        self.assertEqual(path, '/tmp/output/baz.tsv')
+        key.get_contents_to_filename.assert_called_once_with('/tmp/output/baz.tsv')
+        self.assertEqual(self.mock_sleep.call_count, 2)
+
+    def test_missing_key(self):
+        clock = [0]
+        self.mock_sleep.side_effect = lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+        self.s3_client.get_key.return_value = None
+        with patch('edx.analytics.tasks.util.retry.time.time', side_effect=lambda: clock[0]):
+            self.assertIsNone(s3_util.get_file_from_key(self.s3_client, 's3://foo/bar/baz.tsv', '/tmp/output'))
+        self.assertAlmostEqual(clock[0], s3_util.KEY_WAIT_TIMEOUT)
+        self.assertEqual(self.s3_client.get_key.call_count, self.mock_sleep.call_count + 1)
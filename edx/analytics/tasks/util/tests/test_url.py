@@ -1,5 +1,8 @@
 """Tests for URL-related functionality."""
 
+import os
+import shutil
+import tempfile
 from unittest import TestCase
 
 import luigi
@@ -74,3 +77,44 @@ class UrlPathJoinTestCase(TestCase):
     def test_multiple_elements(self):
         self.assertEquals(url.url_path_join('s3://foo', 'bar', 'baz'), 's3://foo/bar/baz')
         self.assertEquals(url.url_path_join('s3://foo', 'bar/bing', 'baz'), 's3://foo/bar/bing/baz')
+
+
+class DelayedMarkerTarget(url.LocalMarkerTarget):
+    """A local marker target whose marker file can't be read until it has been checked a few times."""
+
+    checks_before_visible = 3
+
+    def __init__(self, *args, **kwargs):
+        super(DelayedMarkerTarget, self).__init__(*args, **kwargs)
+        self.checks = 0
+
+    def exists(self):
+        self.checks += 1
+        return self.checks > self.checks_before_visible and super(DelayedMarkerTarget, self).exists()
+
+
+class MarkerTargetTestCase(TestCase):
+    """Tests for writing and confirming marker files."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        sleep_patcher = patch('edx.analytics.tasks.util.retry.time.sleep')
+        self.mock_sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def test_touch_marker(self):
+        target = url.get_target_from_url(self.temp_dir, marker=True)
+        self.assertFalse(target.exists())
+        target.touch_marker()
+        self.assertTrue(target.exists())
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, '_SUCCESS')))
+        self.assertFalse(self.mock_sleep.called)
+
+    def test_delayed_marker(self):
+        target = DelayedMarkerTarget(path=self.temp_dir)
+        target.touch_marker()
+        self.assertEqual(target.checks, 4)
+        self.assertEqual(self.mock_sleep.call_count, 3)
+        # The first delays are well under a second.
+        self.assertLessEqual(sum(call[0][0] for call in self.mock_sleep.call_args_list), 0.7)
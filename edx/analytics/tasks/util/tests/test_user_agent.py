@@ -0,0 +1,36 @@
+"""Tests for canonicalizing user agents."""
+from StringIO import StringIO
+from unittest import TestCase
+
+from edx.analytics.tasks.tools.user_agent_lookup import write_lookup
+from edx.analytics.tasks.util.user_agent import canonicalize_user_agent, read_user_agent_lookup
+
+SAFARI_AGENT = (
+    u"Mozilla/5.0 (Macintosh; Intel Mac OS X 10_10_5) AppleWebKit/600.8.9 (KHTML, like Gecko) Version/8.0.8 "
+    u"Safari/600.8.9"
+)
+
+
+class UserAgentTest(TestCase):
+    """Tests for canonicalize_user_agent and the lookup file."""
+
+    def test_canonicalize(self):
+        self.assertEqual(canonicalize_user_agent(SAFARI_AGENT), {
+            'type': 'desktop',
+            'device_name': 'Other',
+            'os': 'Mac OS X',
+            'browser': 'Safari',
+            'touch_capable': False,
+        })
+        self.assertEqual(canonicalize_user_agent(u'unrecognized'), {})
+        self.assertIs(canonicalize_user_agent(SAFARI_AGENT), canonicalize_user_agent(SAFARI_AGENT))
+
+    def test_lookup_round_trip(self):
+        output_file = StringIO()
+        self.assertEqual(write_lookup([SAFARI_AGENT, u'unrecognized'], output_file), 2)
+
+        output_file.seek(0)
+        self.assertEqual(read_user_agent_lookup(output_file), {
+            SAFARI_AGENT: canonicalize_user_agent(SAFARI_AGENT),
+            u'unrecognized': {},
+        })
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Tests for the memory-mapped user info index."""
+
+import os
+import shutil
+import tempfile
+from StringIO import StringIO
+from unittest import TestCase
+
+from edx.analytics.tasks.util.user_info_index import UserInfoIndex, write_user_info_index
+
+
+class UserInfoIndexTest(TestCase):
+    """Tests for writing and reading user info indexes."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def create_index(self, usernames, names):
+        """Write an index of the users and open it."""
+        output_file = StringIO()
+        write_user_info_index(usernames, names, output_file)
+        path = os.path.join(self.temp_dir, 'user_info.idx')
+        with open(path, 'wb') as index_file:
+            index_file.write(output_file.getvalue())
+        index = UserInfoIndex(path)
+        self.addCleanup(index.close)
+        return index
+
+    def test_lookups(self):
+        index = self.create_index(
+            [(30, u'verified'), (1, u'honor'), (2000000000000, u'øyaland'), (4, u'audit')],
+            [(1, u'Honor Student'), (2000000000000, u'Olav Øyaland'), (5, u'Unknown User')],
+        )
+        self.assertEqual(len(index.user_by_id), 4)
+        self.assertEqual(index.user_by_id[1], {'user_id': 1, 'username': u'honor', 'name': u'Honor Student'})
+        self.assertEqual(index.user_by_id[30], {'user_id': 30, 'username': u'verified'})
+        self.assertEqual(index.user_by_username[u'øyaland'], {
+            'user_id': 2000000000000, 'username': u'øyaland', 'name': u'Olav Øyaland'
+        })
+        self.assertEqual(index.user_by_username['audit']['user_id'], 4)
+        self.assertEqual(list(index.user_by_id), [1, 4, 30, 2000000000000])
+        self.assertEqual(list(index.user_by_username), [u'audit', u'honor', u'verified', u'øyaland'])
+
+    def test_missing_users(self):
+        index = self.create_index([(1, u'honor'), (3, u'verified')], [])
+        for user_id in (0, 2, 4, '1', None):
+            self.assertNotIn(user_id, index.user_by_id)
+            with self.assertRaises(KeyError):
+                index.user_by_id[user_id]  # pylint: disable=pointless-statement
+        for username in (u'', u'audit', u'honors', u'zzz', 1):
+            self.assertNotIn(username, index.user_by_username)
+        self.assertIsNone(index.user_by_username.get(u'staff'))
+
+    def test_empty_index(self):
+        index = self.create_index([], [])
+        self.assertEqual(len(index.user_by_id), 0)
+        self.assertNotIn(1, index.user_by_id)
+        self.assertNotIn(u'honor', index.user_by_username)
+
+    def test_not_an_index(self):
+        path = os.path.join(self.temp_dir, 'not_an_index')
+        with open(path, 'wb') as not_an_index:
+            not_an_index.write('1\x01honor\n2\x01audit\n')
+        with self.assertRaises(ValueError):
+            UserInfoIndex(path)
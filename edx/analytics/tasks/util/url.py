@@ -12,7 +12,6 @@ from __future__ import absolute_import
 
 import logging
 import os
-import time
 import urlparse
 
 import luigi
@@ -23,7 +22,8 @@ from luigi.contrib.hdfs import format as hdfs_format
 from luigi.contrib.hdfs.target import HdfsTarget
 from luigi.contrib.s3 import S3Target
 
-from edx.analytics.tasks.util.s3_util import DEFAULT_KEY_ACCESS_POLICY, S3HdfsTarget, ScalableS3Client
+from edx.analytics.tasks.util.retry import wait_until
+from edx.analytics.tasks.util.s3_util import DEFAULT_KEY_ACCESS_POLICY, S3HdfsTarget, get_s3_client
 
 log = logging.getLogger(__name__)
 
@@ -32,29 +32,25 @@ class MarkerMixin(object):
     """This mixin handles Targets that cannot accurately be measured by the existence of data files, and instead need
     another positive marker to indicate Task success."""
 
-    # Check if the marker file is readable after being written, and if not then block for up to 10 minutes until a read
-    # is successful.
+    # Check if the marker file is readable after being written, and if not then block for up to
+    # `marker_confirmation_timeout` seconds until a read is successful.
     confirm_marker_file_after_writing = True
+    marker_confirmation_timeout = 600
 
     def exists(self):  # pragma: no cover
         """Completion of this target is based solely on the existence of the marker file."""
         return self.fs.exists(self.path + "/_SUCCESS")
 
-    def touch_marker(self):  # pragma: no cover
+    def touch_marker(self):
         """Generate the marker file using file system native to the parent Target."""
-        marker = self.__class__(path=self.path + "/_SUCCESS")
+        if isinstance(self, S3Target):
+            marker = self.__class__(path=self.path + "/_SUCCESS", client=self.fs)
+        else:
+            marker = self.__class__(path=self.path + "/_SUCCESS")
         marker.open("w").close()
 
         if self.confirm_marker_file_after_writing:
-            read_attempts = 10
-            marker_exists = False
-
-            while read_attempts > 0 and not marker_exists:
-                marker_exists = self.exists()
-
-                if not marker_exists:
-                    log.debug("Marker file %s does not exist, sleeping for 60 seconds", marker)
-                    time.sleep(60)
+            marker_exists = wait_until(self.exists, timeout=self.marker_confirmation_timeout)
 
             if not marker_exists:
                 log.error("Error Marker file %s should have been created but could not be read!", marker)
@@ -139,7 +135,7 @@ def get_target_class_from_url(url, marker=False):
         # everything else off the url and pass that in to the target.
         url = parsed_url.path
     if issubclass(target_class, S3Target):
-        kwargs['client'] = ScalableS3Client()
+        kwargs['client'] = get_s3_client()
         kwargs['policy'] = DEFAULT_KEY_ACCESS_POLICY
 
     url = url.rstrip('/')
@@ -0,0 +1,84 @@
+"""
+Canonicalize user agent strings.
+
+Parsing a user agent string runs a long cascade of regular expressions, but a day of tracking logs only contains a small
+number of distinct agents, so the results are cached.  The results can also be computed ahead of time and stored in a
+lookup file, one tab-separated line per agent with the columns in LOOKUP_FIELDS, which can be read with
+`read_user_agent_lookup()` and shipped to the workers with the task.  Use the `user-agent-lookup` command to write
+such a file.
+"""
+import user_agents
+
+from edx.analytics.tasks.util.lru_cache import lru_cached
+
+USER_AGENT_CACHE_SIZE = 10000
+AGENT_FIELDS = ('type', 'device_name', 'os', 'browser', 'touch_capable')
+LOOKUP_FIELDS = ('agent',) + AGENT_FIELDS
+
+
+@lru_cached('User Agent', USER_AGENT_CACHE_SIZE)
+def canonicalize_user_agent(agent):
+    """
+    There is a lot of variety in the user agent field that is hard for humans to parse, so we canonicalize
+    the user agent to extract the information we're looking for.
+
+    Args:
+        agent: an agent string.
+
+    Returns:
+        a dictionary of information about the user agent, which is empty if the type of the agent isn't recognized, or
+        None if the agent can't be parsed.  The dictionary is shared with other callers and must not be modified.
+    """
+    try:
+        user_agent = user_agents.parse(agent)
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+    device_type = ''  # It is possible that the user agent isn't any of the below.
+    if user_agent.is_mobile:
+        device_type = "mobile"
+    elif user_agent.is_tablet:
+        device_type = "tablet"
+    elif user_agent.is_pc:
+        device_type = "desktop"
+    elif user_agent.is_bot:
+        device_type = "bot"
+
+    if not device_type:
+        return {}
+
+    return {
+        'type': device_type,
+        'device_name': user_agent.device.family,
+        'os': user_agent.os.family,
+        'browser': user_agent.browser.family,
+        # TODO: figure out how to handle this, so that it works
+        # when the target field is either BooleanField or StringField.
+        'touch_capable': user_agent.is_touch_capable,
+    }
+
+
+def format_user_agent_lookup_line(agent, agent_dict):
+    """Returns a line of a lookup file, without the trailing newline, for an agent and its canonical information."""
+    if agent_dict:
+        values = [unicode(agent_dict[field]) for field in AGENT_FIELDS]
+    else:
+        values = [u''] * len(AGENT_FIELDS)
+    return u'\t'.join([agent] + values).encode('utf8')
+
+
+def read_user_agent_lookup(input_file):
+    """Returns a dictionary mapping agent strings to their canonical information, read from a lookup file."""
+    lookup = {}
+    for line in input_file:
+        values = line.rstrip('\r\n').decode('utf8').split('\t')
+        if len(values) != len(LOOKUP_FIELDS):
+            continue
+        agent_dict = dict(zip(LOOKUP_FIELDS, values))
+        agent = agent_dict.pop('agent')
+        if agent_dict['type']:
+            agent_dict['touch_capable'] = agent_dict['touch_capable'] == u'True'
+            lookup[agent] = agent_dict
+        else:
+            lookup[agent] = {}
+    return lookup
@@ -0,0 +1,233 @@
+"""
+Compact, memory-mapped index of the user ids, usernames and names used for obfuscation.
+
+Loading auth_user and auth_userprofile into dicts of dicts costs more than a kilobyte per user in every worker, so
+the dumps can instead be converted once into an index file that workers map into memory.  The pages of the file are
+shared by all of the processes that map it, and no Python objects are built until a user is looked up.
+
+The file contains, in order:
+
+    a header: the magic string and the number of users,
+    the user ids, sorted, as 64-bit integers,
+    for each of those users, the offsets and lengths of its username and name in the string section,
+    the positions of the users sorted by username, as 32-bit integers,
+    the string section, holding the UTF-8 encoded usernames and names.
+
+Lookups by user id and by username are binary searches over the sorted sections.
+"""
+import bisect
+import logging
+import mmap
+import struct
+from collections import Mapping
+
+log = logging.getLogger(__name__)
+
+MAGIC = 'EDXUSRI1'
+HEADER = struct.Struct('<8sQ')
+USER_ID = struct.Struct('<q')
+# Offset and length of the username, then offset and length of the name, where a length of -1 means there is no name.
+USER_RECORD = struct.Struct('<QIQi')
+USERNAME_POSITION = struct.Struct('<I')
+NO_NAME = -1
+
+
+def write_user_info_index(usernames, names, output_file):
+    """
+    Write an index of users to a file.
+
+    Args:
+        usernames: an iterable of (user_id, username) pairs, where user_id is an int and username is a unicode string.
+        names: an iterable of (user_id, name) pairs.  Names of user ids that have no username are ignored.
+        output_file: a file object to write the index to.
+
+    Returns:
+        the number of users written.
+    """
+    users = {}
+    for user_id, username in usernames:
+        users[user_id] = [username.encode('utf8'), None]
+    for user_id, name in names:
+        try:
+            users[user_id][1] = name.encode('utf8')
+        except KeyError:
+            # The userprofile may be more recent than the auth_user file.
+            log.error("Unknown value for user_id read from auth_user_profile file: %s '%s'", user_id, name)
+
+    user_ids = sorted(users)
+    output_file.write(HEADER.pack(MAGIC, len(user_ids)))
+    for user_id in user_ids:
+        output_file.write(USER_ID.pack(user_id))
+
+    offset = 0
+    for user_id in user_ids:
+        username, name = users[user_id]
+        name_offset = offset + len(username)
+        if name is None:
+            output_file.write(USER_RECORD.pack(offset, len(username), name_offset, NO_NAME))
+            offset = name_offset
+        else:
+            output_file.write(USER_RECORD.pack(offset, len(username), name_offset, len(name)))
+            offset = name_offset + len(name)
+
+    username_order = sorted(xrange(len(user_ids)), key=lambda position: users[user_ids[position]][0])
+    for position in username_order:
+        output_file.write(USERNAME_POSITION.pack(position))
+
+    for user_id in user_ids:
+        username, name = users[user_id]
+        output_file.write(username)
+        if name is not None:
+            output_file.write(name)
+
+    return len(user_ids)
+
+
+class UserInfoIndex(object):
+    """
+    Read-only access to an index file written by `write_user_info_index()`.
+
+    The `user_by_id` and `user_by_username` mappings return the same dicts as the ones built by UserInfoMixin, with
+    'user_id', 'username' and, if known, 'name' keys.  A new dict is returned for every lookup.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as index_file:
+            self.buffer = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError('{0} is not a user info index'.format(path))
+        self.user_ids_offset = HEADER.size
+        self.records_offset = self.user_ids_offset + self.count * USER_ID.size
+        self.username_positions_offset = self.records_offset + self.count * USER_RECORD.size
+        self.strings_offset = self.username_positions_offset + self.count * USERNAME_POSITION.size
+
+        self.user_by_id = UserByIdMapping(self)
+        self.user_by_username = UserByUsernameMapping(self)
+
+    def close(self):
+        """Unmap the file."""
+        self.buffer.close()
+
+    def user_id_at(self, position):
+        """Returns the user id of the user at a position in the user id order."""
+        return USER_ID.unpack_from(self.buffer, self.user_ids_offset + position * USER_ID.size)[0]
+
+    def username_position_at(self, index):
+        """Returns the position of the user at an index in the username order."""
+        return USERNAME_POSITION.unpack_from(
+            self.buffer, self.username_positions_offset + index * USERNAME_POSITION.size
+        )[0]
+
+    def encoded_username_at(self, position):
+        """Returns the UTF-8 encoded username of the user at a position in the user id order."""
+        username_offset, username_length, _name_offset, _name_length = self._record_at(position)
+        start = self.strings_offset + username_offset
+        return self.buffer[start:start + username_length]
+
+    def user_info_at(self, position):
+        """Returns a dict of the user info of the user at a position in the user id order."""
+        username_offset, username_length, name_offset, name_length = self._record_at(position)
+        start = self.strings_offset + username_offset
+        user_info = {
+            'user_id': self.user_id_at(position),
+            'username': self.buffer[start:start + username_length].decode('utf8'),
+        }
+        if name_length != NO_NAME:
+            start = self.strings_offset + name_offset
+            user_info['name'] = self.buffer[start:start + name_length].decode('utf8')
+        return user_info
+
+    def find_user_id(self, user_id):
+        """Returns the position of the user with the user id, or None if there is no such user."""
+        position = bisect.bisect_left(_SortedUserIds(self), user_id)
+        if position < self.count and self.user_id_at(position) == user_id:
+            return position
+        return None
+
+    def find_username(self, username):
+        """Returns the position in the user id order of the user with the username, or None if there is none."""
+        if isinstance(username, unicode):
+            username = username.encode('utf8')
+        index = bisect.bisect_left(_SortedUsernames(self), username)
+        if index < self.count:
+            position = self.username_position_at(index)
+            if self.encoded_username_at(position) == username:
+                return position
+        return None
+
+    def _record_at(self, position):
+        """Returns the string offsets and lengths of the user at a position in the user id order."""
+        return USER_RECORD.unpack_from(self.buffer, self.records_offset + position * USER_RECORD.size)
+
+
+class _SortedUserIds(object):
+    """Sequence of the user ids in an index, for use with bisect."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return self.index.count
+
+    def __getitem__(self, position):
+        return self.index.user_id_at(position)
+
+
+class _SortedUsernames(object):
+    """Sequence of the encoded usernames in an index in sorted order, for use with bisect."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return self.index.count
+
+    def __getitem__(self, sorted_index):
+        return self.index.encoded_username_at(self.index.username_position_at(sorted_index))
+
+
+class UserByIdMapping(Mapping):
+    """Read-only mapping from user ids to user info dicts."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __getitem__(self, user_id):
+        if not isinstance(user_id, (int, long)):
+            raise KeyError(user_id)
+        position = self.index.find_user_id(user_id)
+        if position is None:
+            raise KeyError(user_id)
+        return self.index.user_info_at(position)
+
+    def __iter__(self):
+        for position in xrange(self.index.count):
+            yield self.index.user_id_at(position)
+
+    def __len__(self):
+        return self.index.count
+
+
+class UserByUsernameMapping(Mapping):
+    """Read-only mapping from usernames to user info dicts."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __getitem__(self, username):
+        if not isinstance(username, basestring):
+            raise KeyError(username)
+        position = self.index.find_username(username)
+        if position is None:
+            raise KeyError(username)
+        return self.index.user_info_at(position)
+
+    def __iter__(self):
+        for sorted_index in xrange(self.index.count):
+            yield self.index.encoded_username_at(self.index.username_position_at(sorted_index)).decode('utf8')
+
+    def __len__(self):
+        return self.index.count
@@ -4,7 +4,7 @@ import logging
 
 import luigi.task
 
-from edx.analytics.tasks.common.mapreduce import MapReduceJobTask
+from edx.analytics.tasks.common.mapreduce import MapReduceJobTask, SumValuesMixin
 from edx.analytics.tasks.common.pathutil import EventLogSelectionMixin
 from edx.analytics.tasks.common.vertica_load import VerticaCopyTask
 from edx.analytics.tasks.util.url import ExternalURL, get_target_from_url, url_path_join
@@ -12,7 +12,7 @@ from edx.analytics.tasks.util.url import ExternalURL, get_target_from_url, url_p
 log = logging.getLogger(__name__)
 
 
-class EventTypeDistributionTask(EventLogSelectionMixin, MapReduceJobTask):
+class EventTypeDistributionTask(SumValuesMixin, EventLogSelectionMixin, MapReduceJobTask):
     """Task to compute event_type and event_source values being encountered on each day in a given time interval."""
     output_root = luigi.Parameter()
     events_list_file_path = luigi.Parameter(default=None)
@@ -10,7 +10,7 @@ import luigi
 from luigi.contrib.hive import HiveQueryTask
 
 from edx.analytics.tasks.common.vertica_load import VerticaCopyTask, VerticaCopyTaskMixin
-from edx.analytics.tasks.util.edx_api_client import EdxApiClient
+from edx.analytics.tasks.util.edx_api_client import ApiResponseCacheMixin, EdxApiClient, map_with_api_clients
 from edx.analytics.tasks.util.hive import BareHiveTableTask, HivePartitionTask, WarehouseMixin, hive_database_name
 from edx.analytics.tasks.util.opaque_key_util import get_org_id_for_course
 from edx.analytics.tasks.util.overwrite import OverwriteOutputMixin
@@ -22,7 +22,7 @@ from edx.analytics.tasks.util.url import get_target_from_url, url_path_join
 log = logging.getLogger(__name__)
 
 
-class LoadInternalReportingCourseCatalogMixin(WarehouseMixin, OverwriteOutputMixin):
+class LoadInternalReportingCourseCatalogMixin(ApiResponseCacheMixin, WarehouseMixin, OverwriteOutputMixin):
     """
     Mixin to handle parameters common to the tasks involved in loading the internal reporting course catalog table,
     including calling the course catalog API.
@@ -54,6 +54,73 @@ class LoadInternalReportingCourseCatalogMixin(WarehouseMixin, OverwriteOutputMix
         default=100,
         description="The number of records to request from the API in each HTTP request."
     )
+    api_concurrency = luigi.IntParameter(
+        config_path={'section': 'course-catalog-api', 'name': 'api_concurrency'},
+        significant=False,
+        default=1,
+        description="The number of partners to fetch data for at the same time.  Each concurrent request uses its own "
+                    "authenticated session.  Records are written in the order of the partner_short_codes regardless."
+    )
+
+    def get_partner_api_root_url(self, partner_short_code):
+        """Returns the root URL of the API to call for the partner."""
+        if self.partner_api_urls:
+            url_index = self.partner_short_codes.index(partner_short_code)
+
+            if url_index >= self.partner_api_urls.__len__():
+                raise luigi.parameter.MissingParameterException(
+                    "Error!  Index of the partner short code from partner_short_codes exceeds the length of "
+                    "partner_api_urls.  These lists are not in sync!!!")
+            return self.partner_api_urls[url_index]
+        elif self.api_root_url:
+            return self.api_root_url
+        else:
+            raise luigi.parameter.MissingParameterException("Missing either a partner_api_urls or an " +
+                                                            "api_root_url.")
+
+    def pull_partner_resource(self, resource, output_file):
+        """
+        Fetch all pages of a resource for every partner, writing each result as a line of JSON to the output file.
+
+        Partners are fetched concurrently, according to `api_concurrency`, but their records are written in the order of
+        `partner_short_codes`.
+        """
+        short_codes = self.partner_short_codes if self.partner_short_codes else []
+        urls = [
+            url_path_join(self.get_partner_api_root_url(partner_short_code), resource) + '/'
+            for partner_short_code in short_codes
+        ]
+
+        def fetch_partner_results(client, partner):
+            """Returns the results of all pages of the resource for a (partner_short_code, url) pair."""
+            partner_short_code, url = partner
+            params = {
+                'limit': self.api_page_size,
+                'partner': partner_short_code,
+                'exclude_utm': 1,
+            }
+            results = []
+            for response in client.paginated_get(url, params=params):
+                results.extend(response.json().get('results', []))
+            return results
+
+        response_cache = self.get_api_response_cache('discovery_' + resource)
+        partner_results = map_with_api_clients(
+            fetch_partner_results, zip(short_codes, urls), concurrency=self.api_concurrency,
+            response_cache=response_cache,
+        )
+        for partner_short_code, results in zip(short_codes, partner_results):
+            for record in results:
+                record['partner_short_code'] = partner_short_code
+                output_file.write(json.dumps(record))
+                output_file.write('\n')
+
+            if results:
+                log.info('Wrote %d %s records to output file for partner %s', len(results), resource,
+                         partner_short_code)
+
+        if response_cache is not None:
+            response_cache.save()
 
 
 class PullDiscoveryCoursesAPIData(LoadInternalReportingCourseCatalogMixin, luigi.Task):
@@ -61,42 +128,8 @@ class PullDiscoveryCoursesAPIData(LoadInternalReportingCourseCatalogMixin, luigi
 
     def run(self):
         self.remove_output_on_overwrite()
-        client = EdxApiClient()
         with self.output().open('w') as output_file:
-            short_codes = self.partner_short_codes if self.partner_short_codes else []
-            for partner_short_code in short_codes:
-                params = {
-                    'limit': self.api_page_size,
-                    'partner': partner_short_code,
-                    'exclude_utm': 1,
-                }
-
-                if self.partner_api_urls:
-                    url_index = short_codes.index(partner_short_code)
-
-                    if url_index >= self.partner_api_urls.__len__():
-                        raise luigi.parameter.MissingParameterException(
-                            "Error!  Index of the partner short code from partner_short_codes exceeds the length of "
-                            "partner_api_urls.  These lists are not in sync!!!")
-                    api_root_url = self.partner_api_urls[url_index]
-                elif self.api_root_url:
-                    api_root_url = self.api_root_url
-                else:
-                    raise luigi.parameter.MissingParameterException("Missing either a partner_api_urls or an " +
-                                                                    "api_root_url.")
-
-                url = url_path_join(api_root_url, 'courses') + '/'
-                for response in client.paginated_get(url, params=params):
-                    parsed_response = response.json()
-                    counter = 0
-                    for course in parsed_response.get('results', []):
-                        course['partner_short_code'] = partner_short_code
-                        output_file.write(json.dumps(course))
-                        output_file.write('\n')
-                        counter += 1
-
-                    if counter > 0:
-                        log.info('Wrote %d records to output file', counter)
+            self.pull_partner_resource('courses', output_file)
 
     def output(self):
         return get_target_from_url(
@@ -111,42 +144,8 @@ class PullDiscoveryCourseRunsAPIData(LoadInternalReportingCourseCatalogMixin, lu
 
     def run(self):
         self.remove_output_on_overwrite()
-        client = EdxApiClient()
         with self.output().open('w') as output_file:
-            short_codes = self.partner_short_codes if self.partner_short_codes else []
-            for partner_short_code in short_codes:
-                params = {
-                    'limit': self.api_page_size,
-                    'partner': partner_short_code,
-                    'exclude_utm': 1,
-                }
-
-                if self.partner_api_urls:
-                    url_index = short_codes.index(partner_short_code)
-
-                    if url_index >= self.partner_api_urls.__len__():
-                        raise luigi.parameter.MissingParameterException(
-                            "Error!  Index of the partner short code from partner_short_codes exceeds the length of "
-                            "partner_api_urls.  These lists are not in sync!!!")
-                    api_root_url = self.partner_api_urls[url_index]
-                elif self.api_root_url:
-                    api_root_url = self.api_root_url
-                else:
-                    raise luigi.parameter.MissingParameterException("Missing either a partner_api_urls or an " +
-                                                                    "api_root_url.")
-
-                url = url_path_join(api_root_url, 'course_runs') + '/'
-                for response in client.paginated_get(url, params=params):
-                    parsed_response = response.json()
-                    counter = 0
-                    for course in parsed_response.get('results', []):
-                        course['partner_short_code'] = partner_short_code
-                        output_file.write(json.dumps(course))
-                        output_file.write('\n')
-                        counter += 1
-
-                    if counter > 0:
-                        log.info('Wrote %d records to output file', counter)
+            self.pull_partner_resource('course_runs', output_file)
 
     def output(self):
         return get_target_from_url(
@@ -161,7 +160,8 @@ class PullDiscoveryProgramsAPIData(LoadInternalReportingCourseCatalogMixin, luig
 
     def run(self):
         self.remove_output_on_overwrite()
-        client = EdxApiClient()
+        response_cache = self.get_api_response_cache('discovery_programs')
+        client = EdxApiClient(response_cache=response_cache)
         with self.output().open('w') as output_file:
             params = {
                 'limit': self.api_page_size,
@@ -181,6 +181,9 @@ class PullDiscoveryProgramsAPIData(LoadInternalReportingCourseCatalogMixin, luig
                 if counter > 0:
                     log.info('Wrote %d records to output file', counter)
 
+        if response_cache is not None:
+            response_cache.save()
+
     def output(self):
         return get_target_from_url(
             url_path_join(
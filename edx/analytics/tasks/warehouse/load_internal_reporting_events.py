@@ -34,7 +34,8 @@ from edx.analytics.tasks.util.opaque_key_util import get_course_key_from_url, ge
 from edx.analytics.tasks.util.record import (
     BooleanField, DateField, DateTimeField, FloatField, IntegerField, SparseRecord, StringField
 )
-from edx.analytics.tasks.util.url import ExternalURL, url_path_join
+from edx.analytics.tasks.util.url import ExternalURL, get_target_from_url, url_path_join
+from edx.analytics.tasks.util.user_agent import canonicalize_user_agent, read_user_agent_lookup
 
 log = logging.getLogger(__name__)
 
@@ -484,6 +485,14 @@ class BaseEventRecordDataTask(EventRecordDataDownstreamMixin, MultiOutputMapRedu
     # This is a placeholder.  It is expected to be overridden in derived classes.
     counter_category_name = 'Event Record Exports'
 
+    user_agent_lookup_path = luigi.Parameter(
+        config_path={'section': 'event-logs', 'name': 'user_agent_lookup_path'},
+        default=None,
+        significant=False,
+        description='A URL to a file of precomputed user agent information, as written by the user-agent-lookup '
+        'command.  Agents that are not in the file are parsed as usual.',
+    )
+
     # TODO: maintain support for info about events.  We may need something similar to identify events
     # that should -- or should not -- be included in the event dump.
 
@@ -500,6 +509,13 @@ class BaseEventRecordDataTask(EventRecordDataDownstreamMixin, MultiOutputMapRedu
         else:
             self.known_events = self.parse_events_list_file()
 
+        # The lookup is pickled with the task, so it is shipped to every worker.
+        if self.user_agent_lookup_path is None:
+            self.user_agent_lookup = {}
+        else:
+            with get_target_from_url(self.user_agent_lookup_path).open('r') as lookup_file:
+                self.user_agent_lookup = read_user_agent_lookup(lookup_file)
+
     def parse_events_list_file(self):
         """Read and parse the known events list file and populate it in a dictionary."""
         parsed_events = {}
@@ -602,34 +618,15 @@ class BaseEventRecordDataTask(EventRecordDataDownstreamMixin, MultiOutputMapRedu
         Returns:
             a dictionary of information about the user agent.
         """
-        agent_dict = {}
+        agent_dict = self.user_agent_lookup.get(agent)
+        if agent_dict is None:
+            agent_dict = canonicalize_user_agent(agent)
 
-        try:
-            user_agent = user_agents.parse(agent)
-        except Exception:  # If the user agent can't be parsed, just drop the agent data on the floor since it's of no use to us.
+        if agent_dict is None:
+            # If the user agent can't be parsed, just drop the agent data on the floor since it's of no use to us.
             self.incr_counter(self.counter_category_name, 'Quality Unparseable agent', 1)
-            return agent_dict
-
-        device_type = ''  # It is possible that the user agent isn't any of the below.
-        if user_agent.is_mobile:
-            device_type = "mobile"
-        elif user_agent.is_tablet:
-            device_type = "tablet"
-        elif user_agent.is_pc:
-            device_type = "desktop"
-        elif user_agent.is_bot:
-            device_type = "bot"
-
-        if device_type:
-            agent_dict['type'] = device_type
-            agent_dict['device_name'] = user_agent.device.family
-            agent_dict['os'] = user_agent.os.family
-            agent_dict['browser'] = user_agent.browser.family
-            # TODO: figure out how to handle this, so that it works
-            # when the target field is either BooleanField or StringField.
-            # agent_dict['touch_capable'] = unicode(user_agent.is_touch_capable)
-            agent_dict['touch_capable'] = user_agent.is_touch_capable
-        else:
+            return {}
+        elif not agent_dict:
             self.incr_counter(self.counter_category_name, 'Quality Unrecognized agent type', 1)
 
         return agent_dict